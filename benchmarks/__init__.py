@@ -0,0 +1,54 @@
+"""
+Local performance benchmarks.
+
+Each module is a standalone script, e.g.:
+
+    python -m benchmarks.bench_assistant_render
+
+and `python -m benchmarks` runs the whole suite, writing JSON results tagged
+with the current commit. Benchmarks run against a throwaway test database and
+never touch external services: those that need Claude, Google Calendar,
+Twilio or ZeptoMail talk to local stubs (see fixtures.fake_services).
+"""
+import contextlib
+import os
+import statistics
+import time
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    # Benchmarks must never start the reminder worker against a real database
+    os.environ.setdefault('REMINDER_WORKER_AUTOSTART', 'off')
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """Create (and afterwards destroy) a test database, like the test runner does."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def time_calls(fn, repeat: int = 5) -> dict:
+    """Call fn `repeat` times and summarise wall-clock timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+    }
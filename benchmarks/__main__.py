@@ -0,0 +1,87 @@
+"""
+Run the benchmark suite and write the results to JSON, tagged with the
+current commit, so runs can be compared across commits:
+
+    python -m benchmarks [--output benchmarks/results/<commit>.json] [--only chat_process reminder_tick] [--latency 0.05]
+
+Each benchmark runs in its own interpreter so none inherits another's
+database, caches or worker threads. --latency is passed to the benchmarks
+that talk to fake services.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# name -> (module, arguments); True marks benchmarks that accept --latency
+SUITE = {
+    'chat_process': ('bench_chat_process', ['--messages', '20'], True),
+    'chat_actions': ('bench_chat_actions', ['--events', '50', '--repeat', '20'], False),
+    'date_parsing': ('bench_date_parsing', ['--repeat', '200'], False),
+    'local_extraction': ('bench_local_extraction', ['--repeat', '50'], False),
+    'list_events': ('bench_list_events', ['--events', '5000', '--repeat', '5'], False),
+    'recurrence': ('bench_recurrence', ['--series', '20', '--repeat', '20'], False),
+    'reminder_tick': ('bench_reminder_tick', ['--users', '50', '--events', '2'], True),
+    'briefing': ('bench_briefing', ['--users', '50', '--events', '5'], True),
+    'twilio_send': ('bench_twilio_send', ['--messages', '500'], True),
+    'assistant_render': ('bench_assistant_render', ['--messages', '10000', '--repeat', '5'], False),
+    'startup': ('bench_startup', ['--repeat', '5'], False),
+}
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_benchmark(name: str, latency: float) -> dict:
+    module, arguments, takes_latency = SUITE[name]
+    if takes_latency:
+        arguments = [*arguments, '--latency', str(latency)]
+    completed = subprocess.run(
+        [sys.executable, '-m', f'benchmarks.{module}', *arguments],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if completed.returncode != 0:
+        return {'error': (completed.stderr.strip().splitlines() or [f'exit code {completed.returncode}'])[-1]}
+    # The result is the last thing on stdout: an indented JSON object starting at a line start
+    return json.loads(completed.stdout[completed.stdout.rfind('\n{') + 1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and write JSON results.")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--only', nargs='+', choices=sorted(SUITE), help="Run a subset of the suite")
+    parser.add_argument('--latency', type=float, default=0.0, help="Fake-service latency per request, in seconds")
+    args = parser.parse_args()
+
+    commit = _git('rev-parse', '--short', 'HEAD')
+    report = {
+        'commit': commit,
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'latency': args.latency,
+        'results': {},
+    }
+    for name in args.only or SUITE:
+        start = time.perf_counter()
+        report['results'][name] = _run_benchmark(name, args.latency)
+        report['results'][name]['wall_seconds'] = round(time.perf_counter() - start, 2)
+        print(f"{name}: done in {report['results'][name]['wall_seconds']}s")
+
+    output = args.output or os.path.join(os.path.dirname(__file__), 'results', f"{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Render cost of the assistant page for a long conversation.
+
+Seeds one conversation with N messages (10k by default) and times the initial
+assistant page and one older-messages page request.
+
+    python -m benchmarks.bench_assistant_render [--messages 10000] [--repeat 5]
+"""
+import argparse
+import json
+
+from . import setup_django, test_database, time_calls
+
+
+def run(messages: int = 10000, repeat: int = 5) -> dict:
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.urls import reverse
+    from home_page.models import Conversation, Message
+    from home_page.services.message_pages import fetch_message_page
+
+    with test_database():
+        user = User.objects.create_user(username='bench', password='bench')
+        convo = Conversation.objects.create(user=user, title='Long conversation')
+        Message.objects.bulk_create([
+            Message(conversation=convo, sender='user' if i % 2 == 0 else 'agent', text=f"message {i} " * 8)
+            for i in range(messages)
+        ], batch_size=2000)
+
+        client = Client()
+        client.force_login(user)
+        page_url = reverse('home_page:assistant', args=[convo.id])
+        older_url = reverse('home_page:conversation_messages', args=[convo.id])
+        _, cursor = fetch_message_page(convo)
+
+        initial = client.get(page_url)
+        results = {
+            'messages': messages,
+            'initial_render': time_calls(lambda: client.get(page_url), repeat),
+            'initial_render_bytes': len(initial.content),
+            'older_page': time_calls(lambda: client.get(older_url, {'before': cursor}), repeat),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Morning briefing generation for N users due at the same minute.
+
+Every user's briefing time is set to now (UTC), so one call to
+check_and_send_morning_briefings fetches each user's day from the fake
+Calendar, generates the briefing with fake Claude and queues WhatsApp and
+email deliveries.
+
+    python -m benchmarks.bench_briefing [--users 50] [--events 5] [--latency 0.0]
+"""
+import argparse
+import json
+import time
+
+from . import setup_django, test_database
+from .fixtures import create_users, fake_services, reset_stubs, stub_requests
+
+
+def run(users: int = 50, events: int = 5, latency: float = 0.0) -> dict:
+    setup_django()
+    from django.core.cache import cache
+    from django.utils import timezone
+    from home_page.services.dispatcher import get_dispatcher
+    from home_page.services.notification_service import check_and_send_morning_briefings
+
+    with test_database(), fake_services(latency, events_per_window=events) as stubs:
+        now = timezone.now()
+        create_users(
+            users, whatsapp_enabled=True, email_enabled=True,
+            morning_briefing_enabled=True, morning_briefing_time=now.time().replace(second=0, microsecond=0), user_timezone='UTC',
+        )
+        cache.clear()
+        dispatcher = get_dispatcher()
+
+        reset_stubs(stubs)
+        start = time.perf_counter()
+        check_and_send_morning_briefings()
+        generated = time.perf_counter() - start
+        dispatcher.drain(timeout=600)
+        delivered = time.perf_counter() - start
+        dispatcher.stop(drain=True)
+
+        results = {
+            'users': users,
+            'events_per_user': events,
+            'latency': latency,
+            'generate_seconds': round(generated, 3),
+            'generate_to_sent_seconds': round(delivered, 3),
+            'per_user_ms': round(generated / users * 1000, 2),
+            'stub_requests': stub_requests(stubs),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--events', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help="Stub latency per request, in seconds")
+    args = parser.parse_args()
+    print(json.dumps(run(args.users, args.events, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Per-action cost of the chat_process calendar action handlers, without HTTP or Claude.
+
+Each handler is imported through the registry (timed: the first request for
+an action pays for its module) and then run `--repeat` times against an
+in-process calendar holding `--events` events that day.
+
+    python -m benchmarks.bench_chat_actions [--events 50] [--repeat 20]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from . import setup_django, test_database, time_calls
+
+# Representative parameters as extracted by the agent for each action
+ACTIONS = {
+    'find_free_slots': ({'date': 'today'}, "When am I free today?"),
+    'create_event': ({'summary': 'Planning', 'date': 'today', 'start': '15:00', 'duration': '1 hour'}, "Book planning today at 3pm for 1 hour"),
+    'delete_event': ({'summary': 'Event 7', 'date': 'today'}, "Delete event 7 today"),
+    'update_event': ({'summary': 'Event 7', 'date': 'today', 'updates': {'summary': 'Renamed'}}, "Rename event 7 today"),
+    'list_events': ({'date': 'today'}, "What's on my calendar today?"),
+}
+
+
+class FakeCalendar:
+    """Answers the GoogleCalendarService calls the handlers make, from memory."""
+
+    def __init__(self, events: int):
+        day = datetime.now(timezone.utc).replace(hour=8, minute=0, second=0, microsecond=0)
+        self.events = [
+            {
+                'id': f'evt{i}',
+                'summary': f'Event {i}',
+                'start': {'dateTime': (day + timedelta(minutes=10 * i)).isoformat()},
+                'end': {'dateTime': (day + timedelta(minutes=10 * i + 30)).isoformat()},
+            }
+            for i in range(events)
+        ]
+
+    def list_events(self, *args, **kwargs):
+        return list(self.events)
+
+    def get_event(self, calendar_id, event_id):
+        return next(e for e in self.events if e['id'] == event_id)
+
+    def find_free_slots(self, **kwargs):
+        return [{'start': e['start']['dateTime'], 'end': e['end']['dateTime']} for e in self.events]
+
+
+class FakeAgent:
+    def _get_claude_chat_response(self, *args, **kwargs):
+        return "Done."
+
+    def _get_claude_response(self, *args, **kwargs):
+        return "Your day"
+
+
+def run(events: int = 50, repeat: int = 20) -> dict:
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import RequestFactory
+    from home_page import chat_actions
+    from home_page.models import Conversation
+
+    results = {'events': events, 'repeat': repeat, 'actions': {}}
+    with test_database():
+        user = User.objects.create_user(username='bench', password='bench')
+        convo = Conversation.objects.create(user=user, title='Bench')
+        request = RequestFactory().post('/agent/chat/process/')
+        request.user = user
+        gcal, agent = FakeCalendar(events), FakeAgent()
+
+        for action, (params, text) in ACTIONS.items():
+            start = time.perf_counter()
+            handler = chat_actions.get_handler(action)
+            import_ms = (time.perf_counter() - start) * 1000
+
+            def call():
+                return handler.handle(chat_actions.ActionContext(
+                    request=request, convo=convo, gcal=gcal, ai_agent=agent,
+                    params=dict(params), user_input=text, client_tz_name='UTC',
+                ))
+
+            outcome = call()
+            results['actions'][action] = {
+                'import_ms': round(import_ms, 2),
+                'handle': time_calls(call, repeat),
+                'response_type': getattr(outcome, 'type', type(outcome).__name__),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.events, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
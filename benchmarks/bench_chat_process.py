@@ -0,0 +1,80 @@
+"""
+End-to-end chat_process latency against fake Claude and Google Calendar.
+
+Posts N messages per scenario through the Django test client (full
+middleware, view, AIAgent, ORM) and reports request latency plus the mean
+of each Server-Timing stage.
+
+    python -m benchmarks.bench_chat_process [--messages 20] [--latency 0.0] [--claude-latency 0.0]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from . import setup_django, test_database
+from .fixtures import create_users, fake_services, parse_server_timing, reset_stubs, stub_requests
+
+SCENARIOS = {
+    'general_chat': "Hello there, how are you?",
+    'list_events': "What's on my calendar today?",
+}
+
+
+def _post_messages(client, url, text, count, new_conversation_every=0):
+    timings, stages = [], {}
+    convo_id = None
+    for i in range(count):
+        if new_conversation_every and i % new_conversation_every == 0:
+            convo_id = None
+        start = time.perf_counter()
+        response = client.post(url, json.dumps({'message': text, 'convo_id': convo_id, 'client_tz': 'UTC'}), content_type='application/json')
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"chat_process returned {response.status_code}: {response.content[:200]!r}")
+        convo_id = response.json().get('convo_id')
+        for name, duration in parse_server_timing(response.get('Server-Timing')).items():
+            stages.setdefault(name, []).append(duration)
+    return {
+        'requests': count,
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(sorted(timings)[int(0.95 * (count - 1))], 2),
+        'max_ms': round(max(timings), 2),
+        'stages_mean_ms': {name: round(sum(values) / count, 2) for name, values in stages.items()},
+    }
+
+
+def run(messages: int = 20, latency: float = 0.0, claude_latency: float = None) -> dict:
+    setup_django()
+    from django.test import Client
+    from django.urls import reverse
+
+    results = {'messages': messages, 'latency': latency, 'claude_latency': claude_latency, 'scenarios': {}}
+    latencies = {'claude': claude_latency} if claude_latency is not None else None
+    with test_database(), fake_services(latency, latencies) as stubs:
+        user = create_users(1)[0]
+        client = Client()
+        client.force_login(user)
+        url = reverse('home_page:chat_process')
+
+        for scenario, text in SCENARIOS.items():
+            reset_stubs(stubs)
+            # Every 5th message starts a new conversation, so title generation is included
+            results['scenarios'][scenario] = {
+                **_post_messages(client, url, text, messages, new_conversation_every=5),
+                'stub_requests': stub_requests(stubs),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help="Stub latency per request, in seconds")
+    parser.add_argument('--claude-latency', type=float, default=None, help="Override latency for the Claude stub")
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.latency, args.claude_latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
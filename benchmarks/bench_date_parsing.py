@@ -0,0 +1,67 @@
+"""
+Cost of resolving natural-language date expressions.
+
+Times `--repeat` passes over a corpus of AI date params and user messages:
+cold (resolver cache cleared before every pass) and warm (the steady state,
+where repeated expressions are served from the cache).
+
+    python -m benchmarks.bench_date_parsing [--repeat 200]
+"""
+import argparse
+import json
+
+from . import setup_django, time_calls
+
+# Date params as extracted by the agent
+EXPRESSIONS = [
+    'today', 'tomorrow', 'yesterday', '2025-11-03', 'friday', 'next monday', 'last tuesday',
+    'march 5', 'nov 3rd, 2026', 'in 3 days', 'in 2 weeks', '2 days ago', 'next 7 days',
+    'this week', 'next week', 'last week', 'this weekend', 'next month', 'december', 'next year',
+]
+
+# Raw user messages the handlers scan when the agent gives no date
+MESSAGES = [
+    "What's on my calendar next week?",
+    "Am I free on friday afternoon?",
+    "Book lunch with Sam tomorrow at noon for an hour",
+    "Show me all my meetings in march 2026",
+    "Move the dentist to the 3rd of november",
+    "Do I have anything in 2 weeks?",
+    "Cancel my standup",
+    "May I see my schedule?",
+]
+
+
+def run(repeat: int = 200) -> dict:
+    setup_django()
+    from home_page.chat_actions.dates import _resolve, find_range, resolve_range
+
+    def resolve_all():
+        for expression in EXPRESSIONS:
+            resolve_range(expression)
+        for message in MESSAGES:
+            find_range(message)
+
+    def cold():
+        _resolve.cache_clear()
+        resolve_all()
+
+    calls = len(EXPRESSIONS) + len(MESSAGES)
+    results = {'repeat': repeat, 'calls_per_pass': calls}
+    results['cold'] = time_calls(cold, repeat)
+    resolve_all()
+    results['warm'] = time_calls(resolve_all, repeat)
+    results['warm_us_per_call'] = round(results['warm']['median_ms'] * 1000 / calls, 2)
+    results['cache'] = _resolve.cache_info()._asdict()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
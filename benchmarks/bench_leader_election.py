@@ -0,0 +1,151 @@
+"""
+Reminder-scheduler leader election across real processes.
+
+Starts N candidate processes against a shared throwaway SQLite file, then
+repeatedly kills the current leader (SIGKILL, or SIGTERM for a clean
+release) and measures how long it takes a standby to take over. Every
+candidate reports when it gains or loses leadership, so overlapping
+leadership would show up as `overlap_seconds > 0`.
+
+    python -m benchmarks.bench_leader_election [--candidates 4] [--rounds 3] [--ttl 2] [--renew 0.5]
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+LEASE_NAME = 'bench-leader'
+
+
+def candidate(args):
+    from . import setup_django
+    setup_django()
+    from home_page.services.leader_election import LeaderElector
+
+    elector = LeaderElector(LEASE_NAME, ttl=args.ttl, renew_interval=args.renew)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    elector.start()
+
+    leading = False
+    while not stopping.is_set():
+        if elector.is_leader != leading:
+            leading = elector.is_leader
+            print(json.dumps({'pid': os.getpid(), 'leader': leading, 'at': time.time()}), flush=True)
+        stopping.wait(0.02)
+
+    if leading:
+        print(json.dumps({'pid': os.getpid(), 'leader': False, 'at': time.time()}), flush=True)
+    elector.stop(release=True)
+
+
+def _current_holder_pid():
+    from django.utils import timezone
+    from home_page.models import SchedulerLease
+    lease = SchedulerLease.objects.filter(name=LEASE_NAME, expires_at__gt=timezone.now()).exclude(holder='').first()
+    return int(lease.holder.split(':')[1]) if lease else None
+
+
+def _wait_for_new_leader(previous, timeout):
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        pid = _current_holder_pid()
+        if pid is not None and pid != previous:
+            return pid, time.monotonic() - start
+        time.sleep(0.02)
+    return None, None
+
+
+def _overlap(events, killed_at):
+    """Total seconds during which more than one process believed it was leader."""
+    intervals = []
+    open_since = {}
+    for event in sorted(events, key=lambda e: e['at']):
+        if event['leader']:
+            open_since[event['pid']] = event['at']
+        elif event['pid'] in open_since:
+            intervals.append((open_since.pop(event['pid']), event['at']))
+    end = time.time()
+    for pid, since in open_since.items():
+        # A SIGKILLed process can't report stepping down; it stopped leading when it died
+        intervals.append((since, killed_at.get(pid, end)))
+
+    boundaries = sorted({t for interval in intervals for t in interval})
+    overlap = 0.0
+    for left, right in zip(boundaries, boundaries[1:]):
+        if sum(1 for a, b in intervals if a <= left and b >= right) > 1:
+            overlap += right - left
+    return overlap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--ttl', type=float, default=2.0)
+    parser.add_argument('--renew', type=float, default=0.5)
+    parser.add_argument('--candidate', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.candidate:
+        return candidate(args)
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'leader_election.sqlite3')
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    from . import setup_django
+    setup_django()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+    events = []
+    processes = {}
+
+    def spawn():
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.bench_leader_election', '--candidate', '--ttl', str(args.ttl), '--renew', str(args.renew)],
+            stdout=subprocess.PIPE, text=True, env=os.environ.copy(),
+        )
+        processes[process.pid] = process
+        threading.Thread(target=lambda: events.extend(json.loads(line) for line in process.stdout), daemon=True).start()
+
+    for _ in range(args.candidates):
+        spawn()
+
+    killed_at = {}
+    failovers = []
+    try:
+        leader, elected_in = _wait_for_new_leader(None, timeout=30)
+        for round_number in range(args.rounds * 2):
+            clean = round_number % 2 == 1
+            processes[leader].send_signal(signal.SIGTERM if clean else signal.SIGKILL)
+            killed_at[leader] = time.time()
+            new_leader, seconds = _wait_for_new_leader(leader, timeout=args.ttl * 5)
+            failovers.append({'kind': 'release' if clean else 'crash', 'seconds': round(seconds, 3) if seconds else None})
+            spawn()  # keep the pool at full size
+            leader = new_leader
+            if leader is None:
+                break
+    finally:
+        for process in processes.values():
+            if process.poll() is None:
+                process.terminate()
+        for process in processes.values():
+            process.wait(timeout=10)
+
+    print(json.dumps({
+        'candidates': args.candidates,
+        'ttl_seconds': args.ttl,
+        'renew_seconds': args.renew,
+        'first_election_seconds': round(elected_in, 3) if elected_in else None,
+        'failovers': failovers,
+        'overlap_seconds': round(_overlap(events, killed_at), 3),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Cost of rendering a large list_events reply, without Google or Claude.
+
+Generates `--events` synthetic events spread across a year (timed, all-day
+and UTC-offset variants) and renders the year-wide listing through the
+list_events handler `--repeat` times, with AI flourishes off and the
+listing cache cleared before every render. `build_table` is the part of
+that spent parsing, localizing and grouping the events.
+
+    python -m benchmarks.bench_list_events [--events 5000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from . import setup_django, test_database, time_calls
+
+YEAR = 2030
+
+
+def synthetic_events(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    offsets = [timezone.utc, timezone(timedelta(hours=-5)), timezone(timedelta(hours=1))]
+    events = []
+    for i in range(count):
+        day = date(YEAR, 1, 1) + timedelta(days=rng.randrange(365))
+        if i % 20 == 0:
+            events.append({
+                'id': f'evt{i}', 'summary': f'All-day {i}',
+                'start': {'date': day.isoformat()}, 'end': {'date': (day + timedelta(days=1)).isoformat()},
+            })
+            continue
+        start = datetime(day.year, day.month, day.day, rng.randrange(7, 20), rng.choice((0, 15, 30, 45)), tzinfo=rng.choice(offsets))
+        end = start + timedelta(minutes=rng.choice((15, 30, 60, 90)))
+        fmt = (lambda dt: dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')) if i % 2 else (lambda dt: dt.isoformat())
+        events.append({'id': f'evt{i}', 'summary': f'Event {i}', 'start': {'dateTime': fmt(start)}, 'end': {'dateTime': fmt(end)}})
+    events.sort(key=lambda e: e['start'].get('dateTime') or e['start'].get('date'))
+    return events
+
+
+class FakeCalendar:
+    def __init__(self, events):
+        self.events = events
+
+    def list_events(self, *args, **kwargs):
+        return list(self.events)
+
+
+def run(events: int = 5000, repeat: int = 5) -> dict:
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.test import RequestFactory, override_settings
+    from zoneinfo import ZoneInfo
+    from home_page import chat_actions
+    from home_page.chat_actions.event_table import EventTable
+    from home_page.models import Conversation
+
+    results = {'events': events, 'repeat': repeat}
+    with test_database(), override_settings(LIST_EVENTS_FLOURISHES='off'):
+        user = User.objects.create_user(username='bench', password='bench')
+        convo = Conversation.objects.create(user=user, title='Bench')
+        request = RequestFactory().post('/agent/chat/process/')
+        request.user = user
+        gcal = FakeCalendar(synthetic_events(events))
+        handler = chat_actions.get_handler('list_events')
+
+        def render():
+            cache.clear()
+            return handler.handle(chat_actions.ActionContext(
+                request=request, convo=convo, gcal=gcal, ai_agent=None,
+                params={'start_date': f'{YEAR}-01-01', 'end_date': f'{YEAR}-12-31'},
+                user_input=f'list everything in {YEAR}', client_tz_name='America/New_York',
+            ))
+
+        listing = render().response
+        results['render'] = time_calls(render, repeat)
+        tz = ZoneInfo('America/New_York')
+        results['build_table'] = time_calls(lambda: EventTable.from_events(gcal.events, tz).rows_by_day(), repeat)
+        results['listing_lines'] = listing.count('\n') + 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.events, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
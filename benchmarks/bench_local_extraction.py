@@ -0,0 +1,122 @@
+"""
+Hit rate and accuracy of the local calendar command extractor.
+
+Runs every message of a labelled corpus through extract_calendar_command.
+`hit_rate` is the share of messages answered locally (each one saves the
+intent and extraction calls to Claude); `accuracy` is the share of those
+answers that match the label exactly. Messages labelled None must fall
+through to Claude: answering one locally counts as a false positive.
+
+    python -m benchmarks.bench_local_extraction [--repeat 50]
+"""
+import argparse
+import json
+
+from . import setup_django, time_calls
+
+
+def _list(when):
+    return {'action': 'list_events', 'params': {'start_date': when, 'end_date': when}}
+
+
+def _free(when):
+    return {'action': 'find_free_slots', 'params': {'start_date': when, 'end_date': when}}
+
+
+def _create(summary, date, start, end=None, duration=None):
+    params = {'summary': summary, 'date': date, 'start': start}
+    params.update({'end': end} if end else {'duration': duration})
+    return {'action': 'create_event', 'params': params}
+
+
+# (message, expected extraction or None when only Claude should answer)
+CORPUS = [
+    ("What's on my calendar today?", _list('today')),
+    ("what's on my calendar tomorrow", _list('tomorrow')),
+    ("What’s on my schedule next week?", _list('next week')),
+    ("list my events this week", _list('this week')),
+    ("List all my meetings for next month", _list('next month')),
+    ("show me my calendar for friday", _list('friday')),
+    ("Show my schedule for today", _list('today')),
+    ("Can you show my events on 2025-12-01?", _list('2025-12-01')),
+    ("what do I have tomorrow?", _list('tomorrow')),
+    ("What meetings do I have on Monday", _list('monday')),
+    ("do I have anything this weekend", _list('this weekend')),
+    ("what is my schedule like next week", _list('next week')),
+    ("check my calendar for next friday", _list('next friday')),
+    ("When am I free tomorrow?", _free('tomorrow')),
+    ("am I free on friday", _free('friday')),
+    ("Am I available next week?", _free('next week')),
+    ("find me some free time on thursday", _free('thursday')),
+    ("schedule dentist tomorrow 3pm to 4pm", _create('Dentist', 'tomorrow', '3pm', '4pm')),
+    ("Schedule Dentist appointment on Friday from 3pm to 4:30pm", _create('Dentist appointment', 'friday', '3pm', '4:30pm')),
+    ("book team lunch next monday at 12:30pm for 1 hour", _create('Team lunch', 'next monday', '12:30pm', duration='1 hour')),
+    ("Add Yoga class 2025-11-03 7am-8am to my calendar", _create('Yoga class', '2025-11-03', '7am', '8am')),
+    ("please create Budget review on wednesday 10:00 to 11:00", _create('Budget review', 'wednesday', '10:00', '11:00')),
+    ("schedule a quick sync friday 2pm for half an hour", _create('Quick sync', 'friday', '2pm', duration='30 minutes')),
+    ("book haircut in 3 days 10am to 11am", _create('Haircut', 'in 3 days', '10am', '11am')),
+    ("Set up 1:1 prep tomorrow at 9am for 30 minutes", None),
+    ("schedule standup every day at 9am for 15 minutes", None),
+    ("book a meeting with John tomorrow 3pm to 4pm", None),
+    ("schedule lunch at the park tomorrow 1pm to 2pm", None),
+    ("schedule dentist tomorrow at 3", None),
+    ("schedule gym 5pm to 6pm", None),
+    ("schedule planning next week 3pm to 4pm", None),
+    ("Schedule another at 4pm on the same day", None),
+    ("add it to friday 3pm to 4pm", None),
+    ("move my 2pm meeting to 3pm", None),
+    ("delete my dentist appointment", None),
+    ("cancel the standup on friday", None),
+    ("rename the review to Budget review", None),
+    ("Find my standup meetings", None),
+    ("list my events", None),
+    ("what's on my calendar", None),
+    ("May I see my calendar?", None),
+    ("what is the weather tomorrow", None),
+    ("Hello there, how are you?", None),
+    ("What can you do?", None),
+    ("The one at 10am", None),
+    ("Yes, delete it", None),
+]
+
+
+def run(repeat: int = 50) -> dict:
+    setup_django()
+    from home_page.services.local_extractor import extract_calendar_command
+
+    hits = correct = false_positives = 0
+    mistakes = []
+    for text, expected in CORPUS:
+        got = extract_calendar_command(text)
+        if got is None:
+            continue
+        hits += 1
+        if got == expected:
+            correct += 1
+        else:
+            false_positives += expected is None
+            mistakes.append({'text': text, 'expected': expected, 'got': got})
+
+    answerable = sum(expected is not None for _, expected in CORPUS)
+    return {
+        'messages': len(CORPUS),
+        'answerable': answerable,
+        'hits': hits,
+        'hit_rate': round(hits / len(CORPUS), 3),
+        'recall': round(correct / answerable, 3) if answerable else None,
+        'accuracy': round(correct / hits, 3) if hits else None,
+        'false_positives': false_positives,
+        'mistakes': mistakes,
+        'corpus': time_calls(lambda: [extract_calendar_command(text) for text, _ in CORPUS], repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Cost of expanding recurring series locally instead of fetching every instance.
+
+A synthetic calendar of `--series` recurring masters (daily, weekdays, weekly,
+biweekly, monthly) with a few exceptions each, listed over a year the way
+delete/update and wide list_events queries do. Reports the items Google would
+send either way and the time expand_events takes over `--repeat` passes.
+
+    python -m benchmarks.bench_recurrence [--series 20] [--repeat 20]
+"""
+import argparse
+import json
+
+from . import setup_django, time_calls
+
+RULES = [
+    'RRULE:FREQ=DAILY',
+    'RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR',
+    'RRULE:FREQ=WEEKLY;BYDAY=MO',
+    'RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO',
+    'RRULE:FREQ=MONTHLY;BYDAY=-1FR',
+]
+TIME_MIN, TIME_MAX = '2030-01-01T00:00:00Z', '2031-01-01T00:00:00Z'
+
+
+def synthetic_series(count: int) -> list:
+    """`count` masters started in 2029, each with one moved and one cancelled instance in 2030."""
+    items = []
+    for n in range(count):
+        master_id = f'series{n}'
+        hour = 8 + n % 9
+        items.append({
+            'id': master_id, 'summary': f'Series {n}', 'status': 'confirmed',
+            'start': {'dateTime': f'2029-01-01T{hour:02d}:00:00-05:00', 'timeZone': 'America/New_York'},
+            'end': {'dateTime': f'2029-01-01T{hour:02d}:30:00-05:00', 'timeZone': 'America/New_York'},
+            'recurrence': [RULES[n % len(RULES)]],
+        })
+        # Exceptions on occurrences every rule above produces (Mondays in phase with the
+        # biweekly rule, or the last Friday of the month)
+        monthly = n % len(RULES) == 4
+        moved, cancelled = ('2030-03-29', '2030-06-28') if monthly else ('2030-03-11', '2030-06-03')
+        items.append({
+            'id': f'{master_id}_moved', 'recurringEventId': master_id, 'summary': f'Series {n} (moved)',
+            'originalStartTime': {'dateTime': f'{moved}T{hour:02d}:00:00-04:00'},
+            'start': {'dateTime': f'{moved}T{hour + 1:02d}:00:00-04:00'},
+            'end': {'dateTime': f'{moved}T{hour + 1:02d}:30:00-04:00'},
+        })
+        items.append({
+            'id': f'{master_id}_cancelled', 'recurringEventId': master_id, 'status': 'cancelled',
+            'originalStartTime': {'dateTime': f'{cancelled}T{hour:02d}:00:00-04:00'},
+        })
+    return items
+
+
+def run(series: int = 20, repeat: int = 20) -> dict:
+    setup_django()
+    from home_page.services.recurrence import expand_events
+
+    items = synthetic_series(series)
+    instances = expand_events(items, TIME_MIN, TIME_MAX)
+    return {
+        'series': series,
+        'repeat': repeat,
+        'items_fetched_local': len(items),
+        'items_fetched_google': len(instances),
+        'expand': time_calls(lambda: expand_events(items, TIME_MIN, TIME_MAX), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--series', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.series, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+One reminder tick for N users against fake Calendar, Claude, Twilio and ZeptoMail.
+
+Every user has WhatsApp and email reminders on and `--events` events in
+the lookahead window. Measures the scan (reminder_tick), the time until the
+dispatcher has delivered everything (scan-to-send), and a second,
+steady-state tick in which everything is already sent.
+
+    python -m benchmarks.bench_reminder_tick [--users 50] [--events 2] [--latency 0.0]
+"""
+import argparse
+import json
+import time
+
+from . import setup_django, test_database
+from .fixtures import create_users, fake_services, reset_stubs, stub_requests
+
+
+def run(users: int = 50, events: int = 2, latency: float = 0.0) -> dict:
+    setup_django()
+    from home_page.models import SentNotification
+    from home_page.reminder_worker import reminder_tick
+    from home_page.services.dispatcher import get_dispatcher
+
+    with test_database(), fake_services(latency, events_per_window=events) as stubs:
+        create_users(users, whatsapp_enabled=True, email_enabled=True, morning_briefing_enabled=False)
+        dispatcher = get_dispatcher()
+
+        reset_stubs(stubs)
+        start = time.perf_counter()
+        reminder_tick()
+        scanned = time.perf_counter() - start
+        dispatcher.drain(timeout=600)
+        delivered = time.perf_counter() - start
+        first_requests = stub_requests(stubs)
+
+        reset_stubs(stubs)
+        start = time.perf_counter()
+        reminder_tick()
+        steady = time.perf_counter() - start
+        dispatcher.stop(drain=True)
+
+        results = {
+            'users': users,
+            'events_per_user': events,
+            'latency': latency,
+            'first_tick': {
+                'scan_seconds': round(scanned, 3),
+                'scan_to_sent_seconds': round(delivered, 3),
+                'sent': SentNotification.objects.filter(status='sent').count(),
+                'failed': SentNotification.objects.filter(status='failed').count(),
+                'stub_requests': first_requests,
+            },
+            'steady_tick': {
+                'scan_seconds': round(steady, 3),
+                'stub_requests': stub_requests(stubs),
+            },
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--events', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0, help="Stub latency per request, in seconds")
+    args = parser.parse_args()
+    print(json.dumps(run(args.users, args.events, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
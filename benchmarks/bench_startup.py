@@ -0,0 +1,89 @@
+"""
+Cold-start cost of a fresh process: django.setup(), then the URLconf.
+
+Each of `--repeat` runs is a new interpreter (under -X importtime), timing
+django.setup() and the import of the URLconf, which pulls in every view.
+Reports the timings against their budgets, the -X importtime breakdown of
+the last run (slowest imports first), and any SDK that was imported eagerly
+(it should load on first use).
+
+    python -m benchmarks.bench_startup [--repeat 5] [--check]
+
+--check exits with status 1 when a median is over budget or an SDK was
+imported, for CI jobs that gate on startup time. `python -m benchmarks` runs
+it without --check, so a slow machine still records its numbers.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# The URLconf used to take ~350ms, most of it anthropic and googleapiclient
+DJANGO_SETUP_BUDGET_MS = 1500
+URLCONF_BUDGET_MS = 250
+LAZY_MODULES = ('anthropic', 'googleapiclient', 'google.oauth2', 'httplib2', 'twilio')
+
+SCRIPT = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import django; django.setup()\n"
+    "setup = time.perf_counter()\n"
+    "import project.urls, home_page.reminder_worker\n"
+    "done = time.perf_counter()\n"
+    "print(json.dumps({'setup_ms': (setup - start) * 1000, 'urlconf_ms': (done - setup) * 1000,"
+    f" 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))\n"
+)
+
+
+def start_process() -> tuple:
+    """One fresh interpreter: its timings and the -X importtime lines it wrote."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'project.settings', 'REMINDER_WORKER_AUTOSTART': 'off'}
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+        capture_output=True, text=True, env=env, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def slowest_imports(importtime: str, count: int = 20) -> list:
+    # -X importtime lines: "import time: self_us | cumulative_us | module"
+    timings = [line.split('|') for line in importtime.splitlines() if line.startswith('import time:') and 'cumulative' not in line]
+    rows = sorted(((int(c), int(own.split(':')[1]), n.strip()) for own, c, n in timings), reverse=True)
+    return [
+        {'module': name, 'cumulative_ms': round(cumulative / 1000, 2), 'self_ms': round(own / 1000, 2)}
+        for cumulative, own, name in rows[:count]
+    ]
+
+
+def run(repeat: int = 5) -> dict:
+    runs = [start_process() for _ in range(repeat)]
+    setup_ms = statistics.median(result['setup_ms'] for result, _ in runs)
+    urlconf_ms = statistics.median(result['urlconf_ms'] for result, _ in runs)
+    return {
+        'repeat': repeat,
+        'setup_ms': round(setup_ms, 2),
+        'setup_budget_ms': DJANGO_SETUP_BUDGET_MS,
+        'urlconf_ms': round(urlconf_ms, 2),
+        'urlconf_budget_ms': URLCONF_BUDGET_MS,
+        'within_budget': setup_ms < DJANGO_SETUP_BUDGET_MS and urlconf_ms < URLCONF_BUDGET_MS,
+        'sdks_loaded': sorted({m for result, _ in runs for m in result['loaded']}),
+        'slowest_imports': slowest_imports(runs[-1][1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--check', action='store_true', help="Exit with status 1 when over budget")
+    args = parser.parse_args()
+    result = run(args.repeat)
+    print(json.dumps(result, indent=2))
+    if args.check and not (result['within_budget'] and not result['sdks_loaded']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+WhatsApp send throughput with and without a pooled Twilio client.
+
+Sends N messages to a local Twilio stub, first building a new client per
+message (the previous behaviour), then through one pooled client.
+The stub is plain HTTP, so the saving shown is TCP setup only; against
+api.twilio.com each new connection also pays for a TLS handshake.
+
+    python -m benchmarks.bench_twilio_send [--messages 1000] [--latency 0.0]
+"""
+import argparse
+import json
+import time
+
+from home_page.testing.fake_servers import StubServer, twilio_routes
+
+
+def _send_all(stub, messages, make_client):
+    stub.reset_counters()
+    start = time.perf_counter()
+    for i in range(messages):
+        client = make_client()
+        client.messages.create(from_='whatsapp:+14155238886', to=f"whatsapp:+1415555{i % 10000:04d}", body="Reminder")
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': round(elapsed, 3),
+        'messages_per_second': round(messages / elapsed, 1),
+        'tcp_connections': stub.connections,
+        'requests': stub.requests,
+    }
+
+
+def run(messages: int = 1000, latency: float = 0.0) -> dict:
+    from home_page.services.twilio_client import build_twilio_client
+    sid, token = 'AC' + '0' * 32, 'token'
+
+    with StubServer(twilio_routes(), latency=latency) as stub:
+        unpooled = _send_all(stub, messages, lambda: build_twilio_client(sid, token, pooled=False, base_url=stub.url))
+        pooled_client = build_twilio_client(sid, token, base_url=stub.url)
+        pooled = _send_all(stub, messages, lambda: pooled_client)
+
+    return {'messages': messages, 'unpooled': unpooled, 'pooled': pooled}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Stub latency per request, in seconds")
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Shared setup for the end-to-end benchmarks: the four external services
+(Claude, Google Calendar, Twilio, ZeptoMail) replaced by local stubs, and
+users seeded with Google accounts and notification preferences.
+"""
+import contextlib
+import json
+import os
+import re
+
+from home_page.testing.fake_servers import StubServer, calendar_routes, claude_routes, twilio_routes, zeptomail_routes
+
+CALENDAR_WORDS = ('calendar', 'schedule', 'meeting', 'event', 'book', 'cancel', 'free', "what's on")
+
+
+def _classify_intent(request):
+    text = request['messages'][-1]['content'].rsplit('User message:', 1)[-1].lower()
+    return 'calendar' if any(word in text for word in CALENDAR_WORDS) else 'general_chat'
+
+
+# Replies for the prompts the app sends, matched on a distinctive phrase of each
+CLAUDE_RULES = [
+    ("intent classifier", _classify_intent),
+    ("Extract calendar actions", json.dumps({
+        'action': 'list_events',
+        'params': {'date': 'today'},
+        'message_for_user': "Checking your calendar...",
+    })),
+    ("Generate a short, natural title", "📅 Your schedule for today"),
+    ("Generate a very short and concise title", "Bench chat"),
+    ("reminder", "Heads up: your event starts soon."),
+    ("briefing", "Good morning! Here is your day."),
+]
+
+
+@contextlib.contextmanager
+def fake_services(latency: float = 0.0, latencies: dict = None, events_per_window: int = 3):
+    """
+    Start all four stubs and point the app at them for the duration.
+    `latency` applies to every stub; `latencies` overrides it per service name.
+    Yields {name: StubServer}.
+    """
+    from django.test import override_settings
+    from home_page.services import circuit_breaker
+
+    latencies = {**dict.fromkeys(('claude', 'calendar', 'twilio', 'zeptomail'), latency), **(latencies or {})}
+    stubs = {
+        'claude': StubServer(claude_routes(CLAUDE_RULES), latencies['claude']),
+        'calendar': StubServer(calendar_routes(events_per_window), latencies['calendar']),
+        'twilio': StubServer(twilio_routes(), latencies['twilio']),
+        'zeptomail': StubServer(zeptomail_routes(), latencies['zeptomail']),
+    }
+    with contextlib.ExitStack() as stack:
+        for stub in stubs.values():
+            stack.enter_context(stub)
+        stack.enter_context(override_settings(
+            GOOGLE_API_ENDPOINT=f"{stubs['calendar'].url}/",
+            TWILIO_ACCOUNT_SID='AC' + '0' * 32,
+            TWILIO_AUTH_TOKEN='bench-token',
+            TWILIO_WHATSAPP_NUMBER='+14155238886',
+            TWILIO_API_BASE_URL=stubs['twilio'].url,
+            TWILIO_WHATSAPP_REMINDER_SID=None,
+            TWILIO_WHATSAPP_BRIEFING_SID=None,
+            ZEPTOMAIL_API_TOKEN='bench-token',
+            ZEPTOMAIL_FROM_EMAIL='agent@example.com',
+            ZEPTOMAIL_API_URL=f"{stubs['zeptomail'].url}/v1.1/email",
+        ))
+        saved_env = {key: os.environ.get(key) for key in ('CLAUDE_API_KEY', 'ANTHROPIC_BASE_URL')}
+        os.environ.update(CLAUDE_API_KEY='bench-key', ANTHROPIC_BASE_URL=stubs['claude'].url)
+        circuit_breaker._breakers.clear()
+        try:
+            yield stubs
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def stub_requests(stubs) -> dict:
+    return {name: stub.requests for name, stub in stubs.items()}
+
+
+def reset_stubs(stubs):
+    for stub in stubs.values():
+        stub.reset_counters()
+
+
+def create_users(count: int, prefix: str = 'bench', **preferences):
+    """
+    Create `count` users, each with a linked Google account (token included)
+    and a NotificationPreference built from `preferences`. Returns the users.
+    """
+    from allauth.socialaccount.models import SocialAccount, SocialApp, SocialToken
+    from django.contrib.auth.models import User
+    from home_page.models import NotificationPreference
+
+    app, _ = SocialApp.objects.get_or_create(provider='google', defaults={'name': 'Google', 'client_id': 'bench-client', 'secret': 'bench-secret'})
+    users = User.objects.bulk_create([
+        User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", first_name=f"User{i}")
+        for i in range(count)
+    ])
+    accounts = SocialAccount.objects.bulk_create([
+        SocialAccount(user=user, provider='google', uid=f"{prefix}-{user.pk}", extra_data={'email': user.email})
+        for user in users
+    ])
+    SocialToken.objects.bulk_create([
+        SocialToken(app=app, account=account, token='bench-access-token', token_secret='bench-refresh-token')
+        for account in accounts
+    ])
+    NotificationPreference.objects.bulk_create([
+        NotificationPreference(user=user, whatsapp_number=f"+1415555{i:04d}", **preferences)
+        for i, user in enumerate(users)
+    ])
+    return users
+
+
+def parse_server_timing(header: str) -> dict:
+    """'a;dur=1.2, b;dur=3;desc="2x"' -> {'a': 1.2, 'b': 3.0}"""
+    return {match.group(1): float(match.group(2)) for match in re.finditer(r'([\w.\-]+);dur=([\d.]+)', header or '')}
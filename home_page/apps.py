@@ -7,8 +7,10 @@ class HomePageConfig(AppConfig):
 
     def ready(self):
         import home_page.signals_debug
-        import socket
+        import home_page.signals
+        from django.conf import settings
         import sys
+        import os
         import logging
 
         # 1. Skip if running management commands (migrate, shell, etc)
@@ -19,17 +21,23 @@ class HomePageConfig(AppConfig):
         if is_manage_py and not is_runserver:
             return
 
+        # 'runserver' (default), 'always' or 'off'; see REMINDER_WORKER_AUTOSTART in settings
+        autostart = str(getattr(settings, 'REMINDER_WORKER_AUTOSTART', 'runserver')).lower()
+        if autostart == 'runserver':
+            # Only the process actually serving: not the autoreloader parent (which re-runs
+            # runserver in a child with RUN_MAIN set), and not scripts, shells or python -c
+            if not is_runserver or (os.environ.get('RUN_MAIN') != 'true' and '--noreload' not in sys.argv):
+                return
+        elif autostart != 'always':
+            return
+
         # If running in production (gunicorn), the Procfile spins up a dedicated 'worker' process
         # via `python manage.py run_reminders`. So the web process MUST NOT run the background thread.
         if is_gunicorn:
             return
 
-        try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.bind(("127.0.0.1", 40123))
-        except socket.error:
-            return
-
+        # The reminder-scheduler lease (see services/leader_election.py) keeps every worker
+        # but one on standby, whichever processes started them.
         from .reminder_worker import ReminderWorker
         try:
             # ReminderWorker.start() launches a daemon thread, so it won't block django.
@@ -0,0 +1,28 @@
+from django.utils.module_loading import import_string
+from .base import ActionContext, ActionHandler, ActionResult
+import threading
+
+# Action name -> handler class. Handler modules are imported on first use, so
+# a request only pays for the parsing and formatting code of the action it runs.
+ACTION_HANDLERS = {
+    'find_free_slots': 'home_page.chat_actions.free_slots.FindFreeSlotsHandler',
+    'create_event': 'home_page.chat_actions.create_event.CreateEventHandler',
+    'delete_event': 'home_page.chat_actions.delete_event.DeleteEventHandler',
+    'update_event': 'home_page.chat_actions.update_event.UpdateEventHandler',
+    'list_events': 'home_page.chat_actions.list_events.ListEventsHandler',
+}
+
+_handlers = {}
+_lock = threading.Lock()
+
+
+def get_handler(action: str):
+    """The handler instance for `action`, importing its module on first use; None for unknown actions."""
+    handler = _handlers.get(action)
+    if handler is None and action in ACTION_HANDLERS:
+        with _lock:
+            handler = _handlers.get(action)
+            if handler is None:
+                handler = _handlers[action] = import_string(ACTION_HANDLERS[action])()
+    return handler
+
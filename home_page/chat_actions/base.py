@@ -0,0 +1,42 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class ActionContext:
+    """Everything an action handler needs from the chat_process request."""
+    request: object
+    convo: object
+    gcal: object
+    ai_agent: object
+    params: dict
+    user_input: str = ''
+    client_tz_name: Optional[str] = None
+    # The agent's reply so far; handlers replace what they answer themselves
+    response_type: str = 'calendar_action_request'
+    response_text: Optional[str] = None
+    response_content: dict = field(default_factory=dict)
+
+    @property
+    def user(self):
+        return self.request.user
+
+
+@dataclass
+class ActionResult:
+    type: str
+    response: Optional[str]
+    content: dict
+
+
+class ActionHandler:
+    """
+    Runs one calendar action requested by the agent.
+
+    handle() returns an ActionResult that chat_process merges into its JSON
+    reply, or an HttpResponse to send as-is (e.g. bulk deletion confirmations).
+    """
+    action = None
+
+    def handle(self, ctx: ActionContext):
+        raise NotImplementedError
@@ -0,0 +1,414 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.utils.timezone import get_current_timezone, make_aware
+from home_page.models import Message
+from .base import ActionContext, ActionHandler, ActionResult
+from .dates import find_date, resolve_date
+from .parsing import AT_TIME, BY_TIME, BY_TO_RANGE, FROM_TO_RANGE, SIMPLE_RANGE, parse_dt, parse_duration, parse_time_only
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Helper functions for proactive conflict detection
+def events_overlap(event_start, event_end, proposed_start, proposed_end):
+    """Check if two time ranges overlap"""
+    return event_start < proposed_end and proposed_start < event_end
+
+
+def check_conflicts_proactively(start_dt, end_dt, gcal):
+    """
+    Returns list of conflicting event objects with details.
+    """
+    try:
+        # Query the entire day to catch all events
+        day_start = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = start_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        # Get all events for that day
+        events = gcal.list_events(
+            time_min=day_start.isoformat(),
+            time_max=day_end.isoformat()
+        )
+        
+        conflicts = []
+        for event in events:
+            event_start_str = event.get('start', {}).get('dateTime')
+            event_end_str = event.get('end', {}).get('dateTime')
+            
+            if not event_start_str or not event_end_str:
+                continue
+            
+            # Parse event times
+            event_start = datetime.fromisoformat(event_start_str.replace('Z', '+00:00'))
+            event_end = datetime.fromisoformat(event_end_str.replace('Z', '+00:00'))
+            
+            # Check for overlap
+            if events_overlap(event_start, event_end, start_dt, end_dt):
+                conflicts.append({
+                    'summary': event.get('summary', 'Untitled Event'),
+                    'start': event_start_str,
+                    'end': event_end_str,
+                    'id': event.get('id')
+                })
+        
+        return conflicts
+    except Exception as e:
+        logger.error(f"Error checking conflicts: {e}")
+        return []
+
+
+def find_alternative_times(requested_dt, duration_minutes, gcal, count=3):
+    try:
+        # Get all events for that day
+        day_start = requested_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = requested_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        events = gcal.list_events(
+            time_min=day_start.isoformat(),
+            time_max=day_end.isoformat()
+        )
+        
+        # Define business hours (9 AM - 6 PM)
+        business_start = requested_dt.replace(hour=9, minute=0, second=0)
+        business_end = requested_dt.replace(hour=18, minute=0, second=0)
+        
+        # Create time slots (30-minute intervals)
+        alternatives = []
+        current_time = business_start
+        
+        while current_time < business_end and len(alternatives) < count:
+            slot_end = current_time + timedelta(minutes=duration_minutes)
+            
+            # Check if this slot conflicts with any event
+            has_conflict = False
+            for event in events:
+                event_start_str = event.get('start', {}).get('dateTime')
+                event_end_str = event.get('end', {}).get('dateTime')
+                
+                if event_start_str and event_end_str:
+                    event_start = datetime.fromisoformat(event_start_str.replace('Z', '+00:00'))
+                    event_end = datetime.fromisoformat(event_end_str.replace('Z', '+00:00'))
+                    
+                    if events_overlap(event_start, event_end, current_time, slot_end):
+                        has_conflict = True
+                        break
+            
+            # If no conflict, add as alternative
+            if not has_conflict:
+                alternatives.append({
+                    'start': current_time.isoformat(),
+                    'end': slot_end.isoformat()
+                })
+            
+            # Move to next slot (30-minute intervals)
+            current_time += timedelta(minutes=30)
+        
+        return alternatives
+    except Exception as e:
+        logger.error(f"Error finding alternatives: {e}")
+        return []
+
+
+class CreateEventHandler(ActionHandler):
+    """Resolve the requested time and draft the event for the user to confirm, flagging conflicts."""
+    action = 'create_event'
+
+    def handle(self, ctx: ActionContext):
+        convo, gcal, params = ctx.convo, ctx.gcal, ctx.params
+        ai_agent, user_input, client_tz_name = ctx.ai_agent, ctx.user_input, ctx.client_tz_name
+        response_type, agent_response_text, response_content = ctx.response_type, ctx.response_text, ctx.response_content
+
+        # Build a proper Google Calendar event body from AI params
+        norm = dict(params or {})
+        # Normalize common synonym keys from the AI output
+        if 'start_time' in norm and 'start' not in norm:
+            norm['start'] = norm['start_time']
+        if 'end_time' in norm and 'end' not in norm:
+            norm['end'] = norm['end_time']
+        tz_str = (client_tz_name or getattr(settings, 'TIME_ZONE', 'UTC') or 'UTC')
+
+        # Parse common ISO-ish formats and simple natural language
+        try:
+            # Prefer the client timezone for localization if provided
+            client_tz = ZoneInfo(tz_str)
+            print(f"✅ Using client timezone: {tz_str}")
+        except Exception as e:
+            client_tz = None
+            logger.warning(f"Failed to parse client timezone '{tz_str}', falling back to Django default: {e}")
+
+        # Determine start/end
+        date_str  = norm.get('date') or norm.get('start_date')
+        # Support phrasing like "by 8am" → treat as an end time
+        start_str = norm.get('start') or norm.get('start_time') or norm.get('date')
+        end_str   = norm.get('end')
+        duration  = norm.get('duration')
+        summary   = norm.get('summary') or 'Meeting'
+        attendees = norm.get('attendees') or []
+        
+        # Debug: Log what AI extracted
+        print(f"AI EXTRACTED: date='{date_str}', start='{start_str}', end='{end_str}', duration='{duration}', summary='{summary}'")
+
+        start_dt = parse_dt(start_str)
+        end_dt   = parse_dt(end_str) if end_str else None
+
+        # If the user says "by <time>" and no explicit end provided, infer end time and compute start from duration if available later.
+        text_lc = (user_input or '').lower()
+          # Pattern 1: "by X to Y" (common phrasing that means "from X to Y")
+        by_to_match = BY_TO_RANGE.search(text_lc)
+        if by_to_match:
+            start_str = by_to_match.group(1)
+            end_str = by_to_match.group(2)
+            start_dt = None
+            end_dt = None
+            print(f"🔍 PATTERN: 'by X to Y' → start={start_str}, end={end_str}")
+        
+        # Pattern 2: "from X to Y" (explicit range)
+        elif (' from ' in text_lc) and (' to ' in text_lc):
+            from_to = FROM_TO_RANGE.search(text_lc)
+            if from_to:
+                start_str = from_to.group(1)
+                end_str = from_to.group(2)
+                start_dt = None
+                end_dt = None
+                print(f"🔍 PATTERN: 'from X to Y' → start={start_str}, end={end_str}")
+        
+        # Pattern 3: "X to Y" or "X-Y" (simple range)
+        elif not by_to_match:
+            simple_range = SIMPLE_RANGE.search(text_lc)
+            if simple_range:
+                start_str = simple_range.group(1)
+                end_str = simple_range.group(2)
+                start_dt = None
+                end_dt = None
+                print(f"🔍 PATTERN: 'X to Y' → start={start_str}, end={end_str}")
+        
+        # Pattern 4: "by X" - treat as start time if duration is specified, otherwise as deadline
+        # This should only trigger if no range pattern was found
+        if not (by_to_match or (start_str and end_str)):
+            by_alone = BY_TIME.search(text_lc)
+            if by_alone:
+                # Check if "to" appears within 30 chars after "by" to avoid false positives
+                by_end = by_alone.end()
+                has_to_after = 'to' in text_lc[by_end:by_end+30]
+                if not has_to_after:
+                    # If duration is explicitly mentioned, treat "by X" as start time. Common phrases: "last for X", "for X hours", "X hour", etc.
+                    has_duration = bool(duration) or any(word in text_lc for word in ['last for', 'lasting', 'duration'])
+                    if has_duration:
+                        start_str = by_alone.group(1)
+                        start_dt = None
+                        print(f"🔍 PATTERN: 'by X' with duration → start={start_str}")
+                    else:
+                        end_str = by_alone.group(1)
+                        end_dt = None
+                        print(f"🔍 PATTERN: 'by X' (deadline) → end={end_str}")
+        
+        # Pattern 5: "at X" for start time
+        if (' at ' in text_lc) and not start_str:
+            at_match = AT_TIME.search(text_lc)
+            if at_match:
+                start_str = at_match.group(1)
+                start_dt = None
+                print(f"🔍 PATTERN: 'at X' → start={start_str}")
+
+
+        # If times are given without date, merge with the most reliable date.
+        # Prefer the user's natural-language date (e.g., "Friday") over any absolute
+        # date guessed by the AI to avoid stale/past years like 2023.
+        # Additionally, if AI provided full datetimes but the user mentioned an explicit
+        # date in natural language, snap those datetimes to that date to avoid past years.
+        date_from_text = find_date(user_input, client_tz)
+        ai_date_only   = resolve_date(date_str, client_tz) if date_str else None
+        date_only      = date_from_text or ai_date_only
+        if date_only:
+            # Use the client's timezone when creating datetime objects
+            # so that "9am" means "9am in the user's local time", not UTC
+            user_tz = client_tz or get_current_timezone()
+            
+            if not start_dt and start_str:
+                hm = parse_time_only(start_str)
+                if hm:
+                    # Create timezone-aware datetime in user's timezone
+                    naive_dt = datetime.combine(date_only, datetime.min.time()).replace(hour=hm[0], minute=hm[1])
+                    start_dt = make_aware(naive_dt, user_tz)
+            if end_str:
+                hm = parse_time_only(end_str)
+                if hm:
+                    # Create timezone-aware datetime in user's timezone
+                    naive_dt = datetime.combine(date_only, datetime.min.time()).replace(hour=hm[0], minute=hm[1])
+                    end_dt = make_aware(naive_dt, user_tz)
+            # If AI provided full datetimes but with an incorrect/past date, snap to the requested date
+            if start_dt and (start_dt.date() != date_only):
+                # Preserve timezone when snapping to new date
+                original_tz = start_dt.tzinfo or user_tz
+                naive_dt = datetime.combine(date_only, start_dt.time())
+                start_dt = make_aware(naive_dt, original_tz)
+            if end_dt and (end_dt.date() != date_only):
+                # Preserve timezone when snapping to new date
+                original_tz = end_dt.tzinfo or user_tz
+                naive_dt = datetime.combine(date_only, end_dt.time())
+                end_dt = make_aware(naive_dt, original_tz)
+
+        # Compute end from duration when needed
+        if start_dt and not end_dt:
+            minutes = parse_duration(duration) if duration else 60
+            if minutes is None:
+                minutes = 60
+            end_dt = start_dt + timedelta(minutes=minutes)
+
+        # Compute start from end and duration (e.g., "by 9am")
+        if end_dt and not start_dt:
+            minutes = parse_duration(duration) if duration else 60
+            if minutes is None:
+                minutes = 60
+            start_dt = end_dt - timedelta(minutes=minutes)
+
+        # Final guard: ensure end is strictly after start
+        if start_dt and end_dt and end_dt <= start_dt:
+            minutes = parse_duration(duration) if duration else 60
+            if minutes is None:
+                minutes = 60
+            end_dt = start_dt + timedelta(minutes=minutes)
+
+        if not start_dt or not end_dt:
+            response_type = 'text'
+            has_date = bool(date_only)
+            agent_response_text = (
+                "I need a date plus a start time and either an end time or a duration."
+                if not has_date else
+                "I need a concrete start time and duration (or end time) to create the event. Please provide a start time and either an end time or a duration."
+            )
+            Message.objects.create(
+                conversation=convo,
+                sender='agent',
+                text=agent_response_text,
+                message_type='text',
+                content=None,
+            )
+        else:
+            # Normalize datetimes into the client's timezone
+            tz = client_tz or get_current_timezone()
+            print(tz)
+            if start_dt.tzinfo is None:
+                start_dt = make_aware(start_dt, tz)
+            else:
+                start_dt = start_dt.astimezone(tz)
+            if end_dt.tzinfo is None:
+                end_dt = make_aware(end_dt, tz)
+            else:
+                end_dt = end_dt.astimezone(tz)
+
+            # Log the resolved datetimes for diagnostics
+            try:
+                logger.info(
+                    "Resolved event datetimes (local tz): start=%s, end=%s, title=%s, tz=%s",
+                    start_dt.isoformat(), end_dt.isoformat(), summary, tz_str
+                )
+            except Exception:
+                pass
+
+            event_body = {
+                'summary': summary,
+                'start': {
+                    'dateTime': start_dt.isoformat(),
+                    'timeZone': tz_str,
+                },
+                'end': {
+                    'dateTime': end_dt.isoformat(),
+                    'timeZone': tz_str,
+                },
+            }
+            # Normalize attendees to list of {email}
+            if isinstance(attendees, (list, tuple)) and attendees:
+                event_body['attendees'] = [
+                    {'email': a} for a in attendees if isinstance(a, str) and '@' in a
+                ]
+
+            # PROACTIVE CONFLICT DETECTION - Calculate duration
+            duration_minutes = int((end_dt - start_dt).total_seconds() / 60)
+            
+            # Check for actual conflicts (not just busy ranges)
+            conflicts = check_conflicts_proactively(start_dt, end_dt, gcal)
+            has_conflict = len(conflicts) > 0
+            
+            # If conflict detected, find alternative times
+            alternatives = []
+            if has_conflict:
+                alternatives = find_alternative_times(start_dt, duration_minutes, gcal)
+            
+            # Generate AI message based on conflict status
+            if has_conflict and alternatives:
+                # Generate suggestion with alternative
+                conflict_names = ", ".join([c['summary'] for c in conflicts[:2]])
+                if len(conflicts) > 2:
+                    conflict_names += f" and {len(conflicts)-2} more"
+                
+                # Format alt times for AI
+                alt_times_str = ", ".join([
+                    datetime.fromisoformat(alt['start'].replace('Z', '+00:00')).strftime('%I:%M %p').lstrip('0')
+                    for alt in alternatives[:2]
+                ])
+                
+                draft_prompt = (
+                    f"User wants to schedule '{summary}' at {start_dt.strftime('%I:%M %p')}. "
+                    f"However, they already have '{conflict_names}' at that time. "
+                    f"Suggest they use {alt_times_str} instead (they're free then). "
+                    f"Be friendly and concise (1-2 sentences)."
+                )
+            elif has_conflict:
+                # Conflict but no alternatives found
+                conflict_names = ", ".join([c['summary'] for c in conflicts[:2]])
+                draft_prompt = (
+                    f"User wants to schedule '{summary}' but they already have '{conflict_names}' at that time. "
+                    f"Let them know about the conflict and suggest trying a different time. "
+                    f"Be friendly and concise (1 sentence)."
+                )
+            else:
+                # No conflict
+                draft_prompt = (
+                    f"You drafted '{summary}' for the user to review. "
+                    f"They are free at this time. "
+                    f"Write a brief confirmation (1 sentence)."
+                )
+            
+            try:
+                agent_message = ai_agent._get_claude_chat_response(
+                    [{"role": "user", "content": draft_prompt}],
+                    system_prompt="You are a helpful calendar assistant. Be concise and friendly.",
+                    temperature=0.7,
+                    max_tokens=100
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate AI draft message: {e}")
+                conflict_msg = "You are free at this time." if not has_conflict else "⚠️ You have a conflict at this time."
+                agent_message = f"I've drafted this meeting. {conflict_msg}"
+            
+            response_type = 'event_confirmation_request'
+            response_content = {
+                'summary': summary,
+                'start': event_body['start'],
+                'end': event_body['end'],
+                'attendees': event_body.get('attendees', []),
+                'recurrence': norm.get('recurrence'),
+                'has_conflict': has_conflict,
+                'conflicts': conflicts if has_conflict else [],
+                'alternatives': alternatives if has_conflict else [],
+                'agent_message': agent_message
+            }
+            
+            agent_response_text = response_content['agent_message']
+            
+            # Persist the draft event preview as structured message
+            draft_msg = Message.objects.create(
+                conversation=convo,
+                sender='agent',
+                text=agent_response_text,
+                message_type='event_preview',
+                content=response_content,
+            )
+            
+            # Add the message ID to the response content so frontend can track it
+            response_content['message_id'] = draft_msg.id
+
+        return ActionResult(response_type, agent_response_text, response_content)
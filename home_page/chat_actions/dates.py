@@ -0,0 +1,335 @@
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+from .parsing import user_timezone
+import re
+
+# The one place date expressions ("today", "next friday", "next week", "in march",
+# "in 3 days", "2025-10-23", ...) are interpreted. Patterns are compiled once;
+# resolved expressions are cached per (expression, today), so repeated phrases
+# cost a dictionary lookup. Ranges are inclusive calendar dates in the user's timezone;
+# months and days named without a year are the next ones to come.
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december')
+MONTH_ALIASES = {name[:3]: i + 1 for i, name in enumerate(MONTHS)} | {'sept': 9}
+
+_WEEKDAY = '|'.join(WEEKDAYS)
+_MONTH = '|'.join(MONTHS) + '|' + '|'.join(sorted(MONTH_ALIASES, key=len, reverse=True))
+_UNIT = r'(day|week|month|year)s?'
+# One day, as the ends of a range are written ("oct 1", "1st of october", "friday", "2025-10-01")
+_DAY_EXPRESSION = (
+    r'\d{4}-\d{2}-\d{2}'
+    rf'|(?:{_MONTH})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?'
+    rf'|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTH})(?:,?\s+\d{{4}})?'
+    rf'|(?:(?:next|this|last)\s+)?(?:{_WEEKDAY})'
+    r'|yesterday|today|tomorrow'
+)
+# Range starts that name a day of the year or week without saying which year or week
+_FLOATING_DAY = re.compile(
+    rf'(?:{_MONTH})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTH})|{_WEEKDAY}'
+)
+
+RESOLVE_CACHE_SIZE = 2048
+
+
+@dataclass(frozen=True)
+class DateRange:
+    start: date
+    end: date
+
+    @property
+    def is_single_day(self) -> bool:
+        return self.start == self.end
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+
+def _day(d):
+    return DateRange(d, d)
+
+
+def _add_months(d: date, months: int) -> date:
+    month_index = d.month - 1 + months
+    year, month = d.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(d.day, monthrange(year, month)[1]))
+
+
+def _month_range(year: int, month: int) -> DateRange:
+    return DateRange(date(year, month, 1), date(year, month, monthrange(year, month)[1]))
+
+
+def _shift(today: date, amount: int, unit: str) -> date:
+    if unit == 'day':
+        return today + timedelta(days=amount)
+    if unit == 'week':
+        return today + timedelta(weeks=amount)
+    if unit == 'month':
+        return _add_months(today, amount)
+    return _add_months(today, 12 * amount)
+
+
+def _month_number(name: str) -> int:
+    return MONTHS.index(name) + 1 if name in MONTHS else MONTH_ALIASES[name]
+
+
+def _iso(m, today):
+    try:
+        return _day(date.fromisoformat(m.group(0)))
+    except ValueError:
+        return None
+
+
+def _day_word(m, today):
+    return _day(today + timedelta(days={'yesterday': -1, 'today': 0, 'tonight': 0, 'tomorrow': 1}[m.group(1)]))
+
+
+def _weekday(m, today):
+    modifier, target = m.group(1), WEEKDAYS.index(m.group(2))
+    if modifier == 'last':
+        return _day(today - timedelta(days=(today.weekday() - target - 1) % 7 + 1))
+    delta = (target - today.weekday()) % 7
+    # "friday" on a Friday means today; "next friday" on a Friday means a week out
+    if delta == 0 and modifier == 'next':
+        delta = 7
+    return _day(today + timedelta(days=delta))
+
+
+def _relative(m, today):
+    return _day(_shift(today, int(m.group(1)), m.group(2)))
+
+
+def _ago(m, today):
+    return _day(_shift(today, -int(m.group(1)), m.group(2)))
+
+
+def _span(m, today):
+    # "next 3 days" is today and the two days after it; "past 3 days" the three days before today
+    amount, unit = int(m.group(2)), m.group(3)
+    if m.group(1) == 'next':
+        return DateRange(today, _shift(today, amount, unit) - timedelta(days=1))
+    return DateRange(_shift(today, -amount, unit), today - timedelta(days=1))
+
+
+def _offset(modifier: Optional[str]) -> int:
+    return {'next': 1, 'last': -1, 'previous': -1}.get(modifier, 0)
+
+
+def _weekend(m, today):
+    saturday = today + timedelta(days=(5 - today.weekday()) % 7 if today.weekday() != 6 else -1)
+    saturday += timedelta(weeks=_offset(m.group(1)))
+    return DateRange(saturday, saturday + timedelta(days=1))
+
+
+def _week(m, today):
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=_offset(m.group(1)))
+    return DateRange(monday, monday + timedelta(days=6))
+
+
+def _month(m, today):
+    first = _add_months(today.replace(day=1), _offset(m.group(1)))
+    return _month_range(first.year, first.month)
+
+
+def _upcoming_month(month: int, today: date) -> int:
+    # A month named without a year is the next one to come: "march" asked in October is next March
+    return today.year if month >= today.month else today.year + 1
+
+
+def _upcoming_day(month: int, day: int, today: date) -> Optional[date]:
+    # The next occurrence on or after today (February 29th waits for a leap year); None if there is none
+    for year in range(today.year, today.year + 9):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        if candidate >= today:
+            return candidate
+    return None
+
+
+def _named_month(m, today):
+    month = _month_number(m.group(1))
+    return _month_range(int(m.group(2)) if m.group(2) else _upcoming_month(month, today), month)
+
+
+def _bare_month(m, today):
+    month = _month_number(m.group(1))
+    return _month_range(_upcoming_month(month, today), month)
+
+
+def _calendar_day(month: int, day: int, year: Optional[str], today: date) -> Optional[DateRange]:
+    if not year:
+        found = _upcoming_day(month, day, today)
+        return _day(found) if found else None
+    try:
+        return _day(date(int(year), month, day))
+    except ValueError:
+        return None
+
+
+def _month_day(m, today):
+    return _calendar_day(_month_number(m.group(1)), int(m.group(2)), m.group(3), today)
+
+
+def _day_month(m, today):
+    return _calendar_day(_month_number(m.group(2)), int(m.group(1)), m.group(3), today)
+
+
+def _month_day_span(m, today):
+    # "oct 1-15", "march 3 to 7, 2026"
+    month, year = _month_number(m.group(1)), m.group(4)
+    first = _calendar_day(month, int(m.group(2)), year, today)
+    if not first:
+        return None
+    try:
+        last = date(first.start.year, month, int(m.group(3)))
+    except ValueError:
+        return None
+    return DateRange(first.start, last) if last >= first.start else None
+
+
+def _date_span(m, today):
+    """
+    "from oct 1 to oct 15", "between monday and friday": the end is read relative to
+    the start. A start without a year or week modifier can also mean one already past:
+    the earliest reading that hasn't ended yet wins, so "oct 10 to oct 25" asked on
+    Oct 19 and "monday to friday" asked on a Wednesday are the ranges in progress.
+    """
+    bases = (today - timedelta(days=366), today - timedelta(days=6), today) if _FLOATING_DAY.fullmatch(m.group(1)) else (today,)
+    candidates = []
+    for base in bases:
+        first = _resolve(m.group(1), base)
+        last = _resolve(m.group(2), first.start) if first else None
+        if first and last and last.end >= first.start:
+            candidates.append(DateRange(first.start, last.end))
+    for candidate in candidates:
+        if candidate.end >= today:
+            return candidate
+    return candidates[-1] if candidates else None
+
+
+def _week_weekday(m, today):
+    # "next week friday", "friday next week"
+    modifier, target = m.group(1) or m.group(4), WEEKDAYS.index(m.group(2) or m.group(3))
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=_offset(modifier))
+    return _day(monday + timedelta(days=target))
+
+
+def _year(m, today):
+    year = today.year + _offset(m.group(1))
+    return DateRange(date(year, 1, 1), date(year, 12, 31))
+
+
+def _explicit_year(m, today):
+    year = int(m.group(1))
+    return DateRange(date(year, 1, 1), date(year, 12, 31))
+
+
+# (compiled pattern, resolver) in priority order: when scanning free text the first
+# rule that matches anywhere wins, so specific days beat the weeks and months around them.
+RULES = [
+    (re.compile(rf'\bbetween\s+({_DAY_EXPRESSION})\s+and\s+({_DAY_EXPRESSION})\b'), _date_span),
+    (re.compile(rf'\b(?:from\s+)?({_DAY_EXPRESSION})\s*(?:to|until|till|through|thru|-)\s*({_DAY_EXPRESSION})\b'), _date_span),
+    (re.compile(rf'\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\s*(?:to|until|till|through|thru|-)\s*(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b'), _month_day_span),
+    (re.compile(rf'\b(?:(next|this|last)\s+week\s+(?:on\s+)?({_WEEKDAY})|({_WEEKDAY})\s+(?:of\s+)?(next|this|last)\s+week)\b'), _week_weekday),
+    (re.compile(r'\b(yesterday|today|tonight|tomorrow)\b'), _day_word),
+    (re.compile(rf'\b(?:(next|this|last)\s+)?({_WEEKDAY})\b'), _weekday),
+    (re.compile(r'\b\d{4}-\d{2}-\d{2}\b'), _iso),
+    (re.compile(rf'\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b'), _month_day),
+    (re.compile(rf'\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\b(?:,?\s+(\d{{4}}))?'), _day_month),
+    (re.compile(rf'\bin\s+(\d+)\s+{_UNIT}\b'), _relative),
+    (re.compile(rf'\b(\d+)\s+{_UNIT}\s+ago\b'), _ago),
+    (re.compile(rf'\b(next|past|last)\s+(\d+)\s+{_UNIT}\b'), _span),
+    (re.compile(r'\b(?:(next|this|last|previous)\s+)?weekend\b'), _weekend),
+    (re.compile(r'\b(?:(next|this|last|previous)\s+)?week\b'), _week),
+    (re.compile(r'\b(?:(next|this|last|previous)\s+)?month\b'), _month),
+    # A bare "may"/"march" is too often a verb: month names need "in"/"of" or a year
+    (re.compile(rf'\b(?:in|of|for|during)\s+({_MONTH})\b(?:\s+(\d{{4}}))?'), _named_month),
+    (re.compile(rf'\b({_MONTH})\s+(\d{{4}})\b'), _named_month),
+    (re.compile(r'\b(?:(next|this|last|previous)\s+)?year\b'), _year),
+    (re.compile(r'\b(?:in|for|of|during)\s+((?:19|20)\d{2})\b'), _explicit_year),
+]
+
+# Whole expressions that only make sense on their own (the AI's `date` param, not user text)
+EXPRESSION_RULES = [
+    (re.compile(rf'({_MONTH})'), _bare_month),
+    (re.compile(r'(\d{4})'), _explicit_year),
+]
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def local_today(tz=None) -> date:
+    return datetime.now(tz or user_timezone(None)).date()
+
+
+def _normalize(text) -> str:
+    return _WHITESPACE.sub(' ', str(text).strip().lower())
+
+
+def _apply(resolver, m, today: date) -> Optional[DateRange]:
+    try:
+        return resolver(m, today)
+    except (ValueError, OverflowError):
+        # Offsets past the calendar's range ('in 99999 years') are not dates
+        return None
+
+
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def _resolve(expression: str, today: date) -> Optional[DateRange]:
+    for pattern, resolver in RULES:
+        m = pattern.fullmatch(expression)
+        if m:
+            return _apply(resolver, m, today)
+    for pattern, resolver in EXPRESSION_RULES:
+        m = pattern.fullmatch(expression)
+        if m:
+            return _apply(resolver, m, today)
+    return None
+
+
+def resolve_range(expression, tz=None, today: date = None) -> Optional[DateRange]:
+    """
+    Resolve a whole date expression ('2025-10-23', 'next friday', 'next week',
+    'march 2026', 'in 3 days', ...) to a DateRange, or None if it isn't one.
+    `today` defaults to the current date in `tz` (the server timezone if None).
+    """
+    if not expression:
+        return None
+    return _resolve(_normalize(expression), today or local_today(tz))
+
+
+def resolve_date(expression, tz=None, today: date = None) -> Optional[date]:
+    """Like resolve_range, for expressions naming a single day; None for wider ranges."""
+    found = resolve_range(expression, tz, today)
+    return found.start if found and found.is_single_day else None
+
+
+def search_expression(text: str):
+    """
+    The match for the first date expression in already-normalized (lowercase,
+    single-spaced) text, by RULES precedence; None if there is none.
+    """
+    for pattern, _ in RULES:
+        m = pattern.search(text)
+        if m:
+            return m
+    return None
+
+
+def find_range(text, tz=None, today: date = None) -> Optional[DateRange]:
+    """The first date expression found in free text (see RULES for precedence), resolved."""
+    m = search_expression(_normalize(text)) if text else None
+    return _resolve(m.group(0), today or local_today(tz)) if m else None
+
+
+def find_date(text, tz=None, today: date = None) -> Optional[date]:
+    """Like find_range, for text naming a single day; None otherwise."""
+    found = find_range(text, tz, today)
+    return found.start if found and found.is_single_day else None
@@ -0,0 +1,196 @@
+from datetime import datetime
+from django.http import JsonResponse
+from home_page.models import Message
+from .base import ActionContext, ActionHandler, ActionResult
+from .dates import DateRange, resolve_range
+from .parsing import CLOCK_TIME, user_timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DeleteEventHandler(ActionHandler):
+    """Find the event(s) to delete and ask the user to confirm."""
+    action = 'delete_event'
+
+    def handle(self, ctx: ActionContext):
+        convo, gcal, params = ctx.convo, ctx.gcal, ctx.params
+        client_tz_name = ctx.client_tz_name
+        response_type, agent_response_text, response_content = ctx.response_type, ctx.response_text, ctx.response_content
+
+        norm = dict(params or {})
+        summary_query = norm.get('summary')
+        date_str = norm.get('date') or norm.get('start_date')
+        time_str = norm.get('start') or norm.get('start_time')
+        
+        tz = user_timezone(client_tz_name)
+        
+        delete_all = norm.get('delete_all')
+        start_date_str = norm.get('start_date')
+        end_date_str = norm.get('end_date')
+        
+        # Determine time range
+        found = None
+        if start_date_str and end_date_str:
+            first, last = resolve_range(start_date_str, tz), resolve_range(end_date_str, tz)
+            if first and last:
+                found = DateRange(first.start, last.end)
+        if not found and date_str:
+            found = resolve_range(date_str, tz)
+        if not found:
+            found = resolve_range('today', tz) # Fallback to today
+
+        target_date = found.start if found.is_single_day else f"{found.start} to {found.end}" # For display
+        range_start = datetime.combine(found.start, datetime.min.time()).isoformat() + 'Z'
+        range_end = datetime.combine(found.end, datetime.max.time()).isoformat() + 'Z'
+
+        events = gcal.list_events(time_min=range_start, time_max=range_end)
+        
+        # Filter by summary (fuzzy match) unless delete_all is True
+        matches = []
+        if delete_all:
+            matches = events
+        else:
+            for event in events:
+                event_summary = event.get('summary', '')
+                if summary_query and summary_query.lower() in event_summary.lower():
+                    matches.append(event)
+                elif not summary_query:
+                    pass
+        
+        if delete_all and matches:
+            # Special handling for bulk deletion confirmation
+            response_type = 'event_deletion_confirmation' # Re-using this type might need adjustment or a new type
+
+            agent_message = f"I found {len(matches)} events on {target_date}. Are you sure you want to delete ALL of them?"
+
+            all_ids = ",".join([e['id'] for e in matches])
+            response_content = {
+                'event_id': all_ids, 
+                'summary': f"{len(matches)} events",
+                'start': matches[0]['start'], # Just show first one's time or range
+                'end': matches[-1]['end'],
+                'action': 'delete_bulk' 
+            }
+          
+            draft_msg = Message.objects.create(
+                conversation=convo,
+                sender='agent',
+                text=agent_message,
+                message_type='event_deletion_confirmation',
+                content=response_content,
+            )
+            response_content['message_id'] = draft_msg.id
+            
+            draft_msg.content = response_content
+            draft_msg.save()
+            
+            agent_response_text = agent_message
+            
+            return JsonResponse({
+                'type': response_type,
+                'response': agent_message,
+                'content': response_content,
+                'message_id': draft_msg.id
+            })
+                
+        # If time is provided, filter by time as well
+        if time_str and matches:
+            try:
+                # Normalize time_str to HH:MM if possible
+                filter_hour = None
+                filter_minute = None
+                
+                # Simple 12h/24h parsing
+                ts = time_str.lower().replace(' ', '')
+                # Match 10am, 10:30pm, 14:00, 14
+                time_match = CLOCK_TIME.match(ts)
+                if time_match:
+                    h = int(time_match.group(1))
+                    m = int(time_match.group(2) or 0)
+                    ampm = time_match.group(3)
+                    
+                    if ampm:
+                        if ampm == 'pm' and h < 12:
+                            h += 12
+                        elif ampm == 'am' and h == 12:
+                            h = 0
+                    
+                    filter_hour = h
+                    filter_minute = m
+                    
+                    # Filter matches
+                    time_filtered = []
+                    for evt in matches:
+                        # event['start'] is a dict with 'dateTime' or 'date'
+                        start_dt_str = evt.get('start', {}).get('dateTime')
+                        if start_dt_str:
+                            evt_dt = datetime.fromisoformat(start_dt_str.replace('Z', '+00:00'))
+                            
+                            # Convert event time to local user time (client_tz)
+                            evt_dt_local = evt_dt.astimezone(tz)
+                            
+                            # fuzzy match: within 15 mins?
+                            if evt_dt_local.hour == filter_hour and abs(evt_dt_local.minute - filter_minute) < 15:
+                                time_filtered.append(evt)
+                    
+                    if time_filtered:
+                        matches = time_filtered
+            except Exception as e:
+                logger.error(f"Error filtering by time: {e}")
+                error_text = "I couldn't filter by the specific time provided. Please try checking the time format (e.g., '2pm' or '14:00')."
+                Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                return JsonResponse({
+                    'type': 'text',
+                    'response': error_text,
+                    'content': {},
+                    'intent': 'calendar',
+                    'convo_id': str(convo.id)
+                })
+        match_index = norm.get('match_index')
+        
+        # Sort matches by start time to ensure consistent ordering for "first", "second", etc.
+        matches.sort(key=lambda x: x.get('start', {}).get('dateTime') or x.get('start', {}).get('date') or '')
+
+        if match_index and isinstance(match_index, int) and matches:
+            idx = match_index - 1 # 1-based index from AI
+            if 0 <= idx < len(matches):
+                matches = [matches[idx]]
+
+        if len(matches) == 1:
+            event = matches[0]
+            # Generate confirmation
+            response_type = 'event_deletion_confirmation'
+            response_content = {
+                'event_id': event['id'],
+                'summary': event['summary'],
+                'start': event['start'],
+                'end': event['end'],
+                'action': 'delete'
+            }
+            agent_message = f"Are you sure you want to delete '{event['summary']}'?"
+            
+            # Persist draft
+            draft_msg = Message.objects.create(
+                conversation=convo,
+                sender='agent',
+                text=agent_message,
+                message_type='event_deletion_confirmation',
+                content=response_content,
+            )
+            response_content['message_id'] = draft_msg.id
+            agent_response_text = agent_message
+
+        elif len(matches) > 1:
+            response_type = 'text'
+            agent_response_text = f"I found multiple events matching '{summary_query}'. Which one would you like to delete?"
+            # Persist error
+            Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+            
+        else:
+            response_type = 'text'
+            agent_response_text = f"I couldn't find any event matching '{summary_query}' on {target_date}."
+            # Persist error
+            Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+
+        return ActionResult(response_type, agent_response_text, response_content)
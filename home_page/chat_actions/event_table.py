@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+
+def _parse(value) -> Optional[datetime]:
+    """Google's dateTime/date strings ('...Z', offsets, plain dates) as datetimes, or None."""
+    if not value:
+        return None
+    if isinstance(value, str) and value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def clock_label(hour: int, minute: int) -> str:
+    """'9:05 AM', as strftime('%I:%M %p').lstrip('0') would render it."""
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+@dataclass
+class EventTable:
+    """
+    A list of Google Calendar events as parallel columns, parsed and localized once.
+    Row i describes events[i]; times with an offset are converted to the display
+    timezone, all-day dates (and naive times) are kept as they are. Unparseable
+    times are None, and such events have no day.
+    """
+    summaries: list
+    starts: list
+    ends: list
+    days: list
+
+    @classmethod
+    def from_events(cls, events, tz) -> 'EventTable':
+        localized = {}
+
+        def localize(value):
+            # Recurring instances and back-to-back meetings repeat the same strings
+            if value not in localized:
+                dt = _parse(value)
+                localized[value] = dt.astimezone(tz) if dt and dt.tzinfo else dt
+            return localized[value]
+
+        summaries, starts, ends, days = [], [], [], []
+        for ev in events:
+            start, end = ev.get('start') or {}, ev.get('end') or {}
+            start_dt = localize(start.get('dateTime') or start.get('date'))
+            summaries.append(ev.get('summary') or 'Untitled')
+            starts.append(start_dt)
+            ends.append(localize(end.get('dateTime') or end.get('date')))
+            days.append(start_dt.date() if start_dt else None)
+        return cls(summaries, starts, ends, days)
+
+    def __len__(self) -> int:
+        return len(self.summaries)
+
+    def rows_by_day(self) -> dict:
+        """{day: [row, ...]} in chronological order of day; rows keep their input order."""
+        grouped = {}
+        for row, day in enumerate(self.days):
+            if day is not None:
+                grouped.setdefault(day, []).append(row)
+        return {day: grouped[day] for day in sorted(grouped)}
+
+    def time_label(self, row: int) -> str:
+        """'9:00 AM - 10:30 AM' for a row ('9:00 AM' without an end, '' without a start)."""
+        start, end = self.starts[row], self.ends[row]
+        if start and end:
+            return f"{clock_label(start.hour, start.minute)} - {clock_label(end.hour, end.minute)}"
+        if start:
+            return clock_label(start.hour, start.minute)
+        return ''
+
+
+def day_heading(day: date, today: date) -> str:
+    """'Monday, January 7', plus ' (Today)' for today."""
+    label = day.strftime('%A, %B %d').replace(' 0', ' ')
+    return label + " (Today)" if day == today else label
@@ -0,0 +1,103 @@
+from home_page.models import Message
+from .base import ActionContext, ActionHandler, ActionResult
+from .dates import find_range, resolve_range
+from .parsing import user_timezone
+
+
+class FindFreeSlotsHandler(ActionHandler):
+    """Answer availability questions from the calendar's busy ranges."""
+    action = 'find_free_slots'
+
+    def handle(self, ctx: ActionContext):
+        convo, gcal, params = ctx.convo, ctx.gcal, ctx.params
+        user_input, client_tz_name = ctx.user_input, ctx.client_tz_name
+        response_type, agent_response_text, response_content = ctx.response_type, ctx.response_text, ctx.response_content
+
+        # Normalize AI params to expected API
+        norm = dict(params or {})
+        # Map synonyms
+        if 'date' in norm and 'start_date' not in norm and 'start' not in norm:
+            norm['start_date'] = norm['date']
+        if 'date' in norm and 'end_date' not in norm and 'end' not in norm:
+            norm['end_date'] = norm['date']
+        if 'start' in norm and 'start_date' not in norm:
+            norm['start_date'] = norm['start']
+        if 'end' in norm and 'end_date' not in norm:
+            norm['end_date'] = norm['end']
+
+        start_date = norm.get('start_date')
+        end_date   = norm.get('end_date')
+        duration   = norm.get('duration', 60)
+        attendees  = norm.get('attendees')
+
+        tz = user_timezone(client_tz_name)
+
+        # Coerce ISO datetimes into date-only strings, and expressions like "next week" into their first/last day
+        def _date_only(val, edge):
+            if isinstance(val, str) and 'T' in val:
+                return val.split('T', 1)[0]
+            found = resolve_range(val, tz)
+            return getattr(found, edge).isoformat() if found else val
+
+        start_date = _date_only(start_date, 'start')
+        end_date   = _date_only(end_date, 'end')
+
+        # If no explicit date provided, infer from user's text like "Thursday", "next Thursday" or "next week"
+        if not start_date and not end_date:
+            inferred = find_range(user_input, tz)
+            if inferred:
+                start_date = inferred.start.isoformat()
+                end_date = inferred.end.isoformat()
+            else:
+                # Cannot proceed – ask for a date/range and exit this action
+                response_type = 'text'
+                agent_response_text = (
+                    "Please share a date (e.g. 2025-10-23) or a start and end date so I can check availability."
+                )
+        if start_date or end_date:
+            # If only one provided, assume single-day window
+            if start_date and not end_date:
+                end_date = start_date
+            if end_date and not start_date:
+                start_date = end_date
+
+            try:
+                busy_ranges = gcal.find_free_slots(
+                    start_date=start_date,
+                    end_date=end_date,
+                    duration=duration,
+                    attendees=attendees,
+                )
+                # Simple human summary
+                summary = (
+                    "Your calendars are completely free between those dates!"
+                    if not busy_ranges else
+                    f"I found {len(busy_ranges)} busy periods.\n" +
+                    "\n".join(f"- {b['start']} – {b['end']}" for b in busy_ranges[:3])
+                )
+                response_type = 'text'
+                agent_response_text = summary
+                # Persist the agent text so it survives reloads
+                try:
+                    Message.objects.create(
+                        conversation=convo,
+                        sender='agent',
+                        text=agent_response_text,
+                        message_type='text',
+                        content=None,
+                    )
+                except Exception:
+                    pass
+            except Exception as e:
+                response_type = 'text'
+                agent_response_text = "Sorry, I couldn't check availability at this time."
+                # Persist error messages so they survive reloads
+                Message.objects.create(
+                    conversation=convo,
+                    sender='agent',
+                    text=agent_response_text,
+                    message_type='text',
+                    content=None,
+                )
+
+        return ActionResult(response_type, agent_response_text, response_content)
@@ -0,0 +1,385 @@
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.urls import reverse
+from home_page.models import Message
+from home_page.services.followups import defer
+from home_page.services.listing_cache import get_listing, listing_cache_key, store_listing
+from .base import ActionContext, ActionHandler, ActionResult
+from .dates import DateRange, find_range, local_today, resolve_range
+from .event_table import EventTable, day_heading
+from .parsing import user_timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def flourish_mode() -> str:
+    """
+    How a listing's AI title and closing remark are produced (settings.LIST_EVENTS_FLOURISHES):
+    'inline' waits for both before replying; 'deferred' replies with the template title and
+    appends the closing remark to the message once it is ready; 'off' never asks Claude.
+    """
+    return getattr(settings, 'LIST_EVENTS_FLOURISHES', 'deferred')
+
+
+def closing_remark(ai_agent, events_by_day, range_type, start_date, end_date, tz, count):
+    """A friendly 1-2 sentence AI remark about the listed events, or None."""
+    # Build a summary of the events for the AI
+    event_summary_parts = []
+    for day, day_events in sorted(events_by_day.items()):
+        day_name = day.strftime('%A')
+        event_count = len(day_events)
+        event_titles = [ev.get('summary', 'Untitled') for ev in day_events[:3]]
+        event_summary_parts.append(f"{day_name}: {event_count} event(s) - {', '.join(event_titles)}")
+
+    event_summary = "; ".join(event_summary_parts[:7])  # Limit to prevent token overflow
+
+    # Determine if events are in past, present, or future
+    today_date = datetime.now(tz).date()
+    try:
+        start_dt = datetime.fromisoformat(start_date + 'T00:00:00').date()
+        end_dt = datetime.fromisoformat(end_date + 'T00:00:00').date()
+
+        if end_dt < today_date:
+            time_context = "PAST events (already happened)"
+        elif start_dt > today_date:
+            time_context = "FUTURE events (upcoming)"
+        elif start_dt == today_date and end_dt == today_date:
+            time_context = "TODAY's events (current day)"
+        else:
+            time_context = "events spanning PAST, PRESENT, and/or FUTURE"
+    except:
+        time_context = "events"
+
+    ai_prompt = f"""The user just viewed their {range_type} schedule with {count} total event(s). 
+
+        CRITICAL: These are {time_context}. Your remark MUST reflect the correct time perspective.
+
+        Events breakdown: {event_summary}
+
+        Generate a friendly, personalized 1-2 sentence closing remark that:
+        - Uses appropriate tense: past events = "you had/were busy", present = "you have", future = "you've got/ahead"
+        - For PAST events, reflect on what they had scheduled (e.g., "Looks like you had a packed Monday")
+        - For FUTURE events, look forward to what's coming (e.g., "You've got a busy day ahead")
+        - For TODAY, use present tense (e.g., "You have a full schedule today")
+        - Acknowledges their schedule (busy/light/balanced)
+        - Mentions specific patterns if notable (e.g., "Friday was packed", "weekend is free")
+        - Offers help with scheduling
+        - Keep it warm and conversational
+        - Add an emoji if appropriate
+
+        Do not repeat the event list. Just provide the closing remark."""
+
+    closing_messages = [{"role": "user", "content": ai_prompt}]
+    closing_message = ai_agent._get_claude_chat_response(
+        closing_messages,
+        temperature=0.7,
+        max_tokens=100
+    )
+    return closing_message.strip() if closing_message and closing_message.strip() else None
+
+
+def append_closing_remark(message_id, cache_key, listing, *remark_args):
+    """Deferred mode: add the closing remark to an already-sent listing (message and cache)."""
+    remark = closing_remark(*remark_args)
+    if remark:
+        text = listing + "\n\n" + remark
+        Message.objects.filter(id=message_id).update(text=text)
+        store_listing(cache_key, text)
+    return remark
+
+
+class ListEventsHandler(ActionHandler):
+    """List the events in the requested range, grouped by day."""
+    action = 'list_events'
+
+    def handle(self, ctx: ActionContext):
+        convo, gcal, params = ctx.convo, ctx.gcal, ctx.params
+        ai_agent, user_input, client_tz_name = ctx.ai_agent, ctx.user_input, ctx.client_tz_name
+        response_type, agent_response_text, response_content = ctx.response_type, ctx.response_text, ctx.response_content
+
+        # List events within a date range. Support simple synonyms and NL dates.
+        norm = dict(params or {})
+        # Map simple synonyms
+        if 'date' in norm and 'start_date' not in norm and 'end_date' not in norm:
+            norm['start_date'] = norm['date']
+            norm['end_date'] = norm['date']
+        if 'start' in norm and 'start_date' not in norm:
+            norm['start_date'] = norm['start']
+        if 'end' in norm and 'end_date' not in norm:
+            norm['end_date'] = norm['end']
+
+        raw_start_date = (norm.get('start_date') or '').strip() or None
+        raw_end_date   = (norm.get('end_date') or '').strip() or None
+
+        tz = user_timezone(client_tz_name)
+
+        # The range the user's own words name ("next week", "tomorrow", "in march"); a bare
+        # "schedule" means this week.
+        text_lc = (user_input or '').lower()
+        text_range = find_range(text_lc, tz)
+        if not text_range and 'schedule' in text_lc:
+            text_range = resolve_range('this week', tz)
+
+        # Dates provided by AI win; an expression naming a range spans all of it
+        found = None
+        first = resolve_range(raw_start_date, tz)
+        last = resolve_range(raw_end_date, tz) or first
+        if first and last.end >= first.start:
+            found = DateRange(first.start, last.end)
+
+        # If AI provided dates wildly far from "now" (> 90 days) but the text names a range, trust the text
+        today_local = local_today(tz)
+        if found and text_range and abs((found.start - today_local).days) > 90:
+            found = text_range
+
+        query = norm.get('query')
+
+        if not found:
+            # Default to current year as per user request
+            found = text_range or DateRange(date(today_local.year, 1, 1), date(today_local.year, 12, 31))
+        start_date, end_date = found.start.isoformat(), found.end.isoformat()
+
+        queries = norm.get('queries')
+
+        # Build RFC3339 boundaries in UTC 'Z'. Keep it simple by assuming all-day window(s)
+        time_min = f"{start_date}T00:00:00Z"
+        time_max = f"{end_date}T23:59:59Z"
+        try:
+            # Repeated questions about the same range are answered from the cache (see listing_cache)
+            cache_key = listing_cache_key(ctx.user.id, start_date, end_date, query, queries, tz, local_today(tz))
+            flourishes = flourish_mode()
+            deferred_remark = None
+            summary = get_listing(cache_key)
+            if summary is None:
+                items = gcal.list_events('primary', time_min=time_min, time_max=time_max, q=query, queries=queries)
+
+                if not items:
+                    when_text = start_date if start_date == end_date else f"{start_date} to {end_date}"
+                    summary = f"You have no events on {when_text}."
+                else:
+                    # Parse, localize and group every event once; formatting reads from the columns
+                    table = EventTable.from_events(items, tz)
+                    rows_by_day = table.rows_by_day()
+                    events_by_day = {day: [items[row] for row in rows] for day, rows in rows_by_day.items()}
+                
+                    # Determine the time range type (day/week/month/year)
+                    try:
+                        start_dt = datetime.fromisoformat(start_date + 'T00:00:00').date()
+                        end_dt = datetime.fromisoformat(end_date + 'T00:00:00').date()
+                        day_span = (end_dt - start_dt).days + 1
+                    
+                        # Classify the range
+                        if day_span == 1:
+                            range_type = 'day'
+                        elif day_span <= 7:
+                            range_type = 'week'
+                        elif day_span <= 31:
+                            range_type = 'month'
+                        else:
+                            range_type = 'year'
+                    except Exception:
+                        range_type = 'week'  # Default fallback
+                
+                    # Build formatted output
+                    lines = []
+                
+                    # Add header with AI-generated title
+                    try:
+                        start_dt = datetime.fromisoformat(start_date + 'T00:00:00').date()
+                        end_dt = datetime.fromisoformat(end_date + 'T00:00:00').date()
+                    
+                        # Generate AI title based on context
+                        title_generated = False
+                        if flourishes == 'inline':
+                            try:
+                                # Prepare context for AI
+                                search_context = ""
+                                if queries and isinstance(queries, list) and len(queries) > 0:
+                                    if len(queries) == 1:
+                                        search_context = f"searching for '{queries[0]}'"
+                                    elif len(queries) == 2:
+                                        search_context = f"searching for '{queries[0]}' and '{queries[1]}'"
+                                    else:
+                                        # Build quoted terms separately to avoid f-string backslash issue
+                                        quoted_terms = ', '.join(f"'{q}'" for q in queries[:-1])
+                                        search_context = f"searching for {quoted_terms}, and '{queries[-1]}'"
+                                elif query:
+                                    search_context = f"searching for '{query}'"
+                        
+                                # Format date range
+                                if start_dt == end_dt:
+                                    date_context = start_dt.strftime('%B %d, %Y')
+                                elif start_dt.year == end_dt.year:
+                                    if start_dt.month == end_dt.month:
+                                        date_context = f"{start_dt.strftime('%B %d')}-{end_dt.day}, {start_dt.year}"
+                                    else:
+                                        date_context = f"{start_dt.strftime('%B %d')} - {end_dt.strftime('%B %d, %Y')}"
+                                else:
+                                    date_context = f"{start_dt.strftime('%B %Y')} - {end_dt.strftime('%B %Y')}"
+                        
+                                # Build AI prompt
+                                ai_prompt = f"""Generate a short, natural title (max 10 words) for a calendar event list.
+
+                                    Context:
+                                    - User's query: "{user_input}"
+                                    - {search_context if search_context else "showing all events"}
+                                    - Date range: {date_context}
+                                    - Found {len(items)} event(s)
+
+                                    Rules:
+                                    - Start with the calendar emoji 📅
+                                    - Be concise and natural
+                                    - Include the search terms if present
+                                    - Include the time period
+                                    - Examples:
+                                    * "📅 Bible study and Miracle hour - December 2025 to April 2026"
+                                    * "📅 Bible study in 2025"
+                                    * "📅 Your schedule for December 1-7, 2025"
+
+                                    Generate only the title, nothing else:"""
+                        
+                                # Call AI to generate title
+                                ai_title = ai_agent._get_claude_chat_response(
+                                    [{"role": "user", "content": ai_prompt}],
+                                    system_prompt="You are a helpful assistant that generates concise, natural calendar titles.",
+                                    temperature=0.7,
+                                    max_tokens=50
+                                )
+                        
+                                if ai_title and ai_title.strip():
+                                    # Clean up the title (remove quotes if present)
+                                    ai_title = ai_title.strip().strip('"').strip("'")
+                                    lines.append(f"{ai_title}\n")
+                                    title_generated = True
+                            except Exception as e:
+                                logger.error(f"Error generating AI title: {e}")
+                                # Non-critical, just log it. No user message needed as it falls back to template. Fall through to template-based fallback
+                    
+                        # Fallback to template-based title if AI generation failed
+                        if not title_generated:
+                            title_prefix = "📅 "
+                            if queries and isinstance(queries, list) and len(queries) > 0:
+                                # User searched for specific events
+                                if len(queries) == 1:
+                                    search_term = queries[0].capitalize()
+                                elif len(queries) == 2:
+                                    search_term = f"{queries[0].capitalize()} and {queries[1]}"
+                                else:
+                                    search_term = f"{', '.join(q.capitalize() for q in queries[:-1])}, and {queries[-1]}"
+                            
+                                # Add contextual date range
+                                if range_type == 'year':
+                                    lines.append(f"{title_prefix}{search_term} in {start_dt.strftime('%Y')}\n")
+                                elif range_type == 'month':
+                                    lines.append(f"{title_prefix}{search_term} in {start_dt.strftime('%B %Y')}\n")
+                                elif range_type == 'week':
+                                    if start_dt.month == end_dt.month and start_dt.year == end_dt.year:
+                                        date_range = f"{start_dt.strftime('%B')} {start_dt.day}-{end_dt.day}, {start_dt.year}"
+                                    else:
+                                        date_range = f"{start_dt.strftime('%B %d')} - {end_dt.strftime('%B %d, %Y')}"
+                                    lines.append(f"{title_prefix}{search_term} - {date_range}\n")
+                                else:  # day
+                                    today_date = datetime.now(tz).date()
+                                    day_label = "today" if start_dt == today_date else f"on {start_dt.strftime('%A, %B %d, %Y')}"
+                                    lines.append(f"{title_prefix}{search_term} {day_label}\n")
+                            elif query:
+                                # User searched with a single query string
+                                search_term = query.capitalize()
+                                if range_type == 'year':
+                                    lines.append(f"{title_prefix}{search_term} in {start_dt.strftime('%Y')}\n")
+                                elif range_type == 'month':
+                                    lines.append(f"{title_prefix}{search_term} in {start_dt.strftime('%B %Y')}\n")
+                                elif range_type == 'week':
+                                    if start_dt.month == end_dt.month and start_dt.year == end_dt.year:
+                                        date_range = f"{start_dt.strftime('%B')} {start_dt.day}-{end_dt.day}, {start_dt.year}"
+                                    else:
+                                        date_range = f"{start_dt.strftime('%B %d')} - {end_dt.strftime('%B %d, %Y')}"
+                                    lines.append(f"{title_prefix}{search_term} - {date_range}\n")
+                                else:  # day
+                                    today_date = datetime.now(tz).date()
+                                    day_label = "today" if start_dt == today_date else f"on {start_dt.strftime('%A, %B %d, %Y')}"
+                                    lines.append(f"{title_prefix}{search_term} {day_label}\n")
+                            else:
+                                # No search query - use generic title
+                                if range_type == 'day':
+                                    today_date = datetime.now(tz).date()
+                                    day_label = "Today's Schedule" if start_dt == today_date else f"Schedule for {start_dt.strftime('%A, %B %d, %Y')}"
+                                    lines.append(f"{title_prefix}{day_label}\n")
+                                elif range_type == 'week':
+                                    if start_dt.month == end_dt.month and start_dt.year == end_dt.year:
+                                        date_range = f"{start_dt.strftime('%B')} {start_dt.day}-{end_dt.day}, {start_dt.year}"
+                                    else:
+                                        date_range = f"{start_dt.strftime('%B %d')} - {end_dt.strftime('%B %d, %Y')}"
+                                    lines.append(f"{title_prefix}Your Weekly Schedule - {date_range}\n")
+                                elif range_type == 'month':
+                                    lines.append(f"{title_prefix}Your Schedule for {start_dt.strftime('%B %Y')}\n")
+                                else:  # year
+                                    lines.append(f"{title_prefix}Your Schedule for {start_dt.strftime('%Y')}\n")
+                    except Exception:
+                        lines.append("📅 Your Schedule\n")
+                
+                    # Day and week views also list the days without events
+                    days = list(rows_by_day)
+                    if range_type in ['day', 'week']:
+                        days = sorted(set(days) | {found.start + timedelta(days=i) for i in range(found.days)})
+                    today_date = datetime.now(tz).date()
+
+                    for day in days:
+                        lines.append(f"**{day_heading(day, today_date)}**")
+                        rows = rows_by_day.get(day)
+                        if rows:
+                            lines.extend(f"• {table.time_label(row)}: {table.summaries[row]}" for row in rows)
+                        else:
+                            lines.append("*(No events scheduled)*")
+                        lines.append("")  # Empty line between days
+                
+                    summary = "\n".join(lines).strip()
+                
+                    # AI closing remark: before replying (inline), or appended to the message once ready (deferred)
+                    remark_args = (ai_agent, events_by_day, range_type, start_date, end_date, tz, len(items))
+                    if flourishes == 'inline':
+                        try:
+                            closing_message = closing_remark(*remark_args)
+                            if closing_message:
+                                summary = summary + "\n\n" + closing_message
+                        except Exception as e:
+                            logger.error(f"Failed to generate AI closing message: {e}")
+                            Message.objects.create(conversation=convo, sender='agent', text="I encountered a minor issue generating the summary.", message_type='text')
+                            # Continue without closing message if AI fails
+                    elif flourishes == 'deferred':
+                        deferred_remark = remark_args
+
+                store_listing(cache_key, summary)
+
+            response_type = 'text'
+            agent_response_text = summary
+            try:
+                listing_msg = Message.objects.create(
+                    conversation=convo,
+                    sender='agent',
+                    text=agent_response_text,
+                    message_type='text',
+                    content=None,
+                )
+                if deferred_remark:
+                    defer(listing_msg.id, append_closing_remark, listing_msg.id, cache_key, summary, *deferred_remark)
+                    followup_url = reverse('home_page:message_followup', args=[convo.id, listing_msg.id])
+                    response_content = {**(response_content or {}), 'followup_url': followup_url}
+            except Exception:
+                # The listing still goes back to the client; only its history entry (and follow-up) is lost
+                logger.exception(f"Failed to persist listing for conversation {convo.id}")
+        except Exception as e:
+            logger.error(f"Error listing events: {e}", exc_info=True)
+            response_type = 'text'
+            agent_response_text = "Sorry, I couldn't list your events at this time."
+
+            Message.objects.create( # for persistence of errors after reloads
+                conversation=convo,
+                sender='agent',
+                text=agent_response_text,
+                message_type='text',
+                content=None,
+            )
+
+        return ActionResult(response_type, agent_response_text, response_content)
@@ -0,0 +1,117 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.utils.timezone import get_current_timezone
+import re
+
+# Dates are interpreted in dates.py; these are the time-of-day and duration formats
+ISO_MINUTES = re.compile(r'^(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2})(?:([+-]\d{2}:\d{2})?)$')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+CLOCK_DURATION = re.compile(r"^(\d+):(\d{2})$")
+UNIT_DURATION = re.compile(r"^(\d+(?:\.\d+)?)\s*(hour|hours|hr|h|minute|minutes|mins|min|m)s?$")
+TIME_OF_DAY = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$")
+# Loose clock time at the start of a string: 10am, 10:30pm, 14:00, 14
+CLOCK_TIME = re.compile(r'(\d{1,2})(?::(\d{2}))?([ap]m)?')
+
+# Times of day inside a message: "by 9 to 10am", "from 2pm to 3pm", "2-3pm", "by 8am", "at 9:30"
+_CLOCK = r"\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
+BY_TO_RANGE = re.compile(rf"\bby\s+({_CLOCK})\s+to\s+({_CLOCK})\b")
+FROM_TO_RANGE = re.compile(rf"\bfrom\s+({_CLOCK})\s+to\s+({_CLOCK})\b")
+SIMPLE_RANGE = re.compile(rf"\b({_CLOCK})\s+(?:to|-)\s+({_CLOCK})\b")
+BY_TIME = re.compile(rf"\bby\s+({_CLOCK})\b")
+AT_TIME = re.compile(rf"\bat\s+({_CLOCK})\b")
+
+
+def user_timezone(client_tz_name):
+    """The client's IANA timezone, else settings.TIME_ZONE, else Django's current timezone."""
+    try:
+        return ZoneInfo(client_tz_name or getattr(settings, 'TIME_ZONE', 'UTC') or 'UTC')
+    except Exception:
+        return get_current_timezone()
+
+
+def parse_dt(val: str):
+    """Parse ISO-ish datetimes ('2025-10-23 09:00', '...Z', plain dates) into a datetime, or None."""
+    if not val:
+        return None
+    s = str(val).strip()
+    # Normalize space separator to 'T'
+    s = s.replace(' ', 'T')
+    # Support trailing 'Z'
+    if s.endswith('Z'):
+        try:
+            return datetime.fromisoformat(s.replace('Z', '+00:00'))
+        except Exception:
+            pass
+    # Add seconds if missing (e.g. 2025-10-23T09:00)
+    m = ISO_MINUTES.match(s)
+    if m:
+        s2 = f"{m.group(1)}T{m.group(2)}:00{m.group(3) or ''}"
+        try:
+            return datetime.fromisoformat(s2)
+        except Exception:
+            pass
+    # Plain date (all-day)
+    if ISO_DATE.fullmatch(s):
+        try:
+            return datetime.fromisoformat(s + 'T00:00:00')
+        except Exception:
+            return None
+    try:
+        return datetime.fromisoformat(s)
+    except Exception:
+        return None
+
+
+def parse_duration(val):
+    """Parse duration strings like '2 hours', '90 minutes', '1.5 hours', '3:00', or plain numbers. Returns minutes as int."""
+    if not val:
+        return None
+    s = str(val).strip().lower()
+    # Try plain number first
+    try:
+        return int(float(s))
+    except ValueError:
+        pass
+    # Handle "H:MM" format (e.g., "3:00" means 3 hours, "2:30" means 2.5 hours)
+    m = CLOCK_DURATION.match(s)
+    if m:
+        hours = int(m.group(1))
+        minutes = int(m.group(2))
+        return hours * 60 + minutes
+    # Parse "X hours", "X minutes", "X mins", "X hr", "X h"
+    m = UNIT_DURATION.match(s)
+    if m:
+        num = float(m.group(1))
+        unit = m.group(2)
+        if unit in ('hour', 'hours', 'hr', 'h'):
+            return int(num * 60)
+        else:  # minutes
+            return int(num)
+    return None
+
+
+def parse_time_only(val: str):
+    """Parse simple time-of-day like '9am', '9:30 am', '12pm', 'noon', 'midnight'. Returns (hour, minute) or None."""
+    if not val:
+        return None
+    s = str(val).strip().lower()
+    if s in ("noon",):
+        return (12, 0)
+    if s in ("midnight",):
+        return (0, 0)
+    m = TIME_OF_DAY.match(s)
+    if not m:
+        return None
+    hour = int(m.group(1))
+    minute = int(m.group(2) or 0)
+    meridiem = m.group(3)
+    if meridiem:
+        if hour == 12:
+            hour = 0 if meridiem == 'am' else 12
+        elif meridiem == 'pm':
+            hour += 12
+    # 24-hour times like '14:00'
+    if not meridiem and hour > 23:
+        return None
+    return (hour, minute)
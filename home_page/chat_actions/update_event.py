@@ -0,0 +1,654 @@
+from datetime import datetime, timedelta
+from django.http import JsonResponse
+from home_page.models import Message
+from .base import ActionContext, ActionHandler, ActionResult
+from .dates import resolve_date, resolve_range
+from .parsing import CLOCK_TIME, user_timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateEventHandler(ActionHandler):
+    """Find the event to change, apply the updates and ask the user to confirm."""
+    action = 'update_event'
+
+    def handle(self, ctx: ActionContext):
+        convo, gcal, params = ctx.convo, ctx.gcal, ctx.params
+        client_tz_name = ctx.client_tz_name
+        response_type, agent_response_text, response_content = ctx.response_type, ctx.response_text, ctx.response_content
+
+        norm = dict(params or {})
+        summary_query = norm.get('summary')
+        date_str = norm.get('date') or norm.get('start_date')
+        time_str = norm.get('start') or norm.get('start_time')
+        updates = norm.get('updates', {})
+        
+        if not updates:
+            response_type = 'text'
+            agent_response_text = "I couldn't determine what you'd like to update. Please specify what changes you want to make."
+            Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+        else:
+            tz = user_timezone(client_tz_name)
+            
+            # Determine search time range
+            range_start = None
+            range_end = None
+            target_date = None
+            
+            found = resolve_range(date_str, tz)
+            if found:
+                target_date = found.start if found.is_single_day else f"{found.start} to {found.end}"
+                range_start = datetime.combine(found.start, datetime.min.time()).isoformat() + 'Z'
+                range_end = datetime.combine(found.end, datetime.max.time()).isoformat() + 'Z'
+            
+            if not range_start:
+                # Default to searching a wider range (today and future events)
+                today = datetime.now(tz).date()
+                target_date = today
+                range_start = datetime.combine(today, datetime.min.time()).isoformat() + 'Z'
+                # Search up to 30 days ahead
+                range_end = datetime.combine(today + timedelta(days=30), datetime.max.time()).isoformat() + 'Z'
+            
+            events = gcal.list_events(time_min=range_start, time_max=range_end)
+            
+            # Filter by summary (fuzzy match)
+            matches = []
+            if summary_query:
+                for event in events:
+                    event_summary = event.get('summary', '')
+                    if summary_query.lower() in event_summary.lower():
+                        matches.append(event)
+            
+            # If time is provided, filter by time as well
+            if time_str and matches:
+                try:
+                    # Parse time_str (e.g. "10am", "14:00")
+                    filter_hour = None
+                    filter_minute = None
+                    
+                    ts = time_str.lower().replace(' ', '')
+                    time_match = CLOCK_TIME.match(ts)
+                    if time_match:
+                        h = int(time_match.group(1))
+                        m = int(time_match.group(2) or 0)
+                        ampm = time_match.group(3)
+                        
+                        if ampm:
+                            if ampm == 'pm' and h < 12:
+                                h += 12
+                            elif ampm == 'am' and h == 12:
+                                h = 0
+                        
+                        filter_hour = h
+                        filter_minute = m
+                        
+                        # Filter matches
+                        time_filtered = []
+                        for evt in matches:
+                            start_dt_str = evt.get('start', {}).get('dateTime')
+                            if start_dt_str:
+                                evt_dt = datetime.fromisoformat(start_dt_str.replace('Z', '+00:00'))
+                                evt_dt_local = evt_dt.astimezone(tz)
+                                
+                                # fuzzy match: within 15 mins
+                                if evt_dt_local.hour == filter_hour and abs(evt_dt_local.minute - filter_minute) < 15:
+                                    time_filtered.append(evt)
+                        
+                        if time_filtered:
+                            matches = time_filtered
+                except Exception as e:
+                    logger.error(f"Error filtering by time: {e}")
+                    error_text = "I couldn't filter by the specific time provided. Please try checking the time format (e.g., '2pm' or '14:00')."
+                    Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                    return JsonResponse({
+                        'type': 'text',
+                        'response': error_text,
+                        'content': {},
+                        'intent': 'calendar',
+                        'convo_id': str(convo.id)
+                    })
+            
+            match_index = norm.get('match_index')
+            
+            # Sort matches by start time
+            matches.sort(key=lambda x: x.get('start', {}).get('dateTime') or x.get('start', {}).get('date') or '')
+            
+            if match_index and isinstance(match_index, int) and matches:
+                idx = match_index - 1
+                if 0 <= idx < len(matches):
+                    matches = [matches[idx]]
+            
+            if len(matches) == 1:
+                event = matches[0]
+                event_id = event['id']
+                
+                # Check for series update intent
+                update_series = norm.get('update_series', False)
+                
+                # If user wants to update series and it's a recurring instance
+                if update_series and 'recurringEventId' in event:
+                    try:
+                        # Fetch master event
+                        master_event = gcal.get_event('primary', event['recurringEventId'])
+                        if master_event:
+                            event = master_event
+                            event_id = master_event['id']
+                    except Exception as e:
+                        logger.error(f"Error fetching master event: {e}")
+                        error_text = "I couldn't retrieve the main event for this series. Please try updating a single instance instead."
+                        Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                        return JsonResponse({
+                            'type': 'text',
+                            'response': error_text,
+                            'content': {},
+                            'intent': 'calendar',
+                            'convo_id': str(convo.id)
+                        })
+
+                # Parse the updates and build the updated event preview and show a confirmation card with before/after details
+                
+                # Get current event details
+                current_start = event.get('start', {})
+                current_end = event.get('end', {})
+                current_summary = event.get('summary', '')
+                
+                # Parse updates
+                updated_start = current_start.copy()
+                updated_end = current_end.copy()
+                updated_summary = current_summary
+                
+                # Handle date updates
+                if 'date' in updates:
+                    new_date_obj = resolve_date(updates['date'], tz)
+                    if new_date_obj:
+                        new_date_str = new_date_obj.isoformat()
+                        
+                        # If current event has dateTime, preserve time but change date
+                        if current_start.get('dateTime'):
+                            current_dt = datetime.fromisoformat(current_start['dateTime'].replace('Z', '+00:00'))
+                            new_dt = datetime.combine(new_date_obj, current_dt.time()).replace(tzinfo=current_dt.tzinfo)
+                            updated_start = {'dateTime': new_dt.isoformat()}
+                            
+                            if current_end.get('dateTime'):
+                                current_end_dt = datetime.fromisoformat(current_end['dateTime'].replace('Z', '+00:00'))
+                                duration = current_end_dt - current_dt
+                                new_end_dt = new_dt + duration
+                                updated_end = {'dateTime': new_end_dt.isoformat()}
+                        else:
+                            # All-day event
+                            updated_start = {'date': new_date_str}
+                            updated_end = {'date': (new_date_obj + timedelta(days=1)).isoformat()}
+                
+                # Handle time updates (start/end)
+                if 'start' in updates:
+                    new_time_str = updates['start']
+                    # Parse time (e.g., "15:00", "3pm")
+                    try:
+                        # Try HH:MM format first
+                        if ':' in new_time_str:
+                            time_parts = new_time_str.split(':')
+                            new_hour = int(time_parts[0])
+                            new_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+                        else:
+                            # Try 12h format
+                            ts = new_time_str.lower().replace(' ', '')
+                            time_match = CLOCK_TIME.match(ts)
+                            if time_match:
+                                new_hour = int(time_match.group(1))
+                                new_minute = int(time_match.group(2) or 0)
+                                ampm = time_match.group(3)
+                                
+                                if ampm:
+                                    if ampm == 'pm' and new_hour < 12:
+                                        new_hour += 12
+                                    elif ampm == 'am' and new_hour == 12:
+                                        new_hour = 0
+                            else:
+                                raise ValueError("Invalid time format")
+                        
+                        # Get the date from current event or updated date
+                        if updated_start.get('dateTime'):
+                            base_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00'))
+                            new_start_dt = base_dt.replace(hour=new_hour, minute=new_minute)
+                            updated_start = {'dateTime': new_start_dt.isoformat()}
+                            
+                            # Preserve duration if end exists
+                            if current_end.get('dateTime'):
+                                current_start_dt = datetime.fromisoformat(current_start['dateTime'].replace('Z', '+00:00'))
+                                current_end_dt = datetime.fromisoformat(current_end['dateTime'].replace('Z', '+00:00'))
+                                duration = current_end_dt - current_start_dt
+                                new_end_dt = new_start_dt + duration
+                                updated_end = {'dateTime': new_end_dt.isoformat()}
+                        else:
+                            # Convert all-day to timed event and use current date or updated date
+                            if current_start.get('date'):
+                                event_date = datetime.fromisoformat(current_start['date']).date()
+                            else:
+                                event_date = datetime.now(tz).date()
+                            
+                            new_start_dt = datetime.combine(event_date, datetime.min.time()).replace(
+                                hour=new_hour, minute=new_minute, tzinfo=tz
+                            )
+                            updated_start = {'dateTime': new_start_dt.isoformat()}
+                            # Default 1 hour duration
+                            updated_end = {'dateTime': (new_start_dt + timedelta(hours=1)).isoformat()}
+                    except Exception as e:
+                        logger.error(f"Error parsing new start time: {e}")
+                        # Return error immediately
+                        error_text = "I couldn't understand the start time format provided. Please try using a format like '14:00' or '2pm'."
+                        Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                        return JsonResponse({
+                            'type': 'text',
+                            'response': error_text,
+                            'content': {},
+                            'intent': 'calendar',
+                            'convo_id': str(convo.id)
+                        })
+                
+                if 'end' in updates:
+                    new_time_str = updates['end']
+                    try:
+                        # Parse end time
+                        if ':' in new_time_str:
+                            time_parts = new_time_str.split(':')
+                            new_hour = int(time_parts[0])
+                            new_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+                        else:
+                            ts = new_time_str.lower().replace(' ', '')
+                            time_match = CLOCK_TIME.match(ts)
+                            if time_match:
+                                new_hour = int(time_match.group(1))
+                                new_minute = int(time_match.group(2) or 0)
+                                ampm = time_match.group(3)
+                                
+                                if ampm:
+                                    if ampm == 'pm' and new_hour < 12:
+                                        new_hour += 12
+                                    elif ampm == 'am' and new_hour == 12:
+                                        new_hour = 0
+                            else:
+                                raise ValueError("Invalid time format")
+                        
+                        if updated_start.get('dateTime'):
+                            base_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00'))
+                            new_end_dt = base_dt.replace(hour=new_hour, minute=new_minute)
+                            updated_end = {'dateTime': new_end_dt.isoformat()}
+                    except Exception as e:
+                        logger.error(f"Error parsing new end time: {e}")
+                        # Return error immediately
+                        error_text = "I couldn't understand the end time format provided. Please try using a format like '15:00' or '3pm'."
+                        Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                        return JsonResponse({
+                            'type': 'text',
+                            'response': error_text,
+                            'content': {},
+                            'intent': 'calendar',
+                            'convo_id': str(convo.id)
+                        })
+                
+                # Handle title/summary update
+                if 'summary' in updates:
+                    updated_summary = updates['summary']
+                
+                # Check for conflicts with new time slot
+                has_conflict = False
+                conflicts = []
+                
+                if updated_start.get('dateTime'):
+                    # Check if new time conflicts with other events
+                    try:
+                        new_start_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00'))
+                        new_end_dt = datetime.fromisoformat(updated_end['dateTime'].replace('Z', '+00:00')) if updated_end.get('dateTime') else new_start_dt + timedelta(hours=1)
+                        
+                        # Search for events in the new time window
+                        conflict_search_start = new_start_dt.isoformat()
+                        conflict_search_end = new_end_dt.isoformat()
+                        
+                        all_events = gcal.list_events(
+                            time_min=conflict_search_start,
+                            time_max=conflict_search_end
+                        )
+                        
+                        for evt in all_events:
+                            # Skip the event being updated
+                            if evt['id'] == event_id:
+                                continue
+                            
+                            evt_start = evt.get('start', {}).get('dateTime')
+                            evt_end = evt.get('end', {}).get('dateTime')
+                            
+                            if evt_start and evt_end:
+                                evt_start_dt = datetime.fromisoformat(evt_start.replace('Z', '+00:00'))
+                                evt_end_dt = datetime.fromisoformat(evt_end.replace('Z', '+00:00'))
+                                
+                                # Check for overlap
+                                if (new_start_dt < evt_end_dt and new_end_dt > evt_start_dt):
+                                    has_conflict = True
+                                    conflicts.append({
+                                        'summary': evt.get('summary', 'Untitled'),
+                                        'start': evt['start'],
+                                        'end': evt['end']
+                                    })
+                    except Exception as e:
+                        logger.error(f"Error checking conflicts: {e}")
+                        error_text = "I was unable to check for scheduling conflicts. Please try again in a moment."
+                        Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                        return JsonResponse({
+                            'type': 'text',
+                            'response': error_text,
+                            'content': {},
+                            'intent': 'calendar',
+                            'convo_id': str(convo.id)
+                        })
+                
+                # Generate confirmation message
+                response_type = 'event_update_confirmation'
+                response_content = {
+                    'event_id': event_id,
+                    'original': {
+                        'summary': current_summary,
+                        'start': current_start,
+                        'end': current_end
+                    },
+                    'updated': {
+                        'summary': updated_summary,
+                        'start': updated_start,
+                        'end': updated_end
+                    },
+                    'has_conflict': has_conflict,
+                    'conflicts': conflicts if has_conflict else [],
+                    'action': 'update'
+                }
+                
+                # Generate AI message about the update
+                changes = []
+                if updated_summary != current_summary:
+                    changes.append(f"title to '{updated_summary}'")
+                if updated_start != current_start:
+                    # Format time nicely
+                    try:
+                        if updated_start.get('dateTime'):
+                            new_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00')).astimezone(tz)
+                            time_str = new_dt.strftime('%I:%M %p').lstrip('0')
+                            date_str = new_dt.strftime('%A, %B %d').replace(' 0', ' ')
+                            changes.append(f"time to {time_str} on {date_str}")
+                        elif updated_start.get('date'):
+                            date_obj = datetime.fromisoformat(updated_start['date']).date()
+                            changes.append(f"date to {date_obj.strftime('%A, %B %d').replace(' 0', ' ')}")
+                    except:
+                        changes.append("time")
+                
+                if changes:
+                    change_desc = " and ".join(changes)
+                    if has_conflict:
+                        agent_message = f"⚠️ I found '{current_summary}' and can update the {change_desc}, but you have a conflict at that time. Do you want to proceed?"
+                    else:
+                        agent_message = f"I found '{current_summary}'. Update the {change_desc}?"
+                else:
+                    agent_message = f"I found '{current_summary}', but I'm not sure what changes you'd like to make."
+                
+                # Persist draft
+                draft_msg = Message.objects.create(
+                    conversation=convo,
+                    sender='agent',
+                    text=agent_message,
+                    message_type='event_update_confirmation',
+                    content=response_content,
+                )
+                response_content['message_id'] = draft_msg.id
+                agent_response_text = agent_message
+            
+            elif len(matches) > 1:
+                # Check if user wants to update series
+                update_series = norm.get('update_series', False)
+                
+                # If user wants to update series and the events are recurring instances
+                if update_series and matches[0].get('recurringEventId'):
+                    # Use the first match to get the master event
+                    try:
+                        master_event = gcal.get_event('primary', matches[0]['recurringEventId'])
+                        if master_event:
+                            # Treat as single match with the master event
+                            matches = [master_event]
+                            event = matches[0]
+                            event_id = event['id']
+                            
+                            # Get current event details
+                            current_start = event.get('start', {})
+                            current_end = event.get('end', {})
+                            current_summary = event.get('summary', '')
+                            
+                            # Parse updates (reusing logic from single match case)
+                            updated_start = current_start.copy()
+                            updated_end = current_end.copy()
+                            updated_summary = current_summary
+                            
+                            # Handle date updates
+                            if 'date' in updates:
+                                new_date_obj = resolve_date(updates['date'], tz)
+                                if new_date_obj:
+                                    new_date_str = new_date_obj.isoformat()
+                                    
+                                    if current_start.get('dateTime'):
+                                        current_dt = datetime.fromisoformat(current_start['dateTime'].replace('Z', '+00:00'))
+                                        new_dt = datetime.combine(new_date_obj, current_dt.time()).replace(tzinfo=current_dt.tzinfo)
+                                        updated_start = {'dateTime': new_dt.isoformat()}
+                                        
+                                        if current_end.get('dateTime'):
+                                            current_end_dt = datetime.fromisoformat(current_end['dateTime'].replace('Z', '+00:00'))
+                                            duration = current_end_dt - current_dt
+                                            new_end_dt = new_dt + duration
+                                            updated_end = {'dateTime': new_end_dt.isoformat()}
+                                    else:
+                                        updated_start = {'date': new_date_str}
+                                        updated_end = {'date': (new_date_obj + timedelta(days=1)).isoformat()}
+                            
+                            # Handle time updates (start/end)
+                            if 'start' in updates:
+                                new_time_str = updates['start']
+                                try:
+                                    if ':' in new_time_str:
+                                        time_parts = new_time_str.split(':')
+                                        new_hour = int(time_parts[0])
+                                        new_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+                                    else:
+                                        ts = new_time_str.lower().replace(' ', '')
+                                        time_match = CLOCK_TIME.match(ts)
+                                        if time_match:
+                                            new_hour = int(time_match.group(1))
+                                            new_minute = int(time_match.group(2) or 0)
+                                            ampm = time_match.group(3)
+                                            
+                                            if ampm:
+                                                if ampm == 'pm' and new_hour < 12:
+                                                    new_hour += 12
+                                                elif ampm == 'am' and new_hour == 12:
+                                                    new_hour = 0
+                                        else:
+                                            raise ValueError("Invalid time format")
+                                    
+                                    if updated_start.get('dateTime'):
+                                        base_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00'))
+                                        new_start_dt = base_dt.replace(hour=new_hour, minute=new_minute)
+                                        updated_start = {'dateTime': new_start_dt.isoformat()}
+                                        
+                                        if current_end.get('dateTime'):
+                                            current_start_dt = datetime.fromisoformat(current_start['dateTime'].replace('Z', '+00:00'))
+                                            current_end_dt = datetime.fromisoformat(current_end['dateTime'].replace('Z', '+00:00'))
+                                            duration = current_end_dt - current_start_dt
+                                            new_end_dt = new_start_dt + duration
+                                            updated_end = {'dateTime': new_end_dt.isoformat()}
+                                    else:
+                                        if current_start.get('date'):
+                                            event_date = datetime.fromisoformat(current_start['date']).date()
+                                        else:
+                                            event_date = datetime.now(tz).date()
+                                        
+                                        new_start_dt = datetime.combine(event_date, datetime.min.time()).replace(
+                                            hour=new_hour, minute=new_minute, tzinfo=tz
+                                        )
+                                        updated_start = {'dateTime': new_start_dt.isoformat()}
+                                        updated_end = {'dateTime': (new_start_dt + timedelta(hours=1)).isoformat()}
+                                except Exception as e:
+                                    logger.error(f"Error parsing new start time: {e}")
+                                    error_text = "I couldn't understand the start time format provided."
+                                    Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                                    return JsonResponse({
+                                        'type': 'text',
+                                        'response': error_text,
+                                        'content': {},
+                                        'intent': 'calendar',
+                                        'convo_id': str(convo.id)
+                                    })
+                            
+                            if 'end' in updates:
+                                new_time_str = updates['end']
+                                try:
+                                    if ':' in new_time_str:
+                                        time_parts = new_time_str.split(':')
+                                        new_hour = int(time_parts[0])
+                                        new_minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+                                    else:
+                                        ts = new_time_str.lower().replace(' ', '')
+                                        time_match = CLOCK_TIME.match(ts)
+                                        if time_match:
+                                            new_hour = int(time_match.group(1))
+                                            new_minute = int(time_match.group(2) or 0)
+                                            ampm = time_match.group(3)
+                                            
+                                            if ampm:
+                                                if ampm == 'pm' and new_hour < 12:
+                                                    new_hour += 12
+                                                elif ampm == 'am' and new_hour == 12:
+                                                    new_hour = 0
+                                        else:
+                                            raise ValueError("Invalid time format")
+                                    
+                                    if updated_start.get('dateTime'):
+                                        base_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00'))
+                                        new_end_dt = base_dt.replace(hour=new_hour, minute=new_minute)
+                                        updated_end = {'dateTime': new_end_dt.isoformat()}
+                                except Exception as e:
+                                    logger.error(f"Error parsing new end time: {e}")
+                                    error_text = "I couldn't understand the end time format provided."
+                                    Message.objects.create(conversation=convo, sender='agent', text=error_text, message_type='text')
+                                    return JsonResponse({
+                                        'type': 'text',
+                                        'response': error_text,
+                                        'content': {},
+                                        'intent': 'calendar',
+                                        'convo_id': str(convo.id)
+                                    })
+                            
+                            if 'summary' in updates:
+                                updated_summary = updates['summary']
+                            
+                            # Generate confirmation
+                            response_type = 'event_update_confirmation'
+                            response_content = {
+                                'event_id': event_id,
+                                'original': {
+                                    'summary': current_summary,
+                                    'start': current_start,
+                                    'end': current_end
+                                },
+                                'updated': {
+                                    'summary': updated_summary,
+                                    'start': updated_start,
+                                    'end': updated_end
+                                },
+                                'has_conflict': False,
+                                'conflicts': [],
+                                'action': 'update',
+                                'is_series_update': True
+                            }
+                            
+                            changes = []
+                            if updated_summary != current_summary:
+                                changes.append(f"title to '{updated_summary}'")
+                            if updated_start != current_start:
+                                try:
+                                    if updated_start.get('dateTime'):
+                                        new_dt = datetime.fromisoformat(updated_start['dateTime'].replace('Z', '+00:00')).astimezone(tz)
+                                        time_str = new_dt.strftime('%I:%M %p').lstrip('0')
+                                        date_str = new_dt.strftime('%A, %B %d').replace(' 0', ' ')
+                                        changes.append(f"time to {time_str} on {date_str}")
+                                    elif updated_start.get('date'):
+                                        date_obj = datetime.fromisoformat(updated_start['date']).date()
+                                        changes.append(f"date to {date_obj.strftime('%A, %B %d').replace(' 0', ' ')}")
+                                except:
+                                    changes.append("time")
+                            
+                            if changes:
+                                change_desc = " and ".join(changes)
+                                agent_message = f"I found the recurring '{current_summary}' series. Update the {change_desc} for ALL instances?"
+                            else:
+                                agent_message = f"I found the recurring '{current_summary}' series, but I'm not sure what changes you'd like to make."
+                            
+                            draft_msg = Message.objects.create(
+                                conversation=convo,
+                                sender='agent',
+                                text=agent_message,
+                                message_type='event_update_confirmation',
+                                content=response_content,
+                            )
+                            response_content['message_id'] = draft_msg.id
+                            agent_response_text = agent_message
+                        else:
+                            # Couldn't get master, fall back to asking which one
+                            response_type = 'text'
+                            event_list = []
+                            for i, evt in enumerate(matches[:5], 1):
+                                title = evt.get('summary', 'Untitled')
+                                start = evt.get('start', {})
+                                if start.get('dateTime'):
+                                    dt = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')).astimezone(tz)
+                                    time_str = dt.strftime('%I:%M %p on %b %d').lstrip('0')
+                                    event_list.append(f"{i}. {title} ({time_str})")
+                                else:
+                                    event_list.append(f"{i}. {title}")
+                            
+                            agent_response_text = f"I found {len(matches)} events matching '{summary_query}'. Which one would you like to update?\\n\\n" + "\\n".join(event_list)
+                            Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+                    except Exception as e:
+                        logger.error(f"Error fetching master event: {e}")
+                        Message.objects.create(conversation=convo, sender='agent', text="I couldn't retrieve the main event for this series.", message_type='text')
+                        # Fall back to asking which one
+                        response_type = 'text'
+                        event_list = []
+                        for i, evt in enumerate(matches[:5], 1):
+                            title = evt.get('summary', 'Untitled')
+                            start = evt.get('start', {})
+                            if start.get('dateTime'):
+                                dt = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')).astimezone(tz)
+                                time_str = dt.strftime('%I:%M %p on %b %d').lstrip('0')
+                                event_list.append(f"{i}. {title} ({time_str})")
+                            else:
+                                event_list.append(f"{i}. {title}")
+                        
+                        agent_response_text = f"I found {len(matches)} events matching '{summary_query}'. Which one would you like to update?\\n\\n" + "\\n".join(event_list)
+                        Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+                else:
+                    # Normal case - ask which one
+                    response_type = 'text'
+                    event_list = []
+                    for i, evt in enumerate(matches[:5], 1):
+                        title = evt.get('summary', 'Untitled')
+                        start = evt.get('start', {})
+                        if start.get('dateTime'):
+                            dt = datetime.fromisoformat(start['dateTime'].replace('Z', '+00:00')).astimezone(tz)
+                            time_str = dt.strftime('%I:%M %p on %b %d').lstrip('0')
+                            event_list.append(f"{i}. {title} ({time_str})")
+                        else:
+                            event_list.append(f"{i}. {title}")
+                    
+                    agent_response_text = f"I found {len(matches)} events matching '{summary_query}'. Which one would you like to update?\\n\\n" + "\\n".join(event_list)
+                    Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+            
+            else:
+                response_type = 'text'
+                agent_response_text = f"I couldn't find any event matching '{summary_query}'{f' on {target_date}' if target_date else ''}."
+                Message.objects.create(conversation=convo, sender='agent', text=agent_response_text, message_type='text')
+
+        return ActionResult(response_type, agent_response_text, response_content)
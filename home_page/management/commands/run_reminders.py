@@ -1,20 +1,39 @@
-import time
+import signal
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from home_page.services.notification_service import check_and_send_reminders, check_and_send_morning_briefings
+from home_page.reminder_worker import build_reminder_scheduler, SHUTDOWN_DRAIN_TIMEOUT
+from home_page.services.dispatcher import get_dispatcher
+from home_page.services.leader_election import LeaderElector, REMINDER_SCHEDULER_LEASE
+from home_page.services.metrics import start_metrics_server
 
 class Command(BaseCommand):
     help = 'Runs the reminder checking loop'
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting reminder agent service...'))
-        
-        while True:
-            try:
-                check_and_send_reminders()
-                check_and_send_morning_briefings()
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"Error in reminder loop: {e}"))
-            
-            # Sleep for 10 seconds before next check
-            # self.stdout.write("Sleeping for 10 seconds...")
-            time.sleep(10)
+
+        metrics_port = getattr(settings, 'METRICS_PORT', 0)
+        if metrics_port:
+            start_metrics_server(metrics_port)
+
+        # Only one scheduler runs across processes and hosts; the rest stand by
+        elector = LeaderElector(REMINDER_SCHEDULER_LEASE)
+        elector.start()
+        scheduler = build_reminder_scheduler(elector)
+
+        def shutdown(signum, frame):
+            self.stdout.write(f"Received {signal.Signals(signum).name}, finishing the current tick...")
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        try:
+            scheduler.run()
+        finally:
+            # Hand the lease to a standby right away, then deliver what the last tick queued
+            elector.stop(release=True)
+            get_dispatcher().stop(drain=True, timeout=SHUTDOWN_DRAIN_TIMEOUT)
+            stats = scheduler.stats
+            self.stdout.write(self.style.SUCCESS(
+                f"Reminder agent stopped after {stats.ticks} ticks ({stats.skipped} skipped, max lag {stats.max_lag:.1f}s, max duration {stats.max_duration:.1f}s)."
+            ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-19 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0002_add_user_timezone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'timestamp'], name='home_page_m_convers_6812a8_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 07:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0003_message_conversation_timestamp_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user', '-created_at'], name='home_page_c_user_id_8d4b19_idx'),
+        ),
+    ]
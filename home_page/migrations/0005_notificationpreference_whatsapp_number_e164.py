@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-19 07:14
+
+import home_page.models
+from django.db import migrations, models
+from home_page.services.phone_numbers import normalize_whatsapp_number
+
+
+def backfill_e164_numbers(apps, schema_editor):
+    """
+    Normalize existing numbers to E.164 before the unique index is added.
+
+    Numbers that cannot be normalized are cleared (and WhatsApp disabled),
+    as they could never have matched an inbound webhook. If several users
+    share the same number, the most recently updated preference keeps it.
+    """
+    NotificationPreference = apps.get_model('home_page', 'NotificationPreference')
+    claimed = set()
+    rows = (
+        NotificationPreference.objects
+        .exclude(whatsapp_number__isnull=True)
+        .order_by('-updated_at', '-id')
+    )
+    for pref in rows.iterator():
+        try:
+            number = normalize_whatsapp_number(pref.whatsapp_number)
+        except ValueError:
+            number = None
+
+        if number in claimed:
+            number = None
+        if number:
+            claimed.add(number)
+
+        if number != pref.whatsapp_number:
+            update = {'whatsapp_number': number}
+            if number is None:
+                update['whatsapp_enabled'] = False
+            # update() skips auto_now so the backfill doesn't touch updated_at
+            NotificationPreference.objects.filter(pk=pref.pk).update(**update)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0004_conversation_user_created_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_e164_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notificationpreference',
+            name='whatsapp_number',
+            field=models.CharField(blank=True, help_text='e.g. +14155238886', max_length=20, null=True, unique=True, validators=[home_page.models.validate_whatsapp_number]),
+        ),
+    ]
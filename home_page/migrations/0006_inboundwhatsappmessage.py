@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0005_notificationpreference_whatsapp_number_e164'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboundWhatsAppMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_sid', models.CharField(max_length=64, unique=True)),
+                ('from_number', models.CharField(max_length=40)),
+                ('body', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'received_at'], name='home_page_i_status_615e09_idx')],
+            },
+        ),
+    ]
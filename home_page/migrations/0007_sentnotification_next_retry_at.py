@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 07:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0006_inboundwhatsappmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sentnotification',
+            name='next_retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sentnotification',
+            index=models.Index(fields=['status', 'next_retry_at'], name='home_page_s_status_fe3ed4_idx'),
+        ),
+    ]
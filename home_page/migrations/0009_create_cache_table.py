@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-19 09:05
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    """The database cache backend in settings.CACHES needs its table; other backends skip this."""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0008_schedulerlease'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home_page', '0009_create_cache_table'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sentnotification',
+            name='home_page_s_status_fe3ed4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='sentnotification',
+            index=models.Index(fields=['user', 'status', 'next_retry_at'], name='home_page_s_user_id_433880_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from .services.phone_numbers import normalize_whatsapp_number
 import uuid
 
 User = get_user_model()
@@ -12,6 +14,12 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Backs the sidebar list (filter by user, newest first)
+            models.Index(fields=['user', '-created_at']),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -26,14 +34,27 @@ class Message(models.Model):
     content = models.JSONField(blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Backs the per-conversation history windows (filter by conversation, order by timestamp)
+            models.Index(fields=['conversation', 'timestamp']),
+        ]
+
     def __str__(self):
         kind = getattr(self, 'message_type', 'text') or 'text'
         preview = (self.text or '').strip()[:30]
         return f"{kind} from {self.sender} at {self.timestamp}: {preview}"
 
+def validate_whatsapp_number(value):
+    try:
+        normalize_whatsapp_number(value)
+    except ValueError:
+        raise ValidationError("Enter the WhatsApp number in international format, e.g. +14155238886.")
+
 class NotificationPreference(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="notification_preference")
-    whatsapp_number = models.CharField(max_length=20, blank=True, null=True, help_text="e.g. +14155238886")
+    # Stored in E.164 (normalized on save); unique so inbound webhooks resolve the user with one indexed lookup
+    whatsapp_number = models.CharField(max_length=20, blank=True, null=True, unique=True, validators=[validate_whatsapp_number], help_text="e.g. +14155238886")
     whatsapp_enabled = models.BooleanField(default=False)
     email_enabled = models.BooleanField(default=True)
     
@@ -47,6 +68,11 @@ class NotificationPreference(models.Model):
     
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        # Raises ValueError for numbers that cannot be normalized; views validate first
+        self.whatsapp_number = normalize_whatsapp_number(self.whatsapp_number)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Prefs for {self.user.username}"
 
@@ -57,13 +83,57 @@ class SentNotification(models.Model):
     # New Fields for Retry Logic
     failure_count = models.IntegerField(default=0)
     status = models.CharField(max_length=10, choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='sent')
+    # When a failed send may be retried; null once retries are exhausted
+    next_retry_at = models.DateTimeField(null=True, blank=True)
     
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['event_id', 'notification_type', 'user']),
+            models.Index(fields=['user', 'status', 'next_retry_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.notification_type} for event {self.event_id} to {self.user.username}"
+
+
+class InboundWhatsAppMessage(models.Model):
+    """
+    Durable queue of inbound WhatsApp webhook events.
+
+    The webhook only records the event (deduplicated on Twilio's MessageSid, so
+    retried deliveries are no-ops); the reminder worker applies the command.
+    """
+    message_sid = models.CharField(max_length=64, unique=True)
+    from_number = models.CharField(max_length=40)
+    body = models.TextField(blank=True, default='')
+    status = models.CharField(max_length=10, choices=[('pending', 'Pending'), ('processed', 'Processed'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending')
+    attempts = models.IntegerField(default=0)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
         ]
 
     def __str__(self):
-        return f"{self.notification_type} for event {self.event_id} to {self.user.username}"
\ No newline at end of file
+        return f"WhatsApp {self.message_sid} from {self.from_number} ({self.status})"
+
+
+class SchedulerLease(models.Model):
+    """
+    Leader-election lease for singleton background jobs.
+
+    The process holding an unexpired lease for `name` runs the job; other
+    processes (on any host sharing the database) stand by and take over once
+    the holder releases it or stops renewing it.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    holder = models.CharField(max_length=255, blank=True, default='')
+    expires_at = models.DateTimeField()
+    acquired_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder or 'nobody'} until {self.expires_at}"
@@ -1,20 +1,55 @@
 import threading
-import time
 import logging
 from django.conf import settings
 from home_page.services.notification_service import check_and_send_reminders, check_and_send_morning_briefings
+from home_page.services.inbound_whatsapp import process_inbound_whatsapp
+from home_page.services.dispatcher import get_dispatcher
+from home_page.services.leader_election import LeaderElector, REMINDER_SCHEDULER_LEASE
+from home_page.services.scheduler import TickScheduler
 
 logger = logging.getLogger(__name__)
 
+# Seconds the dispatcher gets to deliver queued messages on shutdown;
+# platforms send SIGKILL ~30s after SIGTERM.
+SHUTDOWN_DRAIN_TIMEOUT = 20
+
+
+def reminder_tick():
+    # Apply queued WhatsApp replies first so OFF/SNOOZE take effect before sending
+    process_inbound_whatsapp()
+    check_and_send_reminders()
+    check_and_send_morning_briefings()
+
+
+def build_reminder_scheduler(elector, stop_event=None) -> TickScheduler:
+    """The reminder loop shared by ReminderWorker and `manage.py run_reminders`."""
+    return TickScheduler(
+        reminder_tick,
+        interval=getattr(settings, 'REMINDER_TICK_SECONDS', 10),
+        name='reminders',
+        should_run=lambda: elector.is_leader,
+        stop_event=stop_event,
+    )
+
+
 class ReminderWorker:
+    """
+    In-process reminder scheduler. Any number of processes may start one;
+    only the holder of the reminder-scheduler lease actually scans.
+    """
     _instance = None
     _thread = None
+    _elector = None
+    _scheduler = None
     _stop_event = threading.Event()
 
     @classmethod
     def start(cls):
         if cls._thread is None or not cls._thread.is_alive():
             cls._stop_event.clear()
+            cls._elector = LeaderElector(REMINDER_SCHEDULER_LEASE)
+            cls._elector.start()
+            cls._scheduler = build_reminder_scheduler(cls._elector, stop_event=cls._stop_event)
             cls._thread = threading.Thread(target=cls._run_loop, daemon=True)
             cls._thread.start()
             logger.info("Reminder background worker started.")
@@ -25,18 +60,12 @@ class ReminderWorker:
         if cls._thread:
             cls._thread.join(timeout=5)
             logger.info("Reminder background worker stopped.")
+        if cls._elector:
+            cls._elector.stop(release=True)
+        # Deliver whatever the last scan queued before shutting the channel workers down
+        get_dispatcher().stop(drain=True, timeout=SHUTDOWN_DRAIN_TIMEOUT)
 
     @classmethod
     def _run_loop(cls):
         logger.info("Reminder worker loop running...")
-        while not cls._stop_event.is_set():
-            try:
-                # Run the checks
-                check_and_send_reminders()
-                check_and_send_morning_briefings()
-            except Exception as e:
-                logger.error(f"Error in reminder worker loop: {e}", exc_info=True)
-            
-            # Sleep for 60 seconds (or less if stopped)
-            if cls._stop_event.wait(60):
-                break
+        cls._scheduler.run()
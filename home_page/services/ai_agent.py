@@ -1,7 +1,10 @@
 import json
-from anthropic import Anthropic
 from django.conf import settings
 from .calendar_service import GoogleCalendarService
+from .conversation_context import ConversationContext
+from .local_extractor import extract_calendar_command
+from .metrics import CALENDAR_EXTRACTIONS, CLAUDE_CALLS
+from .tracing import span
 from allauth.socialaccount.models import SocialToken, SocialAccount
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -16,17 +19,20 @@ if TYPE_CHECKING:
 import logging
 logger = logging.getLogger(__name__)
 
+
+def _anthropic_client(api_key: str):
+    # The SDK (with httpx and pydantic) is imported here rather than at module load:
+    # it is the single biggest import of a web worker, and most requests never reach Claude.
+    from anthropic import Anthropic
+    return Anthropic(api_key=api_key)
+
+
 class AIAgent:
     def __init__(self, user: Any):
         self.user = user
         
-        # ---- Initialise Anthropic (Claude) only ----
-        anthropic_key = (
-            os.getenv('CLAUDE_API_KEY') or os.getenv('ANTHROPIC_API_KEY')
-        )
-        self.claude_client = (
-            Anthropic(api_key=anthropic_key) if anthropic_key else None
-        )
+        # ---- Anthropic (Claude) only; the client is created on first use ----
+        self._claude_client = None
         self.openai_client = None # I won't be using openai for now
 
         # ---- Claude model names ----
@@ -35,6 +41,15 @@ class AIAgent:
         self.calendar_param_model  = self.general_chat_model
         self.title_generation_model = self.general_chat_model
 
+    @property
+    def claude_client(self):
+        """Claude client, created on first use; None when no API key is configured."""
+        if self._claude_client is None:
+            anthropic_key = os.getenv('CLAUDE_API_KEY') or os.getenv('ANTHROPIC_API_KEY')
+            if anthropic_key:
+                self._claude_client = _anthropic_client(anthropic_key)
+        return self._claude_client
+
     def _get_openai_response(self, messages, json_mode: bool = False, temperature: float = 0.7, max_tokens: int   = 500):
         """Helper to call OpenAI API."""
         if not self.openai_client:
@@ -90,14 +105,17 @@ class AIAgent:
                 tokens_to_use = 300 # More tokens for JSON output
 
 
-            resp = self.claude_client.messages.create(
-                model       = self.general_chat_model,
-                messages    = messages,
-                temperature = temp_to_use,
-                max_tokens  = min(tokens_to_use, 250),   # hard cap ≈ 1-2 short paragraphs
-            )
+            with span('claude'):
+                resp = self.claude_client.messages.create(
+                    model       = self.general_chat_model,
+                    messages    = messages,
+                    temperature = temp_to_use,
+                    max_tokens  = min(tokens_to_use, 250),   # hard cap ≈ 1-2 short paragraphs
+                )
+            CLAUDE_CALLS.inc(outcome='ok')
             return resp.content[0].text.strip()
         except Exception as e:
+            CLAUDE_CALLS.inc(outcome='error')
             logger.error(f"Error calling Claude API: {e}")
             logger.error(traceback.format_exc())
             # Depending on criticality, re-raise or return None
@@ -173,12 +191,8 @@ class AIAgent:
         messages = []
         if conversation:
             # Include recent conversation history for context
-            history_messages = conversation.messages.filter(text__isnull=False, text__gt='').order_by('-timestamp')[:4]
-            history_messages = list(history_messages)[::-1]
-            messages = [
-                {"role": ("user" if m.sender == "user" else "assistant"), "content": m.text}
-                for m in history_messages
-            ]
+            context = ConversationContext.for_conversation(conversation)
+            messages = context.history(4)
             
         messages.append({"role": "user", "content": f"{intent_prompt}\n\nUser message: {text}"})
         
@@ -345,14 +359,27 @@ class AIAgent:
                 'response': "AI services are not configured. Please check the server settings."
             }
 
+        # Load the recent history once; every prompt builder below slices from it
+        with span('agent.context'):
+            context = ConversationContext.for_conversation(conversation)
+
+        # Common, self-contained calendar commands are parsed locally: no intent or extraction call
+        with span('agent.local_extract'):
+            local_command = extract_calendar_command(text)
+
         # 1. Determine Intent (Calendar or General Chat)
-        intent = self.determine_intent(text, conversation)
+        if local_command:
+            intent = 'calendar'
+        else:
+            with span('agent.intent'):
+                intent = self.determine_intent(text, context)
         logger.info(f"Message intent: {intent}")
 
         # 2. Handle based on Intent
         if intent == 'calendar':
             # Check Connection Status (Google Only)
-            google_connected = self.is_google_connected()
+            with span('agent.google_check'):
+                google_connected = self.is_google_connected()
             
             if not google_connected:
                 logger.info("Calendar intent detected, but no provider connected. Requesting connection.")
@@ -367,6 +394,13 @@ class AIAgent:
                         'providers': ['google'] 
                     }
                 }
+            elif local_command:
+                CALENDAR_EXTRACTIONS.inc(extractor='local')
+                logger.info(f"Parameters extracted locally. Signalling view to perform action: {local_command['action']}.")
+                return {
+                    'type': 'calendar_action_request',
+                    'content': {**local_command, 'details': '', 'agent_explanation': ''},
+                }
             else:
                 # If connected, proceed to extract calendar parameters
                 logger.info("Google connected. Extracting calendar parameters with context...")
@@ -584,14 +618,7 @@ class AIAgent:
                 )
 
                 # Include brief conversation history for better parameter extraction
-                messages_history = []
-                if conversation:
-                    history_messages = conversation.messages.filter(text__isnull=False, text__gt='').order_by('-timestamp')[:6]
-                    history_messages = list(history_messages)[::-1]
-                    messages_history = [
-                        {"role": ("user" if m.sender == "user" else "assistant"), "content": m.text}
-                        for m in history_messages
-                    ]
+                messages_history = context.history(6)
                 # Inject a strong system override to the user's message to break refusal loops
                 # This ensures the AI ignores previous "I can't find it" messages in the history
                 override_instruction = (
@@ -602,7 +629,9 @@ class AIAgent:
                 )
                 
                 messages = messages_history + [{"role": "user", "content": text + override_instruction}]
-                raw = self._get_claude_chat_response(messages, system_prompt=system, temperature=0)
+                with span('agent.extract'):
+                    raw = self._get_claude_chat_response(messages, system_prompt=system, temperature=0)
+                CALENDAR_EXTRACTIONS.inc(extractor='claude')
                 logger.debug(f"AI RAW RESPONSE: {raw}")
   
                 # Some models occasionally emit multiple JSON objects back-to-back.
@@ -774,26 +803,9 @@ class AIAgent:
                     Keep responses warm but brief. Redirect off-topic conversations gently toward calendar assistance."""
                 )
                 
-                messages_history = []
-                if conversation:
-                    # Fetch recent messages (limited to 4 for context, excluding empty ones)
-                    history_messages = conversation.messages.filter(text__isnull=False, text__gt='').order_by('-timestamp')[:4]
-                    history_messages = list(history_messages)[::-1]  # Reverse to get chronological order
-                    
-                    # Add deduplication and filtering logic
-                    seen_content = set()
-                    for m in history_messages:
-                        if m.text and m.text.strip():
-                            # Skip if we've seen very similar content (first 50 chars)
-                            content_key = m.text.strip()[:50].lower()
-                            if content_key not in seen_content:
-                                seen_content.add(content_key)
-                                messages_history.append({
-                                    "role": "user" if m.sender == "user" else "assistant", 
-                                    "content": m.text.strip()
-                                })
-                    
-                    logger.debug(f"Including {len(messages_history)} unique history messages in general chat prompt.")
+                # Recent messages (limited to 4 for context), skipping near-duplicates
+                messages_history = context.history(4, dedupe=True)
+                logger.debug(f"Including {len(messages_history)} unique history messages in general chat prompt.")
 
                 # Add the current user message
                 messages_history.append({"role": "user", "content": text})
@@ -859,9 +871,12 @@ class AIAgent:
             if system_prompt:            # only include when non-empty
                 params["system"] = system_prompt
 
-            resp = self.claude_client.messages.create(**params)
+            with span('claude'):
+                resp = self.claude_client.messages.create(**params)
+            CLAUDE_CALLS.inc(outcome='ok')
             return resp.content[0].text.strip()
         except Exception as e:
+            CLAUDE_CALLS.inc(outcome='error')
             logger.error(f"Error calling Claude API in chat_response: {e}", exc_info=True)
             return None
 
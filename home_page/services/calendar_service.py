@@ -1,17 +1,53 @@
 from datetime import datetime, timezone, timedelta
 from allauth.socialaccount.models import SocialAccount, SocialToken
 from django.conf import settings
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
+from functools import cache
+from home_page.services.listing_cache import invalidate_listings
+from home_page.services.metrics import GOOGLE_API_CALLS, RECURRENCE_EXPANSIONS
+from home_page.services.recurrence import UnsupportedRecurrence, expand_events
+from home_page.services.tracing import span
 import base64
+import copy
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The Google client libraries (googleapiclient, google.auth, httplib2) are imported
+# where they are used, not at module load, so processes that never call Google
+# (and web workers until their first calendar request) don't pay for them.
+
+
+@cache
+def _counted_http_request():
+    """HttpRequest subclass that counts every executed Google API call by method (e.g. calendar.events.list)."""
+    from googleapiclient.http import HttpRequest
+
+    class CountedHttpRequest(HttpRequest):
+        def execute(self, *args, **kwargs):
+            method = self.methodId or 'unknown'
+            GOOGLE_API_CALLS.inc(method=method)
+            with span(f"google.{method}"):
+                return super().execute(*args, **kwargs)
+
+    return CountedHttpRequest
+
+
+def _build(service_name, version, credentials):
+    """Authenticated API client; GOOGLE_API_ENDPOINT overrides the API host (benchmarks use a local stub)."""
+    from googleapiclient.discovery import build
+    endpoint = getattr(settings, 'GOOGLE_API_ENDPOINT', None)
+    return build(
+        service_name, version, credentials=credentials, requestBuilder=_counted_http_request(),
+        client_options={'api_endpoint': endpoint} if endpoint else None,
+    )
+
 
 class GoogleCalendarService: 
     def __init__(self, user): 
+        from google.oauth2.credentials import Credentials
+        self.user_id = user.id
+        # Recurring masters fetched by list_events, by (calendar_id, event_id); dropped on any write
+        self._masters = {}
         try:
             token = SocialToken.objects.filter(account__user=user, account__provider='google').first()
             if token is None:
@@ -32,13 +68,16 @@ class GoogleCalendarService:
             # Test the credentials and refresh if needed
             if not creds.valid:
                 if creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
+                    from google.auth.transport.requests import Request
+                    with span('google.token_refresh'):
+                        creds.refresh(Request())
                     token.token = creds.token
                     token.save()
                 elif creds.expired and not creds.refresh_token:
                     # Cannot refresh without a refresh token; instruct caller to reconnect
                     raise Exception("Your Google connection expired and no refresh token is on file. Please reconnect your Google account.")
-            self.service = build('calendar', 'v3', credentials=self.creds) # to build an authenticated version 3 Calendar API client 
+            with span('google.build'):
+                self.service = _build('calendar', 'v3', self.creds) # to build an authenticated version 3 Calendar API client 
 
         except Exception as e:
             logger.error(f"Failed to initialize Google Calendar service: {e}", exc_info=True)
@@ -68,6 +107,25 @@ class GoogleCalendarService:
 
         # Helper to fetch events for a single query
         def fetch(query_term):
+            # An unfiltered listing over a bounded range fetches each series once and expands
+            # it here. Searches keep Google's expansion: whether a text search also returns a
+            # series' cancelled instances isn't documented, and missing one would resurrect it.
+            if query_term is None and time_max and getattr(settings, 'RECURRENCE_EXPANSION', 'local') == 'local':
+                items = self.service.events().list(
+                    calendarId=calendar_id,
+                    timeMin=time_min,
+                    timeMax=time_max,
+                    singleEvents=False
+                ).execute().get('items', [])
+                try:
+                    events = expand_events(items, time_min, time_max)
+                except UnsupportedRecurrence as e:
+                    logger.info(f"Letting Google expand recurring events: {e}")
+                else:
+                    RECURRENCE_EXPANSIONS.inc(expander='local')
+                    self._masters.update(((calendar_id, item['id']), item) for item in items if item.get('recurrence'))
+                    return events
+            RECURRENCE_EXPANSIONS.inc(expander='google')
             return self.service.events().list(
                 calendarId=calendar_id,
                 timeMin=time_min,
@@ -106,16 +164,33 @@ class GoogleCalendarService:
     def list_calendars(self):
         return self.service.calendarList().list().execute().get("items", [])
     
+    # Every write drops the user's cached listings once Google has answered (even with an error)
     def create_event(self, calendar_id, event_body):
-        return self.service.events().insert(calendarId=calendar_id, body=event_body).execute()
+        try:
+            return self.service.events().insert(calendarId=calendar_id, body=event_body).execute()
+        finally:
+            self._masters.clear()
+            invalidate_listings(self.user_id)
     
     def update_event(self, calendar_id, event_id, event_body):
-        return self.service.events().update(calendarId=calendar_id, eventId=event_id, body=event_body,).execute()
+        try:
+            return self.service.events().update(calendarId=calendar_id, eventId=event_id, body=event_body,).execute()
+        finally:
+            self._masters.clear()
+            invalidate_listings(self.user_id)
     
     def delete_event(self, calendar_id, event_id):
-        return self.service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+        try:
+            return self.service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+        finally:
+            self._masters.clear()
+            invalidate_listings(self.user_id)
 
     def get_event(self, calendar_id, event_id):
+        # Series operations look up the master of an instance listed moments ago
+        master = self._masters.get((calendar_id, event_id))
+        if master is not None:
+            return copy.deepcopy(master)
         return self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
     
     def find_free_slots(
@@ -164,7 +239,7 @@ class GoogleCalendarService:
     def send_email(self, to, subject, body):
         """Send email using Gmail API"""
         try:
-            service = build('gmail', 'v1', credentials=self.creds)
+            service = _build('gmail', 'v1', self.creds)
             message = {
                 'raw': base64.urlsafe_b64encode(f'To: {to}\nSubject: {subject}\nContent-Type: text/plain; charset=utf-8\n\n{body}'.encode()).decode()
             }
@@ -0,0 +1,181 @@
+from django.core.cache import cache
+from django.utils import timezone
+from home_page.services.metrics import REGISTRY
+import contextlib
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Consecutive failures that trip a breaker
+FAILURE_THRESHOLD = 5
+
+# Seconds an open breaker fast-fails before letting a probe through
+RECOVERY_TIMEOUT = 60
+
+# Cache key holding the latest snapshot of every breaker, updated on each transition.
+# settings.CACHES is shared between processes, so the web process's metrics report the
+# breakers that trip in the reminder worker.
+STATE_CACHE_KEY = 'notification_circuit_breakers'
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    CLOSED: calls go through; FAILURE_THRESHOLD consecutive failures open it.
+    OPEN: allow() returns False (callers fast-fail or reroute) until the
+    recovery timeout passes.
+    HALF_OPEN: a single probe call is allowed; success closes the breaker,
+    failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold: int = FAILURE_THRESHOLD, recovery_timeout: float = RECOVERY_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error = None
+        self.opened_at = None
+        self._open_for = recovery_timeout
+        self._probe_started = None
+        self._unpublished = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """
+        Hold the lock, then publish any transition once it is released: the cache
+        write can be a database round trip, and sender threads wait on this lock.
+        """
+        with self._lock:
+            yield
+            snapshot, self._unpublished = self._unpublished, None
+        if snapshot is not None:
+            _publish(self.name, snapshot)
+
+    def allow(self) -> bool:
+        """Whether a call to the provider may be attempted now."""
+        with self._locked():
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self._open_for:
+                    return False
+                self._transition(HALF_OPEN)
+            # HALF_OPEN: let exactly one probe through. A probe whose outcome was
+            # never recorded stops blocking others after another recovery timeout.
+            now = time.monotonic()
+            if self._probe_started is not None and now - self._probe_started < self.recovery_timeout:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._locked():
+            self.failures = 0
+            self._probe_started = None
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, error=None):
+        with self._locked():
+            self.failures += 1
+            self.last_error = str(error) if error else None
+            self._probe_started = None
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open(self.recovery_timeout)
+
+    def trip(self, error=None, open_for: float = None):
+        """Open immediately, e.g. when the provider reports exhausted credits."""
+        with self._locked():
+            self.last_error = str(error) if error else None
+            self._probe_started = None
+            self._open(open_for or self.recovery_timeout)
+
+    def _open(self, open_for):
+        self.opened_at = time.monotonic()
+        self._open_for = open_for
+        self._transition(OPEN)
+
+    def _transition(self, state):
+        previous, self.state = self.state, state
+        if previous != state:
+            logger.warning(f"Circuit breaker '{self.name}': {previous} -> {state}" + (f" ({self.last_error})" if self.last_error and state == OPEN else ""))
+            self._unpublished = self.snapshot()
+
+    def snapshot(self) -> dict:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(0.0, round(self._open_for - (time.monotonic() - self.opened_at), 1))
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'last_error': self.last_error,
+            'retry_in_seconds': retry_in,
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name) -> CircuitBreaker:
+    """Process-wide breaker for a provider ('zeptomail', 'smtp', 'twilio')."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def breaker_states() -> dict:
+    """Monitoring view of every breaker in this process."""
+    return {name: breaker.snapshot() for name, breaker in list(_breakers.items())}
+
+
+def published_states() -> dict:
+    """The last published snapshot of every breaker, from whichever process it tripped in."""
+    try:
+        published = cache.get(STATE_CACHE_KEY)
+    except Exception as e:
+        logger.debug(f"Could not read circuit breaker state: {e}")
+        published = None
+    return (published or {}).get('breakers', {})
+
+
+# Gauge values for the metrics endpoint
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _collect_metrics():
+    lines = [
+        "# HELP zelmind_circuit_breaker_state Provider circuit state (0 closed, 1 half-open, 2 open).",
+        "# TYPE zelmind_circuit_breaker_state gauge",
+    ]
+    # A provider's breaker exists in each process that calls it; report the worst state
+    values = {name: STATE_VALUES[state['state']] for name, state in published_states().items()}
+    for name, state in breaker_states().items():
+        values[name] = max(values.get(name, 0), STATE_VALUES[state['state']])
+    for name, value in sorted(values.items()):
+        lines.append(f'zelmind_circuit_breaker_state{{provider="{name}"}} {value}')
+    return lines
+
+
+REGISTRY.register_collector(_collect_metrics)
+
+
+def _publish(name, snapshot):
+    # Merged into the shared snapshot, so processes don't overwrite each other's breakers.
+    # Transitions are rare; two processes racing here lose at most one update until the next.
+    try:
+        breakers = {**published_states(), name: snapshot}
+        cache.set(STATE_CACHE_KEY, {'updated_at': timezone.now().isoformat(), 'breakers': breakers}, None)
+    except Exception as e:
+        logger.debug(f"Could not publish circuit breaker state: {e}")
@@ -0,0 +1,79 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationContext:
+    """
+    Recent text history for a single conversation, loaded once per request.
+
+    The intent classifier, the parameter extractor and the general chat prompt
+    all need the last few text messages of the same conversation. Instead of
+    each one running its own query, they slice from this window.
+    """
+
+    # Largest window any prompt builder asks for (parameter extraction uses 6)
+    DEFAULT_WINDOW = 6
+
+    def __init__(self, conversation=None, window: int = DEFAULT_WINDOW):
+        self.conversation = conversation
+        self.window = window
+        self._turns = None
+
+    @classmethod
+    def for_conversation(cls, conversation, window: int = DEFAULT_WINDOW):
+        """Accept a Conversation, an existing context or None."""
+        if isinstance(conversation, cls):
+            return conversation
+        return cls(conversation, window=window)
+
+    def _load(self):
+        if self._turns is not None:
+            return self._turns
+
+        if self.conversation is None:
+            self._turns = []
+            return self._turns
+
+        # Served by the (conversation, timestamp) index on Message
+        rows = (
+            self.conversation.messages
+            .filter(text__isnull=False, text__gt='')
+            .order_by('-timestamp')
+            .values_list('sender', 'text')[:self.window]
+        )
+        # Reverse to chronological order once, store as (role, text) pairs
+        self._turns = [
+            ("user" if sender == "user" else "assistant", text)
+            for sender, text in reversed(list(rows))
+        ]
+        return self._turns
+
+    def history(self, limit: int = None, dedupe: bool = False) -> list:
+        """
+        Return the last `limit` messages as Claude-style role/content dicts.
+
+        With dedupe=True, messages whose first 50 characters repeat an earlier
+        one are dropped and content is stripped (used by general chat).
+        """
+        turns = self._load()
+        if limit is not None:
+            if limit > self.window:
+                logger.warning(f"History limit {limit} exceeds loaded window {self.window}; truncating.")
+            turns = turns[-limit:] if limit > 0 else []
+
+        if not dedupe:
+            return [{"role": role, "content": text} for role, text in turns]
+
+        seen_content = set()
+        messages = []
+        for role, text in turns:
+            stripped = text.strip()
+            if not stripped:
+                continue
+            content_key = stripped[:50].lower()
+            if content_key in seen_content:
+                continue
+            seen_content.add(content_key)
+            messages.append({"role": role, "content": stripped})
+        return messages
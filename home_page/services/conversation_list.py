@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.urls import reverse
+from ..models import Conversation
+from .keyset import keyset_page
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of conversations rendered in the sidebar per page (initial render and each scroll page)
+SIDEBAR_PAGE_SIZE = 30
+
+# The count changes only when a conversation is created or deleted (invalidated in home_page.signals,
+# through the shared cache in settings.CACHES so every worker process sees it)
+CONVERSATION_COUNT_TTL = 60 * 60
+
+
+def fetch_sidebar_page(user, before: str = None, limit: int = SIDEBAR_PAGE_SIZE):
+    """
+    Return (rows, next_cursor) for one page of the user's conversations, newest first.
+
+    Rows are plain dicts with only the fields the sidebar renders
+    (id, title, created_at), served by the (user, -created_at) index.
+    """
+    qs = Conversation.objects.filter(user=user).values('id', 'title', 'created_at')
+    return keyset_page(qs, 'created_at', before=before, limit=limit)
+
+
+def _count_cache_key(user_id) -> str:
+    return f"sidebar_conversation_count:{user_id}"
+
+
+def conversation_count(user) -> int:
+    """Cached number of conversations a user has."""
+    key = _count_cache_key(user.id)
+    count = cache.get(key)
+    if count is None:
+        count = Conversation.objects.filter(user=user).count()
+        cache.set(key, count, CONVERSATION_COUNT_TTL)
+    return count
+
+
+def invalidate_conversation_count(user_id):
+    cache.delete(_count_cache_key(user_id))
+
+
+def sidebar_context(user) -> dict:
+    """Template context for the Recents sidebar in base.html."""
+    rows, next_cursor = fetch_sidebar_page(user)
+    return {
+        "conversations": rows,
+        "conversation_count": conversation_count(user),
+        "more_conversations_cursor": next_cursor,
+        "more_conversations_url": reverse('home_page:conversation_list'),
+    }
@@ -0,0 +1,234 @@
+from dataclasses import dataclass, field
+from typing import Callable
+from django.conf import settings
+from django.db import close_old_connections
+from home_page.services.metrics import NOTIFICATIONS_SENT, NOTIFICATIONS_FAILED, SCAN_TO_SEND_SECONDS
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-channel throughput defaults, overridable with settings.NOTIFICATION_CHANNEL_LIMITS.
+# rate: sustained sends per second; burst: bucket size; concurrency: worker threads.
+# Twilio WhatsApp senders start at 80 MPS and ZeptoMail throttles bursts with 429s,
+# so both defaults stay well below what the providers accept.
+DEFAULT_CHANNEL_LIMITS = {
+    'whatsapp': {'rate': 20, 'burst': 20, 'concurrency': 4},
+    'email': {'rate': 10, 'burst': 10, 'concurrency': 2},
+}
+
+# Emails taken off the queue per EmailBatcher flush
+EMAIL_BATCH_SIZE = 50
+
+
+@dataclass
+class Notification:
+    """One outbound message. `on_result(ok: bool)` runs on the channel worker after delivery."""
+    channel: str
+    to: str
+    body: str
+    subject: str = None
+    content_sid: str = None
+    content_variables: str = None
+    on_result: Callable = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Block until a token is available. Returns False if `timeout` expires first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                wait = min(wait, deadline - now)
+            time.sleep(wait)
+
+
+class Channel:
+    """
+    A delivery queue with its own rate limit and worker threads.
+
+    `deliver(notifications)` receives a list of up to `batch_size` notifications
+    and returns one bool per notification.
+    """
+
+    def __init__(self, name, deliver, rate, burst, concurrency, batch_size=1):
+        self.name = name
+        self.deliver = deliver
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.concurrency:
+            thread = threading.Thread(target=self._run, name=f"dispatch-{self.name}-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _take_batch(self):
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                for _ in batch:
+                    self.bucket.acquire()
+                try:
+                    results = self.deliver(batch)
+                except Exception as e:
+                    logger.error(f"{self.name} delivery failed: {e}", exc_info=True)
+                    results = [False] * len(batch)
+
+                delivered_at = time.monotonic()
+                for notification, ok in zip(batch, results):
+                    if ok:
+                        NOTIFICATIONS_SENT.inc(channel=self.name)
+                        SCAN_TO_SEND_SECONDS.observe(delivered_at - notification.enqueued_at, channel=self.name)
+                    else:
+                        NOTIFICATIONS_FAILED.inc(channel=self.name)
+                    if notification.on_result:
+                        try:
+                            notification.on_result(ok)
+                        except Exception as e:
+                            logger.error(f"{self.name} result callback failed for {notification.to}: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+                close_old_connections()
+
+
+def deliver_whatsapp(notifications):
+    # Template -> plain body fallback lives in send_whatsapp_message
+    from home_page.services.notification_service import send_whatsapp_message
+    return [
+        send_whatsapp_message(n.to, body=n.body, content_sid=n.content_sid, content_variables=n.content_variables)
+        for n in notifications
+    ]
+
+
+def deliver_email(notifications):
+    # ZeptoMail -> SMTP fallback (and circuit breaking) lives in EmailBatcher
+    from home_page.services.email_batcher import EmailBatcher
+    results = [False] * len(notifications)
+    # Collect through callbacks: the batcher flushes itself as soon as the batch is full
+    with EmailBatcher(max_batch_size=len(notifications)) as batcher:
+        for i, n in enumerate(notifications):
+            batcher.add(n.to, n.subject, n.body, on_result=lambda result, i=i: results.__setitem__(i, result.ok))
+    return results
+
+
+CHANNEL_DELIVERY = {
+    'whatsapp': (deliver_whatsapp, 1),
+    'email': (deliver_email, EMAIL_BATCH_SIZE),
+}
+
+
+class NotificationDispatcher:
+    """
+    Outbound notification subsystem: scanners call enqueue() and return;
+    each channel delivers on its own workers, within its own rate limit.
+    """
+
+    def __init__(self, channels: dict = None):
+        if channels is None:
+            limits = {**DEFAULT_CHANNEL_LIMITS, **getattr(settings, 'NOTIFICATION_CHANNEL_LIMITS', {})}
+            channels = {
+                name: Channel(name, deliver, batch_size=batch_size, **limits[name])
+                for name, (deliver, batch_size) in CHANNEL_DELIVERY.items()
+            }
+        self.channels = channels
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            for channel in self.channels.values():
+                channel.start()
+            self._started = True
+
+    def stop(self, drain: bool = True, timeout: float = 30):
+        if drain:
+            self.drain(timeout)
+        with self._lock:
+            for channel in self.channels.values():
+                channel.stop()
+            self._started = False
+
+    def enqueue(self, notification: Notification):
+        if notification.channel not in self.channels:
+            raise ValueError(f"Unknown notification channel: {notification.channel}")
+        if not self._started:
+            self.start()
+        self.channels[notification.channel].queue.put(notification)
+
+    def pending(self) -> dict:
+        return {name: channel.queue.unfinished_tasks for name, channel in self.channels.items()}
+
+    def drain(self, timeout: float = 30) -> bool:
+        """Wait until everything enqueued so far has been delivered. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while any(self.pending().values()):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Process-wide dispatcher; its workers start on first enqueue."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher()
+    return _dispatcher
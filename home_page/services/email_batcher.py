@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Callable
+from django.conf import settings
+from django.core.mail import get_connection, EmailMessage
+from home_page.services.zeptomail import send_email_zeptomail, EmailSendResult
+from home_page.services.circuit_breaker import get_breaker
+import smtplib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Emails sent per flush; the batcher flushes automatically when this many are queued
+MAX_BATCH_SIZE = 50
+
+# SMTP connect/IO timeout in seconds (fail fast, SMTP is only the fallback)
+SMTP_TIMEOUT = 10
+
+
+@dataclass
+class OutboundEmail:
+    to_email: str
+    subject: str
+    body: str
+    # Called with the EmailSendResult for this recipient once the batch is flushed
+    on_result: Callable = None
+
+
+def _smtp_available() -> bool:
+    if not settings.EMAIL_HOST_USER:
+        return False
+    # Real SMTP needs credentials; other backends (console, locmem) don't
+    return bool(settings.EMAIL_HOST_PASSWORD) or settings.EMAIL_BACKEND != 'django.core.mail.backends.smtp.EmailBackend'
+
+
+class EmailBatcher:
+    """
+    Collects the emails of one worker tick and delivers them together.
+
+    Each email goes to ZeptoMail first (over its pooled keep-alive session).
+    Those it cannot deliver, including while ZeptoMail's circuit breaker is
+    open, are retried over a single SMTP connection opened once per flush,
+    instead of one connection per email. SMTP has its own breaker, so a
+    blocked SMTP port fast-fails instead of timing out every flush. Every
+    recipient gets its own result, so one bad address does not fail the batch.
+
+    Use as a context manager so the remaining emails are flushed on exit:
+
+        with EmailBatcher() as batcher:
+            batcher.add(to_email, subject, body, on_result=record)
+    """
+
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE):
+        self.max_batch_size = max_batch_size
+        self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, to_email, subject, body, on_result=None):
+        self._pending.append(OutboundEmail(to_email, subject, body, on_result))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+
+    def flush(self) -> list:
+        """Send everything queued. Returns [(OutboundEmail, EmailSendResult)] in queue order."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return []
+
+        results = {}
+        if getattr(settings, 'ZEPTOMAIL_API_TOKEN', None):
+            results = self._send_zeptomail(batch)
+
+        fallback = [email for email in batch if id(email) not in results or not results[id(email)].ok]
+        if fallback and _smtp_available():
+            results.update(self._send_smtp(fallback))
+
+        delivered = []
+        for email in batch:
+            result = results.get(id(email))
+            if result is None:
+                result = EmailSendResult(EmailSendResult.NOT_CONFIGURED, error="No email provider configured")
+            delivered.append((email, result))
+            if email.on_result:
+                try:
+                    email.on_result(result)
+                except Exception as e:
+                    logger.error(f"Email result callback failed for {email.to_email}: {e}", exc_info=True)
+
+        sent = sum(1 for _, result in delivered if result.ok)
+        logger.info(f"Email batch flushed: {sent}/{len(batch)} sent")
+        return delivered
+
+    def _send_zeptomail(self, batch) -> dict:
+        # Once credits run out the breaker opens and the rest of the batch fast-fails to SMTP
+        return {id(email): send_email_zeptomail(email.to_email, email.subject, email.body) for email in batch}
+
+    def _send_smtp(self, emails) -> dict:
+        results = {}
+        breaker = get_breaker('smtp')
+        if not breaker.allow():
+            return {id(email): EmailSendResult(EmailSendResult.CIRCUIT_OPEN, error="SMTP circuit open") for email in emails}
+
+        connection = get_connection(fail_silently=False, timeout=SMTP_TIMEOUT)
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error(f"SMTP connection failed: {e}")
+            breaker.record_failure(e)
+            return {id(email): EmailSendResult(EmailSendResult.FAILED, error=str(e), attempts=1) for email in emails}
+        breaker.record_success()
+
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=settings.EMAIL_HOST_USER,
+                    to=[email.to_email],
+                    connection=connection,
+                )
+                try:
+                    message.send(fail_silently=False)
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped the (long-lived) connection; reconnect once and retry this email
+                    try:
+                        connection.close()
+                        connection.open()
+                        message.send(fail_silently=False)
+                    except Exception as e:
+                        logger.error(f"SMTP email failed to {email.to_email}: {e}")
+                        breaker.record_failure(e)
+                        results[id(email)] = EmailSendResult(EmailSendResult.FAILED, error=str(e), attempts=2)
+                        continue
+                except Exception as e:
+                    logger.error(f"SMTP email failed to {email.to_email}: {e}")
+                    results[id(email)] = EmailSendResult(EmailSendResult.FAILED, error=str(e), attempts=1)
+                    continue
+                logger.info(f"SMTP Email sent to {email.to_email}")
+                results[id(email)] = EmailSendResult(EmailSendResult.SENT, attempts=1)
+        finally:
+            connection.close()
+        return results
@@ -0,0 +1,49 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from django.core.cache import cache
+from django.db import close_old_connections
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional work on an agent message that the reply doesn't wait for (e.g. the AI closing
+# remark of an event listing). The message is marked pending until the work finishes, so
+# the frontend knows whether to poll for the final text; the mark expires on its own if
+# the process dies first.
+FOLLOWUP_WORKERS = 4
+FOLLOWUP_PENDING_TTL = 60
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _pending_key(message_id) -> str:
+    return f"message_followup:{message_id}"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FOLLOWUP_WORKERS, thread_name_prefix='followup')
+        return _executor
+
+
+def _run(message_id, fn, args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        logger.error(f"Follow-up for message {message_id} failed: {e}", exc_info=True)
+    finally:
+        cache.delete(_pending_key(message_id))
+        close_old_connections()
+
+
+def defer(message_id, fn, *args) -> Future:
+    """Run fn(*args) in the background on behalf of message `message_id`."""
+    cache.set(_pending_key(message_id), True, FOLLOWUP_PENDING_TTL)
+    return _get_executor().submit(_run, message_id, fn, args)
+
+
+def is_pending(message_id) -> bool:
+    return bool(cache.get(_pending_key(message_id)))
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.utils import timezone
+from home_page.models import InboundWhatsAppMessage, NotificationPreference, SentNotification
+from home_page.services.phone_numbers import normalize_whatsapp_number
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows handled per drain; the worker calls again on its next tick
+BATCH_SIZE = 100
+
+# Give up on an event after this many failed attempts
+MAX_ATTEMPTS = 5
+
+
+def enqueue_inbound_whatsapp(message_sid, from_number, body):
+    """
+    Record an inbound webhook event with a single INSERT.
+
+    Twilio retries deliver the same MessageSid again; the unique constraint
+    turns those into no-ops, so a command is never queued twice.
+    """
+    InboundWhatsAppMessage.objects.bulk_create(
+        [InboundWhatsAppMessage(message_sid=message_sid, from_number=from_number, body=body)],
+        ignore_conflicts=True,
+    )
+
+
+def _apply_command(event):
+    """Apply one event. Returns the final status ('processed' or 'ignored')."""
+    command = (event.body or '').strip().upper()
+    if command != 'OFF' and not command.startswith('SNOOZE'):
+        return 'ignored'
+
+    try:
+        number = normalize_whatsapp_number(event.from_number)
+    except ValueError:
+        number = None
+    prefs = NotificationPreference.objects.select_related('user').filter(whatsapp_number=number).first() if number else None
+    if not prefs:
+        logger.warning(f"WhatsApp reply from unknown number: {event.from_number}")
+        return 'ignored'
+
+    user = prefs.user
+    if command == 'OFF':
+        if prefs.whatsapp_enabled:
+            prefs.whatsapp_enabled = False
+            prefs.save(update_fields=['whatsapp_enabled', 'updated_at'])
+        return 'processed'
+
+    # SNOOZE: find the last sent reminder for this user
+    last_notif = SentNotification.objects.filter(
+        user=user,
+        notification_type='whatsapp',
+        status='sent'
+    ).order_by('-timestamp').first()
+
+    if last_notif:
+        # Snooze period starts when the user replied, not when the worker got to it
+        last_notif.status = 'snoozed'
+        last_notif.timestamp = event.received_at
+        last_notif.save(update_fields=['status', 'timestamp'])
+        logger.info(f"Snoozed reminder for {user.username}")
+    return 'processed'
+
+
+def process_inbound_whatsapp(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Apply pending inbound WhatsApp commands (OFF / SNOOZE) in arrival order.
+
+    Each event is applied and marked done in the same transaction, so an event
+    is applied at most once even if several workers drain concurrently (rows are
+    claimed with SKIP LOCKED where the database supports it). Returns the number
+    of events handled.
+    """
+    handled = 0
+    with transaction.atomic():
+        events = list(
+            InboundWhatsAppMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('received_at')[:batch_size]
+        )
+        for event in events:
+            event.attempts += 1
+            try:
+                with transaction.atomic():
+                    event.status = _apply_command(event)
+                    event.processed_at = timezone.now()
+            except Exception as e:
+                logger.error(f"Error handling WhatsApp reply {event.message_sid}: {e}", exc_info=True)
+                if event.attempts >= MAX_ATTEMPTS:
+                    event.status = 'failed'
+            event.save(update_fields=['status', 'attempts', 'processed_at'])
+            handled += 1
+    return handled
@@ -0,0 +1,43 @@
+from datetime import datetime
+from django.db.models import Q
+import base64
+
+
+def encode_cursor(timestamp, pk) -> str:
+    """Opaque keyset cursor pointing at a row's (timestamp, pk) position."""
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor, returning (timestamp, pk as str). Raises ValueError on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ts_str, pk_str = raw.rsplit('|', 1)
+        return datetime.fromisoformat(ts_str), pk_str
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_page(queryset, timestamp_field: str, before: str = None, limit: int = 50):
+    """
+    Return (rows, next_cursor) for the `limit` newest rows of `queryset` strictly
+    older than the `before` cursor, newest first. Rows may be model instances or
+    values() dicts. next_cursor is None once there is nothing older.
+    """
+    if before:
+        ts, pk = decode_cursor(before)
+        queryset = queryset.filter(
+            Q(**{f"{timestamp_field}__lt": ts}) | Q(**{timestamp_field: ts, 'pk__lt': pk})
+        )
+
+    # Fetch one extra row to learn whether an older page exists
+    rows = list(queryset.order_by(f'-{timestamp_field}', '-pk')[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor(last[timestamp_field], last['id'])
+    return rows, encode_cursor(getattr(last, timestamp_field), last.pk)
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from django.db import IntegrityError, close_old_connections
+from django.db.models import DateTimeField, ExpressionWrapper, Q
+from django.db.models.functions import Now
+from home_page.models import SchedulerLease
+import os
+import socket
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+REMINDER_SCHEDULER_LEASE = 'reminder-scheduler'
+
+# A leader renews every RENEW_INTERVAL seconds; if it dies, a standby takes over
+# within LEASE_TTL + RENEW_INTERVAL seconds (immediately after a clean release).
+LEASE_TTL = 15
+RENEW_INTERVAL = 5
+
+
+def default_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _expires_in(seconds):
+    # Expiry is computed on the database clock so hosts with skewed clocks agree on it
+    return ExpressionWrapper(Now() + timedelta(seconds=seconds), output_field=DateTimeField())
+
+
+def try_acquire_lease(name, holder, ttl=LEASE_TTL) -> bool:
+    """
+    Take the lease if it is free or expired, or renew it if `holder` already has it.
+
+    Each path is a single conditional UPDATE, so two candidates can never both succeed.
+    """
+    if not SchedulerLease.objects.filter(name=name).exists():
+        try:
+            SchedulerLease.objects.create(name=name, expires_at=Now())
+        except IntegrityError:
+            pass  # another candidate created it first
+
+    renewed = SchedulerLease.objects.filter(name=name, holder=holder, expires_at__gt=Now()).update(expires_at=_expires_in(ttl))
+    if renewed:
+        return True
+    return bool(
+        SchedulerLease.objects
+        .filter(name=name)
+        .filter(Q(expires_at__lte=Now()) | Q(holder=''))
+        .update(holder=holder, expires_at=_expires_in(ttl), acquired_at=Now())
+    )
+
+
+def release_lease(name, holder):
+    """Give the lease up so a standby can take over without waiting for it to expire."""
+    SchedulerLease.objects.filter(name=name, holder=holder).update(holder='', expires_at=Now())
+
+
+class LeaderElector:
+    """
+    Campaigns for a named lease on a heartbeat thread.
+
+    `is_leader` is only true while the last successful renewal is younger than
+    the TTL by this process's own clock, so a leader that can't reach the
+    database steps down before a standby can take over.
+    """
+
+    def __init__(self, name, holder=None, ttl=LEASE_TTL, renew_interval=RENEW_INTERVAL):
+        self.name = name
+        self.holder = holder or default_holder_id()
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self._valid_until = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._valid_until is not None and time.monotonic() < self._valid_until
+
+    def campaign(self) -> bool:
+        """One acquire-or-renew attempt. Returns whether this process is now the leader."""
+        was_leader = self.is_leader
+        started = time.monotonic()
+        try:
+            acquired = try_acquire_lease(self.name, self.holder, self.ttl)
+        except Exception as e:
+            logger.error(f"Lease '{self.name}' renewal failed: {e}")
+            acquired = None
+
+        if acquired:
+            self._valid_until = started + self.ttl
+        elif acquired is False:
+            self._valid_until = None
+
+        if self.is_leader != was_leader:
+            logger.info(f"Lease '{self.name}': {self.holder} {'became leader' if self.is_leader else 'is no longer leader'}.")
+        return self.is_leader
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"lease-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self, release: bool = True):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.renew_interval + 5)
+        if release and self._valid_until is not None:
+            try:
+                release_lease(self.name, self.holder)
+            except Exception as e:
+                logger.error(f"Could not release lease '{self.name}': {e}")
+        self._valid_until = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.campaign()
+            close_old_connections()
+            self._stop.wait(self.renew_interval)
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from .metrics import LISTING_CACHE
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rendered list_events replies, per user, keyed by the normalized search and date range.
+# Writes through GoogleCalendarService bump the user's generation, orphaning every entry
+# at once; the generation lives in the shared cache (settings.CACHES), so a write handled
+# by one worker process invalidates the listings every other process would serve. The TTL
+# bounds staleness from edits made outside the app, and the cache backend's own culling
+# evicts entries beyond its size limit.
+LISTING_TTL = 5 * 60
+
+
+def _generation_key(user_id) -> str:
+    return f"listing_generation:{user_id}"
+
+
+def _generation(user_id) -> int:
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # add() so two first requests don't reset each other's bump
+        cache.add(key, 1, None)
+        generation = cache.get(key, 1)
+    return generation
+
+
+def _normalize_terms(query, queries) -> list:
+    terms = [query] if query else []
+    if isinstance(queries, list):
+        terms += queries
+    return sorted({' '.join(str(t).lower().split()) for t in terms if t})
+
+
+def listing_cache_key(user_id, start_date, end_date, query=None, queries=None, tz=None, today=None) -> str:
+    # `today` is part of the key: listings mark "(Today)" and titles say "Today's Schedule"
+    spec = json.dumps([start_date, end_date, _normalize_terms(query, queries), str(tz), str(today)])
+    digest = hashlib.sha1(spec.encode()).hexdigest()
+    return f"listing:{user_id}:{_generation(user_id)}:{digest}"
+
+
+def get_listing(key: str):
+    """The rendered listing stored under `key`, or None."""
+    listing = cache.get(key)
+    LISTING_CACHE.inc(result='hit' if listing is not None else 'miss')
+    return listing
+
+
+def store_listing(key: str, listing: str):
+    cache.set(key, listing, LISTING_TTL)
+
+
+def invalidate_listings(user_id):
+    """Forget every cached listing for a user (their calendar changed)."""
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        # No generation yet, so nothing is cached under one
+        pass
@@ -0,0 +1,156 @@
+"""
+Rule-based parameter extraction for the most common calendar commands.
+
+"schedule dentist tomorrow 3pm to 4pm", "what's on my calendar next week" and
+"am I free on friday" don't need the multi-thousand-token extraction prompt:
+when a message matches one of these patterns *completely* it is turned into
+the same {"action", "params"} structure Claude returns. Anything less certain
+(attendees, recurrence, locations, references to earlier messages, ambiguous
+times) returns None and goes to Claude as before.
+
+Date expressions are passed through as written ("tomorrow", "next week"); the
+action handlers resolve them in the client's timezone.
+"""
+from typing import Optional
+from home_page.chat_actions.dates import resolve_range, search_expression
+from home_page.chat_actions.parsing import parse_time_only
+import re
+
+_WHITESPACE = re.compile(r'\s+')
+_POLITE = re.compile(r"^(?:(?:hey|hi|ok|okay),?\s+)?(?:(?:please|can you|could you|would you|will you)\s+)?(?:please\s+)?")
+_TRAILING = re.compile(r'[\s?.!]+$')
+
+_NOUNS = r'(?:events|calendar|schedule|meetings|agenda|appointments)'
+LIST_COMMAND = re.compile(
+    rf"^(?:(?:list|show(?: me)?|display|check)\s+(?:all\s+)?(?:of\s+)?(?:my\s+)?{_NOUNS}"
+    r"|what(?:'s| is) on(?: my (?:calendar|schedule|agenda))?"
+    r"|what(?:'s| is) my (?:calendar|schedule|agenda)(?: like)?"
+    r"|what (?:events |meetings )?do i have(?: on)?"
+    r"|do i have anything(?: on)?)"
+    r"(?:\s+(?:for|on|in|during))?\s+(?P<when>.+)$"
+)
+FREE_COMMAND = re.compile(
+    r"^(?:when am i (?:free|available)|am i (?:free|available)"
+    r"|find (?:me )?(?:some )?free (?:time|slots)|show (?:me )?my free (?:time|slots))"
+    r"(?:\s+(?:for|on|in|during))?\s+(?P<when>.+)$"
+)
+CREATE_COMMAND = re.compile(r'^(?:schedule|book|add|create|set up|put)\s+(?P<rest>.+)$')
+_TO_CALENDAR = re.compile(r'\s+(?:to|on|in|into) my calendar$')
+
+# Only unambiguous clock times: "3pm", "3:30 pm", "15:00", "noon". A bare "3" is left to Claude.
+_CLOCK = r'(?:\d{1,2}(?::\d{2})?\s*(?:am|pm)|\d{1,2}:\d{2}|noon|midnight)'
+_DURATION = r'(?:\d+(?:\.\d+)?\s*(?:hours?|hrs?|minutes?|mins?))'
+TIME_SPAN = re.compile(
+    rf'\b(?:from\s+)?(?P<start>{_CLOCK})\s*(?:to|-|until|till)\s*(?P<end>{_CLOCK})(?!\S)'
+    rf'|\b(?:at\s+)?(?P<at>{_CLOCK})\s+for\s+(?:an?\s+)?(?P<duration>{_DURATION}|hour|half an hour)(?!\S)'
+)
+
+# Connectives dropped from the edges of a title; inside one they mean there is more to it
+# (a location, attendees, recurrence, a second event, a reference to an earlier message).
+_EDGE_WORDS = {'on', 'at', 'for', 'from', 'a', 'an', 'the', 'my', 'new'}
+_UNSURE_WORDS = {
+    'with', 'at', 'on', 'for', 'from', 'in', 'to', 'by', 'and', 'or', 'every', 'each', 'daily',
+    'weekly', 'monthly', 'yearly', 'repeat', 'repeating', 'recurring', 'until', 'remind', 'reminder',
+    'invite', 'it', 'that', 'this', 'them', 'another', 'same', 'again', 'instead', 'free', 'busy',
+}
+MAX_TITLE_WORDS = 6
+
+
+def _prepare(text: str) -> str:
+    text = _WHITESPACE.sub(' ', str(text).replace('’', "'")).strip()
+    text = _TRAILING.sub('', text)
+    return text[_POLITE.match(text.lower()).end():]
+
+
+def _whole_range(expression: str) -> Optional[str]:
+    return expression if resolve_range(expression) else None
+
+
+def _blank(text: str, start: int, end: int) -> str:
+    return text[:start] + ' ' * (end - start) + text[end:]
+
+
+def _title(original: str, masked: str) -> Optional[str]:
+    # Words that survive masking, in the user's own casing
+    words = [original[m.start():m.end()] for m in re.finditer(r'\S+', masked)]
+    while words and words[0].lower() in _EDGE_WORDS:
+        words.pop(0)
+    while words and words[-1].lower() in _EDGE_WORDS:
+        words.pop()
+    if not words or len(words) > MAX_TITLE_WORDS:
+        return None
+    if any(w.lower() in _UNSURE_WORDS or not re.fullmatch(r"[^\W\d_][\w'&-]*", w) for w in words):
+        return None
+    title = ' '.join(words)
+    return title[0].upper() + title[1:]
+
+
+def _create(original: str, lowered: str) -> Optional[dict]:
+    m = CREATE_COMMAND.match(lowered)
+    if not m:
+        return None
+    offset = m.start('rest')
+    original, lowered = original[offset:], lowered[offset:]
+    suffix = _TO_CALENDAR.search(lowered)
+    if suffix:
+        original, lowered = original[:suffix.start()], lowered[:suffix.start()]
+
+    spans = list(TIME_SPAN.finditer(lowered))
+    if len(spans) != 1:
+        return None
+    span = spans[0]
+    params = {}
+    if span.group('start'):
+        start, end = parse_time_only(span.group('start')), parse_time_only(span.group('end'))
+        if not (start and end) or end <= start:
+            return None
+        params.update(start=span.group('start'), end=span.group('end'))
+    else:
+        if not parse_time_only(span.group('at')):
+            return None
+        duration = {'hour': '1 hour', 'half an hour': '30 minutes'}.get(span.group('duration'), span.group('duration'))
+        params.update(start=span.group('at'), duration=duration)
+    masked = _blank(lowered, *span.span())
+
+    # Exactly one date, naming a single day
+    date_match = search_expression(masked)
+    if not date_match:
+        return None
+    found = resolve_range(date_match.group(0))
+    if not found or not found.is_single_day:
+        return None
+    masked = _blank(masked, *date_match.span())
+    if search_expression(masked):
+        return None
+
+    title = _title(original, masked)
+    if not title:
+        return None
+    return {'action': 'create_event', 'params': {'summary': title, 'date': date_match.group(0), **params}}
+
+
+def extract_calendar_command(text) -> Optional[dict]:
+    """
+    {"action", "params"} for a message that is entirely one of the common calendar
+    commands (list events, check availability, create a timed event on one day),
+    else None.
+    """
+    if not text:
+        return None
+    original = _prepare(text)
+    lowered = original.lower()
+    if len(lowered) != len(original):
+        # Case folding changed the length (rare non-ASCII); spans would not line up
+        return None
+
+    m = LIST_COMMAND.match(lowered)
+    if m and _whole_range(m.group('when')):
+        when = m.group('when')
+        return {'action': 'list_events', 'params': {'start_date': when, 'end_date': when}}
+
+    m = FREE_COMMAND.match(lowered)
+    if m and _whole_range(m.group('when')):
+        when = m.group('when')
+        return {'action': 'find_free_slots', 'params': {'start_date': when, 'end_date': when}}
+
+    return _create(original, lowered)
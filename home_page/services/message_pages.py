@@ -0,0 +1,34 @@
+from .keyset import keyset_page
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of messages rendered per page (initial server render and each older page)
+MESSAGE_PAGE_SIZE = 50
+
+
+def fetch_message_page(conversation, before: str = None, limit: int = MESSAGE_PAGE_SIZE):
+    """
+    Return (messages, next_cursor) for one page of a conversation.
+
+    Messages are the `limit` newest messages strictly older than the `before`
+    cursor (or the newest overall), in chronological order. next_cursor is
+    None once the start of the conversation is reached.
+    """
+    rows, next_cursor = keyset_page(conversation.messages.all(), 'timestamp', before=before, limit=limit)
+    rows.reverse()
+    return rows, next_cursor
+
+
+def serialize_message(msg) -> dict:
+    """Template-ready dict for a message, with content pre-serialized for JavaScript."""
+    return {
+        'id': msg.id,
+        'sender': msg.sender,
+        'text': msg.text,
+        'message_type': msg.message_type,
+        'content': msg.content,
+        'content_json': json.dumps(msg.content) if msg.content else None,
+        'timestamp': msg.timestamp,
+    }
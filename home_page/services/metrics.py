@@ -0,0 +1,200 @@
+"""
+In-process counters and histograms, rendered in the Prometheus text format.
+
+Recording a value is a dict update under a lock, with no I/O, so the
+reminder loop and dispatcher workers can record freely. Rendering happens
+on whoever scrapes: the web process serves /metrics, and the reminder
+worker serves its own registry on a local port (start_metrics_server).
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import bisect
+import math
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-10ms API calls up to multi-minute reminder ticks
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labelnames, values, extra=()) -> str:
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state['count'] if state else 0
+
+    def _render_sample(self, key, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['counts']):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            # Re-importing a module returns the metric already registered under that name
+            return self._metrics.setdefault(metric.name, metric)
+
+    def register_collector(self, collector):
+        """`collector()` returns extra exposition lines (e.g. gauges read at scrape time)."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector {collector} failed: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+USERS_SCANNED = counter('zelmind_users_scanned_total', 'Users checked by a notification scan.', ['scan'])
+GOOGLE_API_CALLS = counter('zelmind_google_api_calls_total', 'Google API requests executed.', ['method'])
+CLAUDE_CALLS = counter('zelmind_claude_calls_total', 'Claude messages.create calls.', ['outcome'])
+CALENDAR_EXTRACTIONS = counter('zelmind_calendar_extractions_total', 'Calendar commands turned into action parameters, by extractor (local rules or Claude).', ['extractor'])
+LISTING_CACHE = counter('zelmind_listing_cache_total', 'Lookups of cached list_events replies.', ['result'])
+RECURRENCE_EXPANSIONS = counter('zelmind_recurrence_expansions_total', 'Calendar listings by who expanded their recurring events (the local engine or Google).', ['expander'])
+NOTIFICATIONS_SENT = counter('zelmind_notifications_sent_total', 'Notifications delivered.', ['channel'])
+NOTIFICATIONS_FAILED = counter('zelmind_notifications_failed_total', 'Notifications that could not be delivered.', ['channel'])
+SCAN_TO_SEND_SECONDS = histogram('zelmind_notification_scan_to_send_seconds', 'Time from a scan queueing a notification to its delivery.', ['channel'])
+TICK_DURATION_SECONDS = histogram('zelmind_scheduler_tick_duration_seconds', 'Wall-clock duration of scheduler ticks.', ['scheduler'])
+TICK_LAG_SECONDS = histogram('zelmind_scheduler_tick_lag_seconds', 'Delay between a tick boundary and the tick starting.', ['scheduler'])
+TICKS_SKIPPED = counter('zelmind_scheduler_ticks_skipped_total', 'Tick boundaries coalesced because a tick overran.', ['scheduler'])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would drown the worker's log
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1'):
+    """Serve REGISTRY at http://host:port/metrics from a daemon thread. Returns the server, or None if the port is taken."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics server not started on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
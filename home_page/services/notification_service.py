@@ -1,109 +1,65 @@
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
-from twilio.rest import Client
+from home_page.services.twilio_client import get_twilio_client
+from home_page.services.circuit_breaker import get_breaker
+from home_page.services.metrics import USERS_SCANNED
+from home_page.services.dispatcher import get_dispatcher, Notification
 from home_page.models import NotificationPreference, SentNotification
 from home_page.services.calendar_service import GoogleCalendarService
 import logging
-from django.db.models import Q
+from django.db.models import F, Q
 from home_page.services.ai_agent import AIAgent
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import random
 from django.core.cache import cache
 import json
-import requests
 
 logger = logging.getLogger(__name__)
 
-class ZeptoMailQuotaExceeded(Exception):
-    pass
+# Failed reminder sends are retried with exponential backoff and jitter:
+# ~30s, ~60s, ... capped at 10 minutes, giving up after MAX_DELIVERY_ATTEMPTS.
+MAX_DELIVERY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 10 * 60
 
+# A 'pending' attempt is in flight on the in-memory dispatcher queue. One still pending
+# after this long was dropped (worker restart, crash, lost lease) and is retried.
+PENDING_TIMEOUT = 5 * 60
 
-def send_email_zeptomail(to_email, subject, body):
-    """
-    Sends an email using ZeptoMail (Zoho's transactional email API).
-    Uses HTTPS so it works on Railway Hobby plan (SMTP ports are blocked).
-    
-    Required settings:
-    - ZEPTOMAIL_API_TOKEN: Your ZeptoMail Send Mail token
-    - ZEPTOMAIL_FROM_EMAIL: The verified sender email address
-    - ZEPTOMAIL_FROM_NAME: (Optional) The sender display name
-    """
-    api_token = getattr(settings, 'ZEPTOMAIL_API_TOKEN', None)
-    from_email = getattr(settings, 'ZEPTOMAIL_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
-    from_name = getattr(settings, 'ZEPTOMAIL_FROM_NAME', 'Reminder Agent')
-    
-    if not api_token:
-        logger.error("ZEPTOMAIL_API_TOKEN not configured")
-        return False
-    
-    if not from_email:
-        logger.error("ZEPTOMAIL_FROM_EMAIL not configured")
-        return False
-    
-    url = "https://api.zeptomail.com/v1.1/email"
-    
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "Authorization": api_token  # ZeptoMail uses the token directly, not "Bearer <token>"
-    }
-    
-    payload = {
-        "from": {
-            "address": from_email,
-            "name": from_name
-        },
-        "to": [
-            {
-                "email_address": {
-                    "address": to_email
-                }
-            }
-        ],
-        "subject": subject,
-        "textbody": body
-    }
-    
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        
-        if response.status_code == 200 or response.status_code == 201:
-            logger.info(f"ZeptoMail: Email sent to {to_email}")
-            return True
-        elif response.status_code == 429 or "Credit exhausted" in response.text or "TM_5001" in response.text:
-            logger.error(f"ZeptoMail Quota/Rate Limit Exceeded: {response.text}")
-            raise ZeptoMailQuotaExceeded("ZeptoMail Credit Exhausted") 
-        else:
-            logger.error(f"ZeptoMail API error: {response.status_code} - {response.text}")
-            return False
-            
-    except requests.exceptions.Timeout:
-        logger.error(f"ZeptoMail: Request timed out for {to_email}")
-        return False
-    except Exception as e:
-        logger.error(f"ZeptoMail: Failed to send email to {to_email}: {e}")
-        return False
+
+def _is_provider_failure(error) -> bool:
+    """Twilio 4xx responses (bad number, unapproved template) are our fault, not an outage."""
+    status = getattr(error, 'status', None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
 
 
 def send_whatsapp_message(to_number, body=None, content_sid=None, content_variables=None, header_text=None):
     """
     Sends a WhatsApp message using Twilio.
     Supports raw body OR Content Templates (content_sid + content_variables).
+    Fast-fails while the Twilio circuit breaker is open.
     """
-    try:
-        account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
-        auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
-        from_number = getattr(settings, 'TWILIO_WHATSAPP_NUMBER', None) or getattr(settings, 'TWILIO_PHONE_NUMBER', None)
+    client = get_twilio_client()
+    from_number = getattr(settings, 'TWILIO_WHATSAPP_NUMBER', None) or getattr(settings, 'TWILIO_PHONE_NUMBER', None)
 
-        if not all([account_sid, auth_token, from_number]):
-            logger.error("Twilio credentials missing. Cannot send WhatsApp message.")
-            return False
+    # Checked before allow(): a half-open breaker hands out a single probe, and a call
+    # that never reaches Twilio would take it without recording an outcome
+    if not all([client, from_number]):
+        logger.error("Twilio credentials missing. Cannot send WhatsApp message.")
+        return False
+    if not (body or content_sid):
+        return False
 
+    breaker = get_breaker('twilio')
+    if not breaker.allow():
+        logger.warning(f"Twilio circuit open. Skipping WhatsApp message to {to_number}.")
+        return False
+
+    try:
         # Ensure from_number is in whatsapp format
         if not from_number.startswith('whatsapp:'):
             from_number = f"whatsapp:{from_number}"
-
-        client = Client(account_sid, auth_token)
         
         # Ensure to_number is in whatsapp format
         if not to_number.startswith('whatsapp:'):
@@ -118,23 +74,28 @@ def send_whatsapp_message(to_number, body=None, content_sid=None, content_variab
                     content_variables=content_variables
                 )
                  logger.info(f"WhatsApp template message sent to {to_number}: {message.sid}")
+                 breaker.record_success()
                  return True
             except Exception as e:
+                if not body:
+                    raise
                 logger.warning(f"Failed to send WhatsApp template to {to_number}: {e} (Code: {getattr(e, 'code', 'N/A')}). Falling back to standard message.")
                 # Fall through to body send
 
-        if body:
-            message = client.messages.create(
-                from_=from_number,
-                body=body,
-                to=to_number
-            )
-            logger.info(f"WhatsApp message sent to {to_number}: {message.sid}")
-            return True
-            
-        return False
+        message = client.messages.create(
+            from_=from_number,
+            body=body,
+            to=to_number
+        )
+        logger.info(f"WhatsApp message sent to {to_number}: {message.sid}")
+        breaker.record_success()
+        return True
     except Exception as e:
         logger.error(f"Failed to send WhatsApp message to {to_number}: {e}")
+        if _is_provider_failure(e):
+            breaker.record_failure(e)
+        else:
+            breaker.record_success()
         return False
 
 def check_and_send_reminders():
@@ -143,22 +104,102 @@ def check_and_send_reminders():
     Intended to be called periodically (e.g. every minute).
     """
     logger.info("Checking for reminders...")
+    release_stale_pending()
     
     # 1. Get all users who have notification preferences enabled
     preferences = NotificationPreference.objects.filter(
         Q(whatsapp_enabled=True) | Q(email_enabled=True)
     ).select_related('user')
 
-    # Run sequentially to avoid SSL/Threading issues
+    # Scan sequentially to avoid SSL/Threading issues; sends are handed to the dispatcher
     for pref in preferences:
+        USERS_SCANNED.inc(scan='reminders')
         try:
             process_user_reminders(pref)
         except Exception as e:
             logger.error(f"Error processing user {pref.user}: {e}")
 
+def _retry_delay(failure_count):
+    """Seconds before retry number `failure_count`; jittered so failed sends don't retry in lockstep."""
+    ceiling = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (failure_count - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+def _record_delivery(notification_id, ok):
+    """
+    Dispatcher callback: settle the 'pending' SentNotification written at enqueue time.
+    Failures are scheduled for a retry (next_retry_at) until MAX_DELIVERY_ATTEMPTS.
+    """
+    if ok:
+        SentNotification.objects.filter(pk=notification_id).update(status='sent', next_retry_at=None)
+        return
+
+    failure_count = (SentNotification.objects.filter(pk=notification_id).values_list('failure_count', flat=True).first() or 0) + 1
+    next_retry_at = None
+    if failure_count < MAX_DELIVERY_ATTEMPTS:
+        next_retry_at = timezone.now() + timedelta(seconds=_retry_delay(failure_count))
+    SentNotification.objects.filter(pk=notification_id).update(
+        status='failed', failure_count=failure_count, next_retry_at=next_retry_at
+    )
+
+def _in_flight(now):
+    """Attempts that count as notified: sent, or pending and recently queued."""
+    return Q(status='sent') | Q(status='pending', timestamp__gte=now - timedelta(seconds=PENDING_TIMEOUT))
+
+def release_stale_pending():
+    """
+    Turn attempts left 'pending' by a dispatcher queue that never drained into failures
+    due for retry now, so the scan queues them again (within MAX_DELIVERY_ATTEMPTS).
+    """
+    now = timezone.now()
+    stale = SentNotification.objects.filter(status='pending', timestamp__lt=now - timedelta(seconds=PENDING_TIMEOUT))
+    released = stale.update(status='failed', failure_count=F('failure_count') + 1, next_retry_at=now)
+    if released:
+        SentNotification.objects.filter(
+            status='failed', next_retry_at=now, failure_count__gte=MAX_DELIVERY_ATTEMPTS
+        ).update(next_retry_at=None)
+        logger.warning(f"Released {released} reminder(s) left pending by an undrained dispatcher queue.")
+    return released
+
+def _retry_due(now):
+    """
+    Failed attempts that may be sent again now; filtering on next_retry_at lets the
+    (status, next_retry_at) index find them. A null next_retry_at means retries are
+    exhausted, except on rows from before retry scheduling (failure_count 0).
+    """
+    return Q(status='failed') & (
+        Q(next_retry_at__lte=now) | Q(next_retry_at__isnull=True, failure_count__lt=MAX_DELIVERY_ATTEMPTS)
+    )
+
+def _retry_waiting(now):
+    """Failed attempts still backing off, or out of retries: these count as notified."""
+    return Q(status='failed') & (
+        Q(next_retry_at__gt=now) | Q(next_retry_at__isnull=True, failure_count__gte=MAX_DELIVERY_ATTEMPTS)
+    )
+
+def _enqueue_reminder(user, event_id, notification, retry=None):
+    """
+    Log a 'pending' attempt and hand the message to the dispatcher. The pending row
+    keeps the next scan from queueing the same reminder while it is in flight.
+    A retry reuses the failed attempt's row, so its failure_count carries over;
+    its timestamp moves to now, which is what PENDING_TIMEOUT is measured from.
+    """
+    if retry is not None:
+        SentNotification.objects.filter(pk=retry.pk).update(status='pending', next_retry_at=None, timestamp=timezone.now())
+        attempt = retry
+    else:
+        attempt = SentNotification.objects.create(
+            user=user,
+            event_id=event_id,
+            notification_type=notification.channel,
+            status='pending'
+        )
+    notification.on_result = partial(_record_delivery, attempt.pk)
+    get_dispatcher().enqueue(notification)
+
 def process_user_reminders(pref):
     """
     Process reminders for a single user with their specific preferences.
+    Only scans and enqueues; delivery happens on the dispatcher's channel workers.
     """
     user = pref.user
     
@@ -168,7 +209,7 @@ def process_user_reminders(pref):
     now = timezone.now()
     lookahead = now + timedelta(minutes=lead_time)
     
-    logger.info(f"Checking events for user: {user.username} (Lookahead: {lead_time}m)")
+    logger.debug(f"Checking events for user: {user.username} (Lookahead: {lead_time}m)")
 
     try:
         try:
@@ -193,6 +234,14 @@ def process_user_reminders(pref):
         
         ai_agent = AIAgent(user)
 
+        # Latest failed attempt per (event, channel) whose retry time has passed; those are resent
+        failed_attempts = {
+            (attempt.event_id, attempt.notification_type): attempt
+            for attempt in SentNotification.objects.filter(
+                _retry_due(now), user=user, event_id__in=[event['id'] for event in events]
+            ).order_by('timestamp')
+        }
+
         for event in events:
             try:
                 event_id = event['id']
@@ -204,8 +253,9 @@ def process_user_reminders(pref):
                 already_notified_email = False
                 
                 if pref.whatsapp_enabled:
+                    # In flight, or failed and waiting for its retry time (or out of retries)
                     already_notified_whatsapp = SentNotification.objects.filter(
-                        user=user, event_id=event_id, notification_type='whatsapp', status='sent'
+                        _in_flight(now) | _retry_waiting(now), user=user, event_id=event_id, notification_type='whatsapp'
                     ).exists()
                     
                     # Check for active snooze (if not already found as sent)
@@ -218,24 +268,11 @@ def process_user_reminders(pref):
                             # If snoozed less than 10 mins ago, treat as active (don't send yet)
                             if timezone.now() < last_snooze.timestamp + timedelta(minutes=10):
                                 already_notified_whatsapp = True
-                    # Also check failure count? If failed 3 times, treat as "done" (gave up)
-                    failed_count_wa = SentNotification.objects.filter(
-                         user=user, event_id=event_id, notification_type='whatsapp', status='failed'
-                    ).count()
-                    if failed_count_wa >= 3:
-                        logger.info(f"Skipping WA for {event_id}: too many failures.")
-                        already_notified_whatsapp = True
                     
                 if pref.email_enabled:
                      already_notified_email = SentNotification.objects.filter(
-                        user=user, event_id=event_id, notification_type='email', status='sent'
+                        _in_flight(now) | _retry_waiting(now), user=user, event_id=event_id, notification_type='email'
                     ).exists()
-                     failed_count_email = SentNotification.objects.filter(
-                         user=user, event_id=event_id, notification_type='email', status='failed'
-                    ).count()
-                     if failed_count_email >= 3:
-                         logger.info(f"Skipping Email for {event_id}: too many failures.")
-                         already_notified_email = True
 
                 # If both notified (or disabled), skip
                 if (not pref.whatsapp_enabled or already_notified_whatsapp) and \
@@ -262,25 +299,17 @@ def process_user_reminders(pref):
                         # Header is static "Event Reminder" in template now, so no variable needed.
                         # variables[var_name_header] = "Event Reminder"
 
-                        success = send_whatsapp_message(
-                            pref.whatsapp_number, 
+                        notification = Notification(
+                            'whatsapp', pref.whatsapp_number,
                             body=wa_body, # Fallback
-                            content_sid=template_sid, 
+                            content_sid=template_sid,
                             content_variables=json.dumps(variables, ensure_ascii=False)
                         )
                     else:
                         # Use Session Message (Standard)
-                        success = send_whatsapp_message(pref.whatsapp_number, body=wa_body)
-                        
-                    status_val = 'sent' if success else 'failed'
-                    
-                    # Log attempt
-                    SentNotification.objects.create(
-                        user=user,
-                        event_id=event_id,
-                        notification_type='whatsapp',
-                        status=status_val
-                    )
+                        notification = Notification('whatsapp', pref.whatsapp_number, body=wa_body)
+
+                    _enqueue_reminder(user, event_id, notification, retry=failed_attempts.get((event_id, 'whatsapp')))
                     
                 # --- Email ---
                 if pref.email_enabled and not already_notified_email:
@@ -289,57 +318,10 @@ def process_user_reminders(pref):
                     # Common body content
                     email_body_text = f"{ai_message}\n\nBest,\nReminder Agent"
                     
-                    success_email = False
-                    skip_smtp = False
-                    logger.info(f"Sending email for event {event_id} to {to_email}")
-                    
-                    # Try ZeptoMail API first (works on Railway - uses HTTPS, not blocked SMTP ports)
-                    if getattr(settings, 'ZEPTOMAIL_API_TOKEN', None):
-                        try:
-                            success_email = send_email_zeptomail(to_email, subject, email_body_text)
-                            if success_email:
-                                logger.info(f"ZeptoMail email sent to {to_email} for event {summary}")
-                        except ZeptoMailQuotaExceeded:
-                            logger.error("ZeptoMail Quota Exceeded. Skipping SMTP fallback to avoid timeout.")
-                            skip_smtp = True
-
-                    # Fallback to SMTP if ZeptoMail not configured or failed (for local dev)
-                    if not skip_smtp and not success_email and settings.EMAIL_HOST_USER and settings.EMAIL_HOST_PASSWORD:
-                        try:
-                            from django.core.mail import get_connection, EmailMessage
-                            
-                            # Create connection with explicit timeout (10s)
-                            connection = get_connection(
-                                backend='django.core.mail.backends.smtp.EmailBackend',
-                                host=settings.EMAIL_HOST,
-                                port=settings.EMAIL_PORT,
-                                username=settings.EMAIL_HOST_USER,
-                                password=settings.EMAIL_HOST_PASSWORD,
-                                use_tls=settings.EMAIL_USE_TLS,
-                                use_ssl=settings.EMAIL_USE_SSL,
-                                timeout=10  # Short timeout to fail fast
-                            )
-                            
-                            email = EmailMessage(
-                                subject=subject,
-                                body=email_body_text,
-                                from_email=settings.EMAIL_HOST_USER,
-                                to=[to_email],
-                                connection=connection
-                            )
-                            email.send(fail_silently=False)
-                            logger.info(f"SMTP Email sent to {to_email} for event {summary}")
-                            success_email = True
-                        except Exception as smtp_err:
-                            logger.error(f"SMTP email failed to {to_email}: {smtp_err}")
-                            success_email = False
-                    
-                    status_val = 'sent' if success_email else 'failed'
-                    SentNotification.objects.create(
-                        user=user,
-                        event_id=event_id,
-                        notification_type='email',
-                        status=status_val
+                    logger.info(f"Queueing email for event {event_id} to {to_email}")
+                    _enqueue_reminder(
+                        user, event_id, Notification('email', to_email, body=email_body_text, subject=subject),
+                        retry=failed_attempts.get((event_id, 'email'))
                     )
                     
             except Exception as ev_e:
@@ -359,7 +341,10 @@ def check_and_send_morning_briefings():
     # Filter users with morning briefing enabled
     preferences = NotificationPreference.objects.filter(morning_briefing_enabled=True).select_related('user')
     
+    # Scanning only enqueues; the dispatcher delivers on its channel workers
+    dispatcher = get_dispatcher()
     for pref in preferences:
+        USERS_SCANNED.inc(scan='briefings')
         briefing_time = pref.morning_briefing_time
         
         # Get user's timezone (default to UTC if not set)
@@ -422,16 +407,16 @@ def check_and_send_morning_briefings():
                                 variables = {var_name_body: flat_briefing}
                                 # variables[var_name_header] = "Morning Briefing"
                                
-                                send_whatsapp_message(
-                                   pref.whatsapp_number,
+                                dispatcher.enqueue(Notification(
+                                   'whatsapp', pref.whatsapp_number,
                                    body=briefing_msg, 
                                    content_sid=template_sid, 
                                    content_variables=json.dumps(variables, ensure_ascii=False)
-                               )
+                               ))
                          else:
-                               send_whatsapp_message(pref.whatsapp_number, body=briefing_msg)
+                               dispatcher.enqueue(Notification('whatsapp', pref.whatsapp_number, body=briefing_msg))
                          
-                         logger.info(f"Sent morning briefing to {pref.user.username}")
+                         logger.info(f"Queued morning briefing for {pref.user.username}")
                      else:
                          logger.warning(f"User {pref.user.username} has no WhatsApp number for briefing.")
 
@@ -443,22 +428,8 @@ def check_and_send_morning_briefings():
                              # Simple body
                              email_body_text = f"{briefing_msg}\n\nBest,\nReminder Agent"
                              
-                             # ZeptoMail
-                             success_email = False
-                             skip_smtp = False
-                             if getattr(settings, 'ZEPTOMAIL_API_TOKEN', None):
-                                 try:
-                                     success_email = send_email_zeptomail(to_email, subject, email_body_text)
-                                 except ZeptoMailQuotaExceeded:
-                                     logger.error("ZeptoMail Quota Exceeded for Briefing. Skipping SMTP fallback.")
-                                     skip_smtp = True
-                             
-                             # SMTP Fallback
-                             if not skip_smtp and not success_email and settings.EMAIL_HOST_USER:
-                                 from django.core.mail import send_mail
-                                 send_mail(subject, email_body_text, settings.EMAIL_HOST_USER, [to_email], fail_silently=True)
-                                 
-                             logger.info(f"Morning Briefing Email sent to {to_email}")
+                             dispatcher.enqueue(Notification('email', to_email, body=email_body_text, subject=subject))
+                             logger.info(f"Morning Briefing Email queued for {to_email}")
                          except Exception as e_em:
                              logger.error(f"Failed to send briefing email: {e_em}")
 
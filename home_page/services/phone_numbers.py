@@ -0,0 +1,36 @@
+import re
+
+# E.164: a '+' followed by up to 15 digits, the first of which is a country code (never 0)
+E164_PATTERN = re.compile(r"^\+[1-9]\d{7,14}$")
+
+# Separators people type between digit groups
+_SEPARATORS = re.compile(r"[\s\-().]")
+
+
+def normalize_whatsapp_number(raw):
+    """
+    Normalize a WhatsApp number to E.164 (e.g. '+14155238886').
+
+    Accepts the Twilio 'whatsapp:+1...' form, spaces/dashes/brackets, a
+    missing '+' or an international '00' prefix. Returns None for empty input
+    and raises ValueError if the result is not a plausible E.164 number.
+    Numbers are expected in international format; no default country is assumed.
+    """
+    if raw is None:
+        return None
+
+    number = str(raw).strip()
+    if number.lower().startswith('whatsapp:'):
+        number = number[len('whatsapp:'):]
+    number = _SEPARATORS.sub('', number)
+    if not number:
+        return None
+
+    if number.startswith('00'):
+        number = '+' + number[2:]
+    elif not number.startswith('+'):
+        number = '+' + number
+
+    if not E164_PATTERN.match(number):
+        raise ValueError(f"Invalid WhatsApp number: {raw!r}")
+    return number
@@ -0,0 +1,431 @@
+"""
+Local expansion of recurring Google Calendar events.
+
+events.list with singleEvents=True has Google expand every series into its
+instances, so a listing over a year pulls one item per occurrence of every
+weekly meeting. With singleEvents=False Google returns each series once (its
+master, carrying the RRULE/RDATE/EXDATE lines) plus the instances that were
+moved, edited or cancelled. expand_events() turns that into the list
+singleEvents=True would have returned: same instance ids, recurringEventId,
+originalStartTime and start/end, with the exceptions applied.
+
+The engine covers the rule parts Google Calendar writes: FREQ (DAILY to
+YEARLY), INTERVAL, COUNT, UNTIL, BYDAY (with ordinals), BYMONTHDAY, BYMONTH,
+BYSETPOS and WKST. Anything else raises UnsupportedRecurrence, and the caller
+lets Google expand the listing instead.
+"""
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import re
+
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+SUPPORTED_PARTS = {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY', 'BYMONTHDAY', 'BYMONTH', 'BYSETPOS', 'WKST'}
+
+_BYDAY = re.compile(r'^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$')
+_ICAL_VALUE = re.compile(r'^(\d{8})(?:T(\d{6})(Z?))?$')
+
+
+class UnsupportedRecurrence(ValueError):
+    """A recurrence this engine does not expand; Google has to expand it."""
+
+
+def _ical_value(value: str):
+    """'20300107' -> date, '20300107T090000' -> naive datetime, '20300107T140000Z' -> UTC datetime."""
+    m = _ICAL_VALUE.match(value.strip())
+    if not m:
+        raise UnsupportedRecurrence(f"Unrecognized date value {value!r}")
+    day = datetime.strptime(m.group(1), '%Y%m%d').date()
+    if not m.group(2):
+        return day
+    moment = datetime.combine(day, datetime.strptime(m.group(2), '%H%M%S').time())
+    return moment.replace(tzinfo=timezone.utc) if m.group(3) else moment
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One RRULE line. byday holds (ordinal or None, weekday 0-6) pairs."""
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: object = None
+    byday: tuple = ()
+    bymonthday: tuple = ()
+    bymonth: tuple = ()
+    bysetpos: tuple = ()
+    wkst: int = 0
+
+    @classmethod
+    def parse(cls, line: str) -> 'Rule':
+        body = line.split(':', 1)[1] if ':' in line else line
+        parts = {}
+        for part in body.strip().split(';'):
+            if part:
+                name, _, value = part.partition('=')
+                parts[name.strip().upper()] = value.strip().upper()
+
+        unknown = set(parts) - SUPPORTED_PARTS
+        if unknown:
+            raise UnsupportedRecurrence(f"RRULE parts {sorted(unknown)} in {line!r}")
+        if parts.get('FREQ') not in FREQUENCIES:
+            raise UnsupportedRecurrence(f"FREQ={parts.get('FREQ')} in {line!r}")
+
+        def numbers(name):
+            return tuple(int(n) for n in parts[name].split(',')) if name in parts else ()
+
+        try:
+            byday = []
+            for item in parts['BYDAY'].split(',') if 'BYDAY' in parts else ():
+                m = _BYDAY.match(item)
+                if not m:
+                    raise UnsupportedRecurrence(f"BYDAY={item} in {line!r}")
+                byday.append((int(m.group(1)) if m.group(1) else None, WEEKDAYS.index(m.group(2))))
+            rule = cls(
+                freq=parts['FREQ'],
+                interval=int(parts.get('INTERVAL', 1)),
+                count=int(parts['COUNT']) if 'COUNT' in parts else None,
+                until=_ical_value(parts['UNTIL']) if 'UNTIL' in parts else None,
+                byday=tuple(byday),
+                bymonthday=numbers('BYMONTHDAY'),
+                bymonth=numbers('BYMONTH'),
+                bysetpos=numbers('BYSETPOS'),
+                wkst=WEEKDAYS.index(parts.get('WKST', 'MO')),
+            )
+        except UnsupportedRecurrence:
+            raise
+        except ValueError as e:
+            raise UnsupportedRecurrence(f"Malformed RRULE {line!r}: {e}") from e
+        if rule.interval < 1:
+            raise UnsupportedRecurrence(f"INTERVAL={rule.interval} in {line!r}")
+        return rule
+
+    def _month_days(self, year: int, month: int, default_day: int) -> set:
+        length = monthrange(year, month)[1]
+        days = None
+        if self.bymonthday:
+            days = {d if d > 0 else length + d + 1 for d in self.bymonthday}
+        if self.byday:
+            first_weekday = date(year, month, 1).weekday()
+            matched = set()
+            for ordinal, weekday in self.byday:
+                same = list(range(1 + (weekday - first_weekday) % 7, length + 1, 7))
+                if ordinal is None:
+                    matched.update(same)
+                elif 0 < abs(ordinal) <= len(same):
+                    matched.add(same[ordinal - 1 if ordinal > 0 else ordinal])
+            days = matched if days is None else days & matched
+        if days is None:
+            days = {default_day}
+        return {date(year, month, d) for d in days if 1 <= d <= length}
+
+    def _year_days(self, year: int, first: date) -> set:
+        if self.byday and not self.bymonth and not self.bymonthday:
+            # Ordinals count weekdays within the whole year ("20MO")
+            days = set()
+            jan1 = date(year, 1, 1)
+            length = 366 if monthrange(year, 2)[1] == 29 else 365
+            for ordinal, weekday in self.byday:
+                same = [jan1 + timedelta(days=n) for n in range((weekday - jan1.weekday()) % 7, length, 7)]
+                if ordinal is None:
+                    days.update(same)
+                elif 0 < abs(ordinal) <= len(same):
+                    days.add(same[ordinal - 1 if ordinal > 0 else ordinal])
+            return days
+        months = self.bymonth or (range(1, 13) if self.bymonthday or self.byday else (first.month,))
+        days = set()
+        for month in months:
+            days |= self._month_days(year, month, first.day)
+        return days
+
+    def _period(self, start: date, first: date) -> list:
+        """Candidate days of the period (day, week, month or year) beginning at `start`."""
+        if self.freq == 'DAILY':
+            days = {start}
+            if self.bymonthday:
+                days = self._month_days(start.year, start.month, start.day) & days
+            if self.byday:
+                days = {d for d in days if d.weekday() in {w for _, w in self.byday}}
+        elif self.freq == 'WEEKLY':
+            weekdays = {w for _, w in self.byday} or {first.weekday()}
+            days = {start + timedelta(days=n) for n in range(7) if (start + timedelta(days=n)).weekday() in weekdays}
+        elif self.freq == 'MONTHLY':
+            days = self._month_days(start.year, start.month, first.day)
+        else:
+            days = self._year_days(start.year, first)
+        if self.bymonth and self.freq != 'YEARLY':
+            days = {d for d in days if d.month in self.bymonth}
+        days = sorted(days)
+        if self.bysetpos:
+            days = sorted({days[p - 1 if p > 0 else p] for p in self.bysetpos if 0 < abs(p) <= len(days)})
+        return days
+
+    def days(self, first: date, last: date, skip_to: Optional[date] = None):
+        """
+        Days the rule produces from `first` (the DTSTART day) through the period
+        containing `last`, in order. With `skip_to`, periods ending before it may be
+        left out (only safe without COUNT, which has to count every occurrence).
+        """
+        if self.freq == 'DAILY':
+            step = self.interval
+            k = max(0, (skip_to - first).days // step) if skip_to else 0
+            while True:
+                start = first + timedelta(days=k * step)
+                if start > last:
+                    return
+                yield from self._period(start, first)
+                k += 1
+        elif self.freq == 'WEEKLY':
+            week = first - timedelta(days=(first.weekday() - self.wkst) % 7)
+            step = 7 * self.interval
+            k = max(0, (skip_to - week).days // step) if skip_to else 0
+            while True:
+                start = week + timedelta(days=k * step)
+                if start > last:
+                    return
+                yield from self._period(start, first)
+                k += 1
+        else:
+            months = 12 if self.freq == 'YEARLY' else 1
+            step = months * self.interval
+            base = first.year * 12 + first.month - 1
+            k = 0
+            if skip_to:
+                k = max(0, (skip_to.year * 12 + skip_to.month - 1 - base) // step)
+            while True:
+                index = base + k * step
+                start = date(index // 12, index % 12 + 1, 1)
+                if start > last:
+                    return
+                yield from self._period(start, first)
+                k += 1
+
+
+def _parse_instant(value) -> datetime:
+    """RFC 3339 string as an aware datetime (naive values are taken as UTC)."""
+    moment = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _event_bounds(event) -> tuple:
+    """(start, end) of an event as aware datetimes; all-day dates as UTC midnights."""
+    bounds = []
+    for field in ('start', 'end'):
+        value = event.get(field) or {}
+        if value.get('dateTime'):
+            bounds.append(_parse_instant(value['dateTime']))
+        elif value.get('date'):
+            bounds.append(datetime.combine(date.fromisoformat(value['date']), time(), timezone.utc))
+        else:
+            bounds.append(None)
+    start, end = bounds
+    return start, end or start
+
+
+def _in_window(start, end, window_start: datetime, window_end: datetime) -> bool:
+    # As Google filters: ends after timeMin (or is an instant at/after it) and starts before timeMax
+    return start is not None and start < window_end and (end > window_start or start >= window_start)
+
+
+def _overlaps(event, window_start: datetime, window_end: datetime) -> bool:
+    return _in_window(*_event_bounds(event), window_start, window_end)
+
+
+@dataclass
+class Series:
+    """A recurring master, ready to expand."""
+    master: dict
+    all_day: bool
+    tz: object
+    tz_name: Optional[str]
+    dtstart: object
+    duration: timedelta
+    rules: list
+    rdates: list
+    exdates: set
+
+    @classmethod
+    def from_master(cls, master: dict) -> 'Series':
+        start, end = master.get('start') or {}, master.get('end') or {}
+        all_day = 'date' in start and not start.get('dateTime')
+        tz_name = start.get('timeZone')
+        try:
+            if all_day:
+                tz = None
+                dtstart = date.fromisoformat(start['date'])
+                duration = (date.fromisoformat(end['date']) if end.get('date') else dtstart + timedelta(days=1)) - dtstart
+            else:
+                first = _parse_instant(start['dateTime'])
+                # Series repeat in their own timezone's wall-clock time, across DST changes
+                tz = ZoneInfo(tz_name) if tz_name else first.tzinfo
+                dtstart = first.astimezone(tz).replace(tzinfo=None)
+                finish = _parse_instant(end['dateTime']).astimezone(tz).replace(tzinfo=None) if end.get('dateTime') else dtstart
+                duration = finish - dtstart
+        except (KeyError, TypeError, ValueError, ZoneInfoNotFoundError) as e:
+            raise UnsupportedRecurrence(f"Unreadable start/end on {master.get('id')}: {e}") from e
+
+        series = cls(master, all_day, tz, tz_name, dtstart, duration, [], [], set())
+        for line in master.get('recurrence') or []:
+            name, _, values = line.partition(':')
+            kind, *params = name.split(';')
+            kind = kind.strip().upper()
+            if kind == 'RRULE':
+                series.rules.append(Rule.parse(line))
+            elif kind in ('RDATE', 'EXDATE'):
+                moments = [series._occurrence(_ical_value(v), params) for v in values.split(',') if v.strip()]
+                if kind == 'RDATE':
+                    series.rdates.extend(moments)
+                else:
+                    series.exdates.update(series._key(m) for m in moments)
+            else:
+                raise UnsupportedRecurrence(f"{kind} on {master.get('id')}")
+        return series
+
+    def _occurrence(self, value, params=()):
+        """An RDATE/EXDATE/UNTIL value as an occurrence of this series (date, or naive local time)."""
+        for param in params:
+            if param.upper().startswith('TZID=') and isinstance(value, datetime) and not value.tzinfo:
+                try:
+                    value = value.replace(tzinfo=ZoneInfo(param[5:]))
+                except ZoneInfoNotFoundError as e:
+                    raise UnsupportedRecurrence(f"Unknown {param}") from e
+        if self.all_day:
+            return value if not isinstance(value, datetime) else value.date()
+        if not isinstance(value, datetime):
+            return datetime.combine(value, self.dtstart.time())
+        if value.tzinfo:
+            return value.astimezone(self.tz).replace(tzinfo=None)
+        return value
+
+    def _aware(self, occurrence: datetime) -> datetime:
+        # Round trip through UTC so times skipped by a DST change come out as valid local times
+        return occurrence.replace(tzinfo=self.tz).astimezone(timezone.utc).astimezone(self.tz)
+
+    def _key(self, occurrence):
+        """How exceptions and EXDATEs name an occurrence: its date, or its start in UTC."""
+        return occurrence if self.all_day else self._aware(occurrence).astimezone(timezone.utc)
+
+    def _until(self, rule: Rule):
+        if rule.until is None:
+            return None
+        until = self._occurrence(rule.until)
+        if not self.all_day and not isinstance(rule.until, datetime):
+            # A date UNTIL on a timed series includes that whole day
+            until = datetime.combine(rule.until, time.max)
+        return until
+
+    def occurrences(self, first_day: date, last_day: date):
+        """Original starts of the series that can overlap [first_day, last_day], EXDATEs removed."""
+        found = {self.dtstart}
+        found.update(self.rdates)
+        first = self.dtstart if self.all_day else self.dtstart.date()
+        for rule in self.rules:
+            until = self._until(rule)
+            emitted = 1  # DTSTART is always the first instance, as in Google Calendar
+            skip_to = first_day if rule.count is None else None
+            for day in rule.days(first, last_day, skip_to):
+                if day <= first:
+                    continue
+                occurrence = day if self.all_day else datetime.combine(day, self.dtstart.time())
+                if (until is not None and occurrence > until) or (rule.count is not None and emitted >= rule.count):
+                    break
+                emitted += 1
+                found.add(occurrence)
+        if self.exdates:
+            found = {o for o in found if self._key(o) not in self.exdates}
+        return sorted(found)
+
+    def _bounds(self, occurrence) -> tuple:
+        """(start, end) of an occurrence as aware datetimes; all-day dates as UTC midnights."""
+        if self.all_day:
+            return (datetime.combine(occurrence, time(), timezone.utc),
+                    datetime.combine(occurrence + self.duration, time(), timezone.utc))
+        return self._aware(occurrence), self._aware(occurrence + self.duration)
+
+    def instance(self, occurrence, bounds=None) -> dict:
+        """The instance Google would return for an occurrence (an original start)."""
+        master = self.master
+        event = {k: v for k, v in master.items() if k not in ('recurrence', 'start', 'end')}
+        if self.all_day:
+            start = {'date': occurrence.isoformat()}
+            end = {'date': (occurrence + self.duration).isoformat()}
+            event['id'] = f"{master['id']}_{occurrence:%Y%m%d}"
+        else:
+            aware, finish = bounds or self._bounds(occurrence)
+            start = {'dateTime': aware.isoformat()}
+            end = {'dateTime': finish.isoformat()}
+            if self.tz_name:
+                start['timeZone'] = end['timeZone'] = self.tz_name
+            event['id'] = f"{master['id']}_{aware.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+        event.update(recurringEventId=master['id'], originalStartTime=dict(start), start=start, end=end)
+        return event
+
+    def expand(self, window_start: datetime, window_end: datetime, exceptions=()) -> list:
+        """
+        Instances overlapping [window_start, window_end), with moved/edited exceptions
+        in place of the occurrences they replace and cancelled ones left out.
+        """
+        overrides = {}
+        for exception in exceptions:
+            original = exception.get('originalStartTime') or {}
+            value = original.get('dateTime') or original.get('date')
+            if not value:
+                continue
+            if self.all_day:
+                overrides[date.fromisoformat(value[:10])] = exception
+            else:
+                overrides[_parse_instant(value).astimezone(timezone.utc)] = exception
+
+        # Generous day bounds in the series' timezone; the exact overlap test comes last
+        tz = self.tz or timezone.utc
+        first_day = (window_start - self.duration).astimezone(tz).date() - timedelta(days=1)
+        last_day = window_end.astimezone(tz).date() + timedelta(days=1)
+
+        instances = []
+        for occurrence in self.occurrences(first_day, last_day):
+            bounds = self._bounds(occurrence)
+            # Aware datetimes compare (and hash) by instant, so the start is its own UTC key
+            if (occurrence if self.all_day else bounds[0]) in overrides:
+                continue
+            if _in_window(*bounds, window_start, window_end):
+                instances.append(self.instance(occurrence, bounds))
+        for exception in overrides.values():
+            if exception.get('status') != 'cancelled' and _overlaps(exception, window_start, window_end):
+                instances.append(exception)
+        return instances
+
+
+def sort_key(event) -> datetime:
+    """Chronological sort key for events mixing offsets, UTC and all-day dates."""
+    start, _ = _event_bounds(event)
+    return start or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def expand_events(items, time_min, time_max) -> list:
+    """
+    An events.list(singleEvents=False) result as singleEvents=True would have
+    returned it for [time_min, time_max): recurring masters expanded into their
+    instances, exceptions applied, everything ordered by start time.
+    Raises UnsupportedRecurrence if any master uses a rule outside this engine.
+    """
+    window_start, window_end = _parse_instant(time_min), _parse_instant(time_max)
+    masters, exceptions, events = [], {}, []
+    for item in items:
+        if item.get('recurrence'):
+            if item.get('status') != 'cancelled':
+                masters.append(item)
+        elif item.get('recurringEventId'):
+            exceptions.setdefault(item['recurringEventId'], []).append(item)
+        elif item.get('status') != 'cancelled':
+            events.append(item)
+
+    for master in masters:
+        events.extend(Series.from_master(master).expand(window_start, window_end, exceptions.pop(master['id'], ())))
+    # Exceptions whose master fell outside the listing (e.g. moved in from another range)
+    for orphans in exceptions.values():
+        events.extend(e for e in orphans if e.get('status') != 'cancelled' and _overlaps(e, window_start, window_end))
+
+    events.sort(key=sort_key)
+    return events
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from typing import Callable
+from home_page.services.metrics import TICK_DURATION_SECONDS, TICK_LAG_SECONDS, TICKS_SKIPPED
+import math
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TickStats:
+    """Running totals for a TickScheduler; lag and duration are in seconds."""
+    ticks: int = 0
+    skipped: int = 0
+    errors: int = 0
+    last_lag: float = 0.0
+    last_duration: float = 0.0
+    max_lag: float = 0.0
+    max_duration: float = 0.0
+
+
+class TickScheduler:
+    """
+    Runs `tick()` on wall-clock-aligned boundaries: with a 10s interval at
+    :00, :10, :20... regardless of how long each tick takes, so the cadence
+    doesn't drift.
+
+    A tick that overruns one or more boundaries is not followed by a burst of
+    catch-up ticks; the missed boundaries are coalesced into the next one and
+    counted in `stats.skipped`. When `should_run()` is false (e.g. this process
+    is not the leader) the boundary passes without running the tick.
+    """
+
+    def __init__(self, tick: Callable, interval: float, name: str = 'scheduler', should_run: Callable = None, stop_event: threading.Event = None):
+        self.tick = tick
+        self.interval = interval
+        self.name = name
+        self.should_run = should_run
+        self.stats = TickStats()
+        self._stop = stop_event or threading.Event()
+
+    def next_boundary(self, now: float) -> float:
+        return (math.floor(now / self.interval) + 1) * self.interval
+
+    def stop(self):
+        """Ask the loop to exit; a tick in progress is allowed to finish."""
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self):
+        scheduled = self.next_boundary(time.time())
+        while not self._stop.is_set():
+            delay = scheduled - time.time()
+            if delay > self.interval:
+                # The wall clock stepped backwards; re-align instead of sleeping through it
+                scheduled = self.next_boundary(time.time())
+                continue
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            if self.should_run is None or self.should_run():
+                self.run_once(scheduled)
+
+            now = time.time()
+            following = scheduled + self.interval
+            if now >= following:
+                missed = math.floor((now - following) / self.interval) + 1
+                self.stats.skipped += missed
+                TICKS_SKIPPED.inc(missed, scheduler=self.name)
+                logger.warning(f"{self.name}: tick overran by {now - following:.1f}s, skipping {missed} tick(s).")
+                following += missed * self.interval
+            scheduled = following
+
+    def run_once(self, scheduled: float):
+        started = time.time()
+        lag = max(0.0, started - scheduled)
+        try:
+            self.tick()
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Error in {self.name} tick: {e}", exc_info=True)
+        duration = time.time() - started
+
+        stats = self.stats
+        stats.ticks += 1
+        stats.last_lag, stats.last_duration = lag, duration
+        stats.max_lag, stats.max_duration = max(stats.max_lag, lag), max(stats.max_duration, duration)
+        TICK_LAG_SECONDS.observe(lag, scheduler=self.name)
+        TICK_DURATION_SECONDS.observe(duration, scheduler=self.name)
+        logger.debug(f"{self.name}: tick {stats.ticks} lag={lag * 1000:.0f}ms duration={duration * 1000:.0f}ms")
@@ -0,0 +1,202 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from django.conf import settings
+from django.db import connection
+import contextvars
+import json
+import queue
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    start: float                  # seconds since the trace started
+    duration: float = None
+    parent: int = None            # index of the enclosing span in Trace.spans
+    attrs: dict = field(default_factory=dict)
+
+
+class Trace:
+    """The spans recorded while handling one request (or any other unit of work)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started_at = time.time()
+        self.duration = None
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._open = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def finish(self):
+        self.duration = self.elapsed()
+
+    def totals(self) -> dict:
+        """Total duration and count per span name, in first-seen order."""
+        totals = {}
+        for s in self.spans:
+            if s.duration is None:
+                continue
+            total = totals.setdefault(s.name, [0.0, 0])
+            total[0] += s.duration
+            total[1] += 1
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one entry per stage, durations in ms, plus the total."""
+        entries = []
+        for name, (duration, count) in self.totals().items():
+            entry = f"{name};dur={duration * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="{count}x"'
+            entries.append(entry)
+        entries.append(f"total;dur={(self.duration or self.elapsed()) * 1000:.1f}")
+        return ', '.join(entries)
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': round((self.duration or 0) * 1000, 2),
+            'spans': [
+                {
+                    'name': s.name,
+                    'start_ms': round(s.start * 1000, 2),
+                    'duration_ms': round((s.duration or 0) * 1000, 2),
+                    'parent': s.parent,
+                    **({'attrs': s.attrs} if s.attrs else {}),
+                }
+                for s in self.spans
+            ],
+        }
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a stage of the current trace. A no-op outside a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    record = Span(name, trace.elapsed(), parent=trace._open[-1] if trace._open else None, attrs=attrs)
+    trace.spans.append(record)
+    trace._open.append(len(trace.spans) - 1)
+    try:
+        yield record
+    finally:
+        record.duration = trace.elapsed() - record.start
+        trace._open.pop()
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _time_query(execute, sql, params, many, context):
+    operation = sql.split(None, 1)[0].lower() if sql else 'query'
+    with span('db', op=operation):
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def start_trace(name):
+    """Record spans (including every DB query) for the enclosed work, then export the trace."""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        with connection.execute_wrapper(_time_query):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.finish()
+        _exporter.export(trace)
+
+
+def trace_view(name):
+    """Trace a view and report its stages to the browser in a Server-Timing header."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with start_trace(name) as trace:
+                response = view(request, *args, **kwargs)
+            response['Server-Timing'] = trace.server_timing()
+            return response
+        return wrapper
+    return decorator
+
+
+class _FileExporter:
+    """
+    Appends finished traces as JSON lines to settings.TRACE_EXPORT_PATH.
+    Writes happen on a background thread so requests never wait on disk.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=1000)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        path = getattr(settings, 'TRACE_EXPORT_PATH', None)
+        if not path:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((path, trace.to_dict()))
+        except queue.Full:
+            logger.warning("Trace export queue full; dropping trace.")
+
+    def flush(self, timeout: float = 5):
+        """Wait until queued traces are written (used by tests and benchmarks)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            path, record = self._queue.get()
+            try:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                logger.error(f"Could not export trace to {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_exporter = _FileExporter()
+
+
+def flush_exports(timeout: float = 5):
+    _exporter.flush(timeout)
@@ -0,0 +1,81 @@
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING
+from urllib3.util.retry import Retry
+import threading
+import logging
+
+if TYPE_CHECKING:
+    from twilio.rest import Client
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a Twilio API call is abandoned
+TWILIO_TIMEOUT = 10
+
+# Keep-alive connections kept per host (sends run on a small thread pool)
+TWILIO_POOL_SIZE = 16
+
+# Retry only where the message cannot have been accepted: connection failures,
+# 429 and 503. Read timeouts are not retried, since Twilio may already be sending.
+TWILIO_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=0,
+    status=2,
+    status_forcelist=(429, 503),
+    allowed_methods=frozenset({'GET', 'POST'}),
+    backoff_factor=0.5,
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+
+def build_twilio_client(account_sid, auth_token, pooled: bool = True, base_url: str = None) -> 'Client':
+    """
+    Build a Twilio client. With pooled=True its requests session keeps
+    connections alive and retries per TWILIO_RETRY; base_url points the
+    Messages API elsewhere (used by benchmarks against a local stub).
+    The twilio SDK is imported here, on first use, rather than at startup.
+    """
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+
+    http_client = TwilioHttpClient(pool_connections=pooled, timeout=TWILIO_TIMEOUT)
+    if pooled:
+        # TwilioHttpClient mounts its own adapter without our retry policy; replace it
+        adapter = HTTPAdapter(pool_connections=TWILIO_POOL_SIZE, pool_maxsize=TWILIO_POOL_SIZE, max_retries=TWILIO_RETRY)
+        http_client.session.mount('https://', adapter)
+        http_client.session.mount('http://', adapter)
+
+    client = Client(account_sid, auth_token, http_client=http_client)
+    if base_url:
+        client.api.base_url = base_url
+    return client
+
+
+def get_twilio_client():
+    """
+    Process-wide Twilio client, created on first use and reused for every send.
+    Returns None if credentials are not configured. TWILIO_API_BASE_URL
+    overrides the API host (benchmarks point it at a local stub).
+    """
+    global _client, _client_key
+    account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
+    auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
+    if not account_sid or not auth_token:
+        return None
+
+    base_url = getattr(settings, 'TWILIO_API_BASE_URL', None)
+    key = (account_sid, auth_token, base_url)
+    if _client is None or _client_key != key:
+        with _client_lock:
+            if _client is None or _client_key != key:
+                _client = build_twilio_client(account_sid, auth_token, base_url=base_url)
+                _client_key = key
+                logger.info("Created pooled Twilio client.")
+    return _client
@@ -0,0 +1,221 @@
+from dataclasses import dataclass
+from django.conf import settings
+from home_page.services.circuit_breaker import get_breaker
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+import random
+import threading
+import time
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+ZEPTOMAIL_API_URL = "https://api.zeptomail.com/v1.1/email"
+
+# Connect / read timeouts in seconds
+ZEPTOMAIL_TIMEOUT = (5, 30)
+
+# Attempts per email, including the first one
+MAX_ATTEMPTS = 3
+
+# Exponential backoff when the server gives no Retry-After
+BACKOFF_BASE = 0.5
+
+# Longer waits than this are not slept through; the caller gets RATE_LIMITED with retry_after set
+MAX_RETRY_DELAY = 30
+
+# ZeptoMail error codes meaning the account is out of credits (retrying cannot help)
+QUOTA_ERROR_CODES = {"TM_5001"}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# How long the circuit stays open once credits are exhausted (they rarely come back within minutes)
+QUOTA_RECOVERY_TIMEOUT = 15 * 60
+
+
+@dataclass
+class EmailSendResult:
+    """Outcome of one ZeptoMail send. Callers branch on `status`, not on exceptions."""
+
+    SENT = 'sent'
+    QUOTA_EXCEEDED = 'quota_exceeded'  # Out of credits: skip SMTP fallback, it would only time out
+    RATE_LIMITED = 'rate_limited'      # Still throttled after retries; retry_after says when to try again
+    CIRCUIT_OPEN = 'circuit_open'      # Not attempted: ZeptoMail's circuit breaker is open
+    FAILED = 'failed'
+    NOT_CONFIGURED = 'not_configured'
+
+    status: str
+    status_code: int = None
+    error: str = None
+    attempts: int = 0
+    retry_after: float = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.SENT
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session for the ZeptoMail API."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _error_codes(response):
+    """Collect the error codes and messages of a ZeptoMail JSON error body."""
+    try:
+        error = response.json().get('error') or {}
+    except ValueError:
+        return set(), ''
+    codes = {error.get('code')}
+    messages = [error.get('message') or '']
+    for detail in error.get('details') or []:
+        codes.add(detail.get('code'))
+        messages.append(detail.get('message') or '')
+    return codes - {None}, ' '.join(messages)
+
+
+def _retry_after(response):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    return BACKOFF_BASE * (2 ** (attempt - 1)) * (1 + random.random() * 0.5)
+
+
+def send_email_zeptomail(to_email, subject, body) -> EmailSendResult:
+    """
+    Sends an email using ZeptoMail (Zoho's transactional email API).
+    Uses HTTPS so it works on Railway Hobby plan (SMTP ports are blocked).
+
+    Connections are reused through a pooled session. 429 and 5xx responses
+    and connection errors are retried with backoff, honouring Retry-After.
+    Read timeouts are not retried, as ZeptoMail may already have accepted
+    the email.
+
+    Required settings:
+    - ZEPTOMAIL_API_TOKEN: Your ZeptoMail Send Mail token
+    - ZEPTOMAIL_FROM_EMAIL: The verified sender email address
+    - ZEPTOMAIL_FROM_NAME: (Optional) The sender display name
+    - ZEPTOMAIL_API_URL: (Optional) Override the API endpoint, e.g. a local stub
+    """
+    api_token = getattr(settings, 'ZEPTOMAIL_API_TOKEN', None)
+    from_email = getattr(settings, 'ZEPTOMAIL_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
+    from_name = getattr(settings, 'ZEPTOMAIL_FROM_NAME', 'Reminder Agent')
+    url = getattr(settings, 'ZEPTOMAIL_API_URL', None) or ZEPTOMAIL_API_URL
+
+    if not api_token:
+        logger.error("ZEPTOMAIL_API_TOKEN not configured")
+        return EmailSendResult(EmailSendResult.NOT_CONFIGURED, error="ZEPTOMAIL_API_TOKEN not configured")
+
+    if not from_email:
+        logger.error("ZEPTOMAIL_FROM_EMAIL not configured")
+        return EmailSendResult(EmailSendResult.NOT_CONFIGURED, error="ZEPTOMAIL_FROM_EMAIL not configured")
+
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Authorization": api_token  # ZeptoMail uses the token directly, not "Bearer <token>"
+    }
+
+    payload = {
+        "from": {
+            "address": from_email,
+            "name": from_name
+        },
+        "to": [
+            {
+                "email_address": {
+                    "address": to_email
+                }
+            }
+        ],
+        "subject": subject,
+        "textbody": body
+    }
+
+    breaker = get_breaker('zeptomail')
+    if not breaker.allow():
+        return EmailSendResult(EmailSendResult.CIRCUIT_OPEN, error="ZeptoMail circuit open")
+
+    result = _post_with_retries(url, headers, payload, to_email)
+
+    if result.status == EmailSendResult.QUOTA_EXCEEDED:
+        breaker.trip(result.error, open_for=QUOTA_RECOVERY_TIMEOUT)
+    elif result.status == EmailSendResult.RATE_LIMITED or (result.status == EmailSendResult.FAILED and (result.status_code is None or result.status_code >= 500)):
+        breaker.record_failure(result.error)
+    else:
+        # Delivered, or rejected for this email only (4xx): the provider itself is healthy
+        breaker.record_success()
+    return result
+
+
+def _post_with_retries(url, headers, payload, to_email) -> EmailSendResult:
+    session = get_session()
+    result = None
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        delay = None
+        try:
+            response = session.post(url, headers=headers, json=payload, timeout=ZEPTOMAIL_TIMEOUT)
+        except requests.exceptions.ConnectionError as e:
+            # Includes connect timeouts: nothing reached ZeptoMail, safe to retry
+            result = EmailSendResult(EmailSendResult.FAILED, error=str(e), attempts=attempt)
+        except requests.exceptions.Timeout:
+            logger.error(f"ZeptoMail: Request timed out for {to_email}")
+            return EmailSendResult(EmailSendResult.FAILED, error="Request timed out", attempts=attempt)
+        except Exception as e:
+            logger.error(f"ZeptoMail: Failed to send email to {to_email}: {e}")
+            return EmailSendResult(EmailSendResult.FAILED, error=str(e), attempts=attempt)
+        else:
+            if response.status_code in (200, 201):
+                logger.info(f"ZeptoMail: Email sent to {to_email}")
+                return EmailSendResult(EmailSendResult.SENT, status_code=response.status_code, attempts=attempt)
+
+            codes, message = _error_codes(response)
+            if codes & QUOTA_ERROR_CODES or "credit exhausted" in message.lower():
+                logger.error(f"ZeptoMail Quota Exceeded: {response.status_code} - {message}")
+                return EmailSendResult(EmailSendResult.QUOTA_EXCEEDED, status_code=response.status_code, error=message, attempts=attempt)
+
+            if response.status_code not in RETRYABLE_STATUS:
+                logger.error(f"ZeptoMail API error: {response.status_code} - {response.text}")
+                return EmailSendResult(EmailSendResult.FAILED, status_code=response.status_code, error=message or response.text, attempts=attempt)
+
+            delay = _retry_after(response)
+            status = EmailSendResult.RATE_LIMITED if response.status_code == 429 else EmailSendResult.FAILED
+            result = EmailSendResult(status, status_code=response.status_code, error=message or response.text, attempts=attempt, retry_after=delay)
+
+        if attempt == MAX_ATTEMPTS:
+            break
+        if delay is None:
+            delay = _backoff(attempt)
+        if delay > MAX_RETRY_DELAY:
+            break
+        logger.warning(f"ZeptoMail: attempt {attempt} for {to_email} failed ({result.status_code or result.error}); retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+    logger.error(f"ZeptoMail: giving up on {to_email} after {result.attempts} attempt(s): {result.status_code or ''} {result.error}")
+    return result
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Conversation
+from .services.conversation_list import invalidate_conversation_count
+
+
+@receiver(post_save, sender=Conversation)
+def conversation_created(sender, instance, created, **kwargs):
+    if created:
+        invalidate_conversation_count(instance.user_id)
+
+
+@receiver(post_delete, sender=Conversation)
+def conversation_deleted(sender, instance, **kwargs):
+    invalidate_conversation_count(instance.user_id)
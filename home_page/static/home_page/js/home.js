@@ -186,6 +186,33 @@ function typeText(element, rawText, speed = 10, callback = null) { // Increased
     requestAnimationFrame(update);
 }
 
+// Some replies are sent before their optional AI follow-up is ready (e.g. an event
+// listing's closing remark); poll for the final text and re-render the bubble once it is.
+function pollFollowup(element, messageDiv, url, attempts = 10) {
+    setTimeout(function () {
+        if (!document.body.contains(element)) return;
+        if (element.classList.contains('typing-in-progress')) {
+            pollFollowup(element, messageDiv, url, attempts);
+            return;
+        }
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(function (res) { return res.ok ? res.json() : null; })
+            .then(function (data) {
+                if (!data) return;
+                if (!data.done) {
+                    if (attempts > 1) pollFollowup(element, messageDiv, url, attempts - 1);
+                    return;
+                }
+                if (data.text && data.text !== messageDiv.dataset.raw) {
+                    messageDiv.dataset.raw = data.text;
+                    element.innerHTML = marked.parse(data.text);
+                    scrollChatToBottom();
+                }
+            })
+            .catch(function (err) { console.warn("Follow-up poll failed:", err); });
+    }, 1000);
+}
+
 // Basic HTML escaping helper (important for injecting dynamic text into HTML)
 function escapeHtml(unsafe) {
     if (!unsafe) return '';
@@ -301,6 +328,9 @@ function appendMessage(sender, responseData, isTyping = false, convoId = null, i
             } else {
                 contentContainer.innerHTML = marked.parse(textContent);
             }
+            if (responseData?.content?.followup_url) {
+                pollFollowup(contentContainer, messageDiv, responseData.content.followup_url);
+            }
 
         } else if (responseType === 'event_success') {
             renderEventSuccess(contentContainer, responseData);
@@ -1435,8 +1465,9 @@ document.addEventListener("DOMContentLoaded", () => {
 
 
     // --- Initialize Persisted Event Cards ---
-    const previewContainers = document.querySelectorAll('.event-preview-card-container');
-    if (previewContainers.length > 0) {
+    // `root` is the document on page load, or a holder element for a lazily loaded page of older messages
+    function hydratePersistedCards(root) {
+        const previewContainers = root.querySelectorAll('.event-preview-card-container');
         previewContainers.forEach(container => {
             try {
                 const eventContent = JSON.parse(container.dataset.eventContent);
@@ -1449,10 +1480,8 @@ document.addEventListener("DOMContentLoaded", () => {
                 console.error('Failed to parse event preview content:', e);
             }
         });
-    }
 
-    const deletionContainers = document.querySelectorAll('.event-deletion-card-container');
-    if (deletionContainers.length > 0) {
+        const deletionContainers = root.querySelectorAll('.event-deletion-card-container');
         deletionContainers.forEach(container => {
             try {
                 const eventContent = JSON.parse(container.dataset.eventContent);
@@ -1467,24 +1496,35 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     }
 
+    // Render markdown for a persisted (non-welcome) message bubble
+    function renderPersistedBubble(messageDiv) {
+        const sender = messageDiv.dataset.sender;
+        const bubble = messageDiv.querySelector('.bubble');
+        if (!bubble) return;
+        const rawText = bubble.dataset.raw;
+        if (sender === 'agent' && rawText !== undefined) {
+            bubble.innerHTML = marked.parse(rawText);
+        } else if (sender === 'user') {
+            bubble.textContent = rawText || bubble.textContent;
+        }
+    }
+
+    hydratePersistedCards(document);
+
     // --- Initial Page Load Rendering & Welcome Message Handling ---
     if (initialMessagesOnLoad.length > 0) {
         let welcomeMessageFoundAndAnimated = false;
 
         initialMessagesOnLoad.forEach(messageDiv => {
-            const sender = messageDiv.dataset.sender;
             const bubble = messageDiv.querySelector('.bubble'); // Get the bubble inside the message
 
             if (bubble) { // Check if bubble exists
-                const rawText = bubble.dataset.raw; // Get raw text from bubble, not messageDiv
                 // If it's the welcome message rendered by Django, animate it
                 if (bubble.dataset.welcomeMessage === 'true') {
                     welcomeMessageFoundAndAnimated = true;
-                    typeText(bubble, rawText || bubble.innerHTML, 3, scrollChatToBottom); // Use data-raw or innerHTML as fallback
-                } else if (sender === 'agent' && rawText !== undefined) {
-                    bubble.innerHTML = marked.parse(rawText);
-                } else if (sender === 'user') {
-                    bubble.textContent = rawText || bubble.textContent; // Use raw or existing text
+                    typeText(bubble, bubble.dataset.raw || bubble.innerHTML, 3, scrollChatToBottom); // Use data-raw or innerHTML as fallback
+                } else {
+                    renderPersistedBubble(messageDiv);
                 }
             } else {
                 console.warn("Message div found without a bubble element during initial render:", messageDiv);
@@ -1499,6 +1539,46 @@ document.addEventListener("DOMContentLoaded", () => {
         scrollChatToBottom();
     }
 
+    // --- Lazy-load older messages on scroll-up ---
+    // The server renders only the latest page; data-older-cursor points at the page before it.
+    if (chatMessagesContainer && chatMessagesContainer.dataset.olderUrl) {
+        const olderUrl = chatMessagesContainer.dataset.olderUrl;
+        let olderCursor = chatMessagesContainer.dataset.olderCursor || '';
+        let loadingOlder = false;
+
+        function loadOlderMessages() {
+            if (!olderCursor || loadingOlder) return;
+            loadingOlder = true;
+
+            fetch(`${olderUrl}?before=${encodeURIComponent(olderCursor)}`, { headers: { 'Accept': 'application/json' } })
+                .then(res => {
+                    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                    return res.json();
+                })
+                .then(data => {
+                    const holder = document.createElement('div');
+                    holder.innerHTML = data.html || '';
+                    hydratePersistedCards(holder);
+                    holder.querySelectorAll('.message').forEach(renderPersistedBubble);
+
+                    // Prepend while keeping the visible messages anchored in place
+                    const previousHeight = chatMessagesContainer.scrollHeight;
+                    chatMessagesContainer.prepend(...holder.childNodes);
+                    chatMessagesContainer.scrollTop += chatMessagesContainer.scrollHeight - previousHeight;
+
+                    olderCursor = data.has_more ? data.next_cursor : '';
+                })
+                .catch(err => console.error('Failed to load older messages:', err))
+                .finally(() => { loadingOlder = false; });
+        }
+
+        chatMessagesContainer.addEventListener('scroll', () => {
+            if (chatMessagesContainer.scrollTop < 200) {
+                loadOlderMessages();
+            }
+        }, { passive: true });
+    }
+
 
     // --- Handle form submission ---
     if (form) {
@@ -1876,6 +1956,46 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     }
 
+    /* ======  INFINITE SCROLL FOR RECENTS  ====== */
+    // The server renders only the newest page; data-more-cursor points at the next (older) one.
+    const recentsContainer = recentsList ? recentsList.closest('.recents') : null;
+    if (recentsContainer && recentsList.dataset.moreUrl) {
+        const moreUrl = recentsList.dataset.moreUrl;
+        let moreCursor = recentsList.dataset.moreCursor || '';
+        let loadingMore = false;
+
+        function loadMoreConversations() {
+            if (!moreCursor || loadingMore) return;
+            loadingMore = true;
+
+            fetch(`${moreUrl}?before=${encodeURIComponent(moreCursor)}`, { headers: { 'Accept': 'application/json' } })
+                .then(res => {
+                    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                    return res.json();
+                })
+                .then(data => {
+                    const holder = document.createElement('ul');
+                    holder.innerHTML = data.html || '';
+                    holder.querySelectorAll('li[data-convo-id]').forEach(li => {
+                        // Skip items already moved to the top client-side (e.g. after a new message)
+                        if (!recentsList.querySelector(`li[data-convo-id="${li.dataset.convoId}"]`)) {
+                            recentsList.appendChild(li);
+                        }
+                    });
+                    moreCursor = data.has_more ? data.next_cursor : '';
+                })
+                .catch(err => console.error('Failed to load more conversations:', err))
+                .finally(() => { loadingMore = false; });
+        }
+
+        recentsContainer.addEventListener('scroll', () => {
+            const remaining = recentsContainer.scrollHeight - recentsContainer.scrollTop - recentsContainer.clientHeight;
+            if (remaining < 150) {
+                loadMoreConversations();
+            }
+        }, { passive: true });
+    }
+
     /* --- Auto-resume after OAuth consent ( ?resume=true ) --- */
     (function () {
         const params = new URLSearchParams(window.location.search);
@@ -0,0 +1,236 @@
+"""
+Deterministic local stand-ins for the external HTTP APIs the app talks to.
+
+Each server speaks HTTP/1.1 with keep-alive on 127.0.0.1, runs on a
+background thread, and can add a fixed latency per request. It counts TCP
+connections and requests, so benchmarks can show the effect of connection reuse.
+Shared by the benchmarks and the home_page tests.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import socket
+import threading
+import time
+
+
+class StubServer:
+    """
+    routes maps (METHOD, path suffix) to handler(path, body_bytes) -> (status, headers, body).
+    body may be bytes, str or a JSON-serializable object.
+    """
+
+    def __init__(self, routes: dict, latency: float = 0.0):
+        self.routes = routes
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+
+    def _dispatch(self, method, path, body):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        route_path = path.split('?', 1)[0]
+        for (route_method, suffix), handler in self.routes.items():
+            if route_method == method and route_path.endswith(suffix):
+                return handler(path, body)
+        return 404, {}, {'error': f'No stub route for {method} {route_path}'}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body are separate writes; don't let Nagle delay the body on reused connections
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, payload = stub._dispatch(self.command, self.path, body)
+                if not isinstance(payload, (bytes, str)):
+                    payload = json.dumps(payload)
+                    headers = {'Content-Type': 'application/json', **headers}
+                if isinstance(payload, str):
+                    payload = payload.encode()
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def twilio_routes():
+    """Twilio Messages API: every create succeeds with a sequential SID."""
+    counter = itertools.count(1)
+
+    def create_message(path, body):
+        return 201, {}, {
+            'sid': f"SM{next(counter):032d}",
+            'status': 'queued',
+            'num_segments': '1',
+            'direction': 'outbound-api',
+        }
+
+    return {('POST', '/Messages.json'): create_message}
+
+
+def zeptomail_routes(scripted=None):
+    """
+    ZeptoMail send API. `scripted` is a list of (status, headers, body) replies
+    returned in order before falling back to success, e.g. a 429 then a 201.
+    """
+    scripted = list(scripted or [])
+    lock = threading.Lock()
+    counter = itertools.count(1)
+
+    def send_email(path, body):
+        with lock:
+            if scripted:
+                return scripted.pop(0)
+        return 201, {}, {
+            'data': [{'code': 'EM_104', 'message': 'Email request received'}],
+            'message': 'OK',
+            'request_id': f"req-{next(counter)}",
+        }
+
+    return {('POST', '/v1.1/email'): send_email}
+
+
+def claude_routes(rules=None, default="Sure."):
+    """
+    Anthropic Messages API. `rules` is a list of (substring, reply) pairs checked
+    in order against the system prompt plus the last user message; the first
+    match wins. A reply is a str or a callable(request_json) -> str.
+    """
+    rules = list(rules or [])
+    counter = itertools.count(1)
+
+    def create_message(path, body):
+        request = json.loads(body or b'{}')
+        messages = request.get('messages') or [{}]
+        last = messages[-1].get('content', '')
+        if isinstance(last, list):
+            last = ' '.join(block.get('text', '') for block in last if isinstance(block, dict))
+        system = request.get('system') or ''
+        if isinstance(system, list):
+            system = ' '.join(block.get('text', '') for block in system if isinstance(block, dict))
+        prompt = f"{system}\n{last}"
+
+        text = default
+        for needle, reply in rules:
+            if needle in prompt:
+                text = reply(request) if callable(reply) else reply
+                break
+        return 200, {}, {
+            'id': f"msg_{next(counter):024d}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': request.get('model', 'claude-stub'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': len(prompt) // 4, 'output_tokens': len(text) // 4},
+        }
+
+    return {('POST', '/v1/messages'): create_message}
+
+
+def calendar_routes(events_per_window=3):
+    """
+    Google Calendar v3 API. events.list returns `events_per_window` 30-minute
+    events spread evenly across the requested [timeMin, timeMax) window, with
+    ids stable per position ('bench-evt-0', ...), so repeated scans of the same
+    window see the same events. Writes echo the event back.
+    """
+    from datetime import datetime, timedelta
+    from urllib.parse import parse_qs, urlsplit
+    counter = itertools.count(1)
+
+    def _parse(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+    def list_events(path, body):
+        query = {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+        start = _parse(query['timeMin']) if 'timeMin' in query else datetime.now().astimezone()
+        end = _parse(query['timeMax']) if 'timeMax' in query else start + timedelta(days=1)
+        step = (end - start) / events_per_window
+        items = []
+        for i in range(events_per_window):
+            event_start = start + step * i + step / 2
+            items.append({
+                'id': f"bench-evt-{i}",
+                'status': 'confirmed',
+                'summary': query.get('q') or f"Bench event {i}",
+                'start': {'dateTime': event_start.isoformat()},
+                'end': {'dateTime': (event_start + timedelta(minutes=30)).isoformat()},
+            })
+        return 200, {}, {'kind': 'calendar#events', 'items': items}
+
+    def write_event(path, body):
+        event = json.loads(body or b'{}')
+        event.setdefault('id', f"bench-created-{next(counter)}")
+        return 200, {}, event
+
+    def delete_event(path, body):
+        return 204, {}, b''
+
+    def free_busy(path, body):
+        request = json.loads(body or b'{}')
+        return 200, {}, {'calendars': {item['id']: {'busy': []} for item in request.get('items', [])}}
+
+    def calendar_list(path, body):
+        return 200, {}, {'items': [{'id': 'primary', 'summary': 'Bench calendar', 'primary': True}]}
+
+    return {
+        ('GET', '/events'): list_events,
+        ('POST', '/events'): write_event,
+        ('PUT', ''): write_event,
+        ('DELETE', ''): delete_event,
+        ('POST', '/freeBusy'): free_busy,
+        ('GET', '/users/me/calendarList'): calendar_list,
+    }
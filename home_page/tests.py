@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
 from django.contrib.auth.models import User
 from home_page.services.calendar_service import GoogleCalendarService
@@ -26,8 +26,8 @@ class TestCalendarServiceErrorHandling(TestCase):
 
     @patch('home_page.services.calendar_service.SocialToken')
     @patch('home_page.services.calendar_service.SocialAccount')
-    @patch('home_page.services.calendar_service.Credentials')
-    @patch('home_page.services.calendar_service.build')
+    @patch('google.oauth2.credentials.Credentials')
+    @patch('googleapiclient.discovery.build')
     @patch('home_page.services.calendar_service.logger')
     def test_send_email_error_handling(self, mock_logger, mock_build, mock_creds, mock_social_account, mock_social_token):
         # Setup successful init to get to send_email
@@ -50,3 +50,1604 @@ class TestCalendarServiceErrorHandling(TestCase):
         mock_logger.error.assert_called()
         args, _ = mock_logger.error.call_args
         self.assertIn("Failed to send email: Gmail API error", args[0])
+
+
+class TestConversationContext(TestCase):
+    def setUp(self):
+        from home_page.models import Conversation, Message
+        self.user = User.objects.create_user(username='ctxuser', password='password')
+        self.convo = Conversation.objects.create(user=self.user)
+        for i in range(8):
+            Message.objects.create(conversation=self.convo, sender='user' if i % 2 == 0 else 'agent', text=f"message {i}")
+        # Structured messages without text are excluded from the window
+        Message.objects.create(conversation=self.convo, sender='agent', text='', message_type='event_preview')
+
+    def test_history_loaded_once_for_all_slices(self):
+        from home_page.services.conversation_context import ConversationContext
+        context = ConversationContext(self.convo)
+
+        with self.assertNumQueries(1):
+            last_six = context.history(6)
+            last_four = context.history(4)
+            deduped = context.history(4, dedupe=True)
+
+        self.assertEqual([m['content'] for m in last_six], [f"message {i}" for i in range(2, 8)])
+        self.assertEqual(last_four, last_six[-4:])
+        self.assertEqual(last_four[0], {"role": "user", "content": "message 4"})
+        self.assertEqual(deduped, last_four)
+
+    def test_dedupe_drops_repeated_content(self):
+        from home_page.models import Message
+        from home_page.services.conversation_context import ConversationContext
+        Message.objects.create(conversation=self.convo, sender='agent', text="  Message 7  ")
+
+        history = ConversationContext(self.convo).history(4, dedupe=True)
+
+        self.assertEqual([m['content'] for m in history], ["message 5", "message 6", "message 7"])
+
+    def test_no_conversation(self):
+        from home_page.services.conversation_context import ConversationContext
+        with self.assertNumQueries(0):
+            self.assertEqual(ConversationContext(None).history(4), [])
+
+
+class TestMessagePagination(TestCase):
+    def setUp(self):
+        from home_page.models import Conversation, Message
+        self.user = User.objects.create_user(username='pageuser', password='password')
+        self.convo = Conversation.objects.create(user=self.user)
+        for i in range(12):
+            Message.objects.create(conversation=self.convo, sender='user' if i % 2 == 0 else 'agent', text=f"message {i}")
+
+    def test_pages_walk_back_to_start(self):
+        from home_page.services.message_pages import fetch_message_page
+
+        latest, cursor = fetch_message_page(self.convo, limit=5)
+        self.assertEqual([m.text for m in latest], [f"message {i}" for i in range(7, 12)])
+
+        middle, cursor = fetch_message_page(self.convo, before=cursor, limit=5)
+        self.assertEqual([m.text for m in middle], [f"message {i}" for i in range(2, 7)])
+
+        oldest, cursor = fetch_message_page(self.convo, before=cursor, limit=5)
+        self.assertEqual([m.text for m in oldest], ["message 0", "message 1"])
+        self.assertIsNone(cursor)
+
+    def test_older_messages_endpoint(self):
+        from django.urls import reverse
+        from home_page.services.message_pages import fetch_message_page
+        _, cursor = fetch_message_page(self.convo, limit=10)
+        self.client.force_login(self.user)
+        url = reverse('home_page:conversation_messages', args=[self.convo.id])
+
+        data = self.client.get(url, {'before': cursor}).json()
+        self.assertEqual(data['count'], 2)
+        self.assertFalse(data['has_more'])
+        self.assertIn('message 0', data['html'])
+
+        self.assertEqual(self.client.get(url, {'before': 'not-a-cursor'}).status_code, 400)
+
+    def test_older_messages_endpoint_is_scoped_to_owner(self):
+        from django.urls import reverse
+        other = User.objects.create_user(username='otherpageuser', password='password')
+        self.client.force_login(other)
+        url = reverse('home_page:conversation_messages', args=[self.convo.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class TestSidebarConversations(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from home_page.models import Conversation
+        cache.clear()
+        self.user = User.objects.create_user(username='sidebaruser', password='password')
+        for i in range(5):
+            Conversation.objects.create(user=self.user, title=f"Chat {i}")
+
+    def test_pages_are_projected_and_walk_back(self):
+        from home_page.services.conversation_list import fetch_sidebar_page
+
+        newest, cursor = fetch_sidebar_page(self.user, limit=3)
+        self.assertEqual([row['title'] for row in newest], ["Chat 4", "Chat 3", "Chat 2"])
+        self.assertEqual(set(newest[0]), {'id', 'title', 'created_at'})
+
+        older, cursor = fetch_sidebar_page(self.user, before=cursor, limit=3)
+        self.assertEqual([row['title'] for row in older], ["Chat 1", "Chat 0"])
+        self.assertIsNone(cursor)
+
+    def test_count_is_cached_and_invalidated(self):
+        from home_page.models import Conversation
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from home_page.services.conversation_list import conversation_count
+
+        self.assertEqual(conversation_count(self.user), 5)
+        # A cached read costs at most the shared cache's own lookup, never a COUNT
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(conversation_count(self.user), 5)
+        self.assertFalse([q['sql'] for q in queries if 'home_page_conversation' in q['sql']])
+
+        convo = Conversation.objects.create(user=self.user, title="Chat 5")
+        self.assertEqual(conversation_count(self.user), 6)
+        convo.delete()
+        self.assertEqual(conversation_count(self.user), 5)
+
+    def test_cache_is_shared_between_processes(self):
+        # Invalidations from one worker process must reach the others
+        from django.conf import settings
+        self.assertNotIn('locmem', settings.CACHES['default']['BACKEND'])
+
+    def test_conversation_list_endpoint(self):
+        from django.urls import reverse
+        from home_page.services.conversation_list import fetch_sidebar_page
+        _, cursor = fetch_sidebar_page(self.user, limit=4)
+        self.client.force_login(self.user)
+        url = reverse('home_page:conversation_list')
+
+        data = self.client.get(url, {'before': cursor}).json()
+        self.assertEqual(data['count'], 1)
+        self.assertFalse(data['has_more'])
+        self.assertIn('Chat 0', data['html'])
+
+        self.assertEqual(self.client.get(url, {'before': 'not-a-cursor'}).status_code, 400)
+
+
+class TestWhatsAppNumbers(TestCase):
+    def test_normalize_to_e164(self):
+        from home_page.services.phone_numbers import normalize_whatsapp_number
+        cases = {
+            '+14155238886': '+14155238886',
+            'whatsapp:+14155238886': '+14155238886',
+            '14155238886': '+14155238886',
+            '+1 (415) 523-8886': '+14155238886',
+            '0044 20 7946 0958': '+442079460958',
+            '': None,
+            None: None,
+        }
+        for raw, expected in cases.items():
+            self.assertEqual(normalize_whatsapp_number(raw), expected, raw)
+
+        for raw in ('12345', 'not a number', '+0123456789', '+1234567890123456'):
+            with self.assertRaises(ValueError, msg=raw):
+                normalize_whatsapp_number(raw)
+
+    def test_number_normalized_on_save(self):
+        from home_page.models import NotificationPreference
+        user = User.objects.create_user(username='wauser', password='password')
+        prefs = NotificationPreference.objects.create(user=user, whatsapp_number='1 415 523 8886')
+        prefs.refresh_from_db()
+        self.assertEqual(prefs.whatsapp_number, '+14155238886')
+
+    def test_backfill_normalizes_existing_rows(self):
+        from importlib import import_module
+        from django.apps import apps
+        from home_page.models import NotificationPreference
+        migration = import_module('home_page.migrations.0005_notificationpreference_whatsapp_number_e164')
+
+        raw_numbers = ['14155238886', 'garbage', '+44 20 7946 0958']
+        for i, raw in enumerate(raw_numbers):
+            user = User.objects.create_user(username=f'backfill{i}', password='password')
+            prefs = NotificationPreference.objects.create(user=user, whatsapp_enabled=True)
+            # Bypass save() to simulate rows written before normalization existed
+            NotificationPreference.objects.filter(pk=prefs.pk).update(whatsapp_number=raw)
+
+        migration.backfill_e164_numbers(apps, None)
+
+        numbers = dict(NotificationPreference.objects.values_list('user__username', 'whatsapp_number'))
+        self.assertEqual(numbers, {'backfill0': '+14155238886', 'backfill1': None, 'backfill2': '+442079460958'})
+        self.assertFalse(NotificationPreference.objects.get(user__username='backfill1').whatsapp_enabled)
+
+
+class TestInboundWhatsApp(TestCase):
+    def setUp(self):
+        from home_page.models import NotificationPreference, SentNotification
+        self.user = User.objects.create_user(username='inbounduser', password='password')
+        self.prefs = NotificationPreference.objects.create(user=self.user, whatsapp_number='+14155238886', whatsapp_enabled=True)
+        self.reminder = SentNotification.objects.create(user=self.user, event_id='evt1', notification_type='whatsapp', status='sent')
+
+    def post_reply(self, sid, body):
+        from django.test import override_settings
+        from django.urls import reverse
+        with override_settings(DEBUG=True):
+            return self.client.post(reverse('home_page:whatsapp_reply'), {'MessageSid': sid, 'From': 'whatsapp:+14155238886', 'Body': body})
+
+    def test_webhook_only_enqueues(self):
+        from home_page.models import InboundWhatsAppMessage
+
+        with self.assertNumQueries(1):
+            response = self.post_reply('SM1', 'off')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(InboundWhatsAppMessage.objects.get().status, 'pending')
+        self.prefs.refresh_from_db()
+        self.assertTrue(self.prefs.whatsapp_enabled)
+
+    def test_worker_applies_commands_once_per_message_sid(self):
+        from home_page.models import InboundWhatsAppMessage
+        from home_page.services.inbound_whatsapp import process_inbound_whatsapp
+
+        self.post_reply('SM1', 'snooze')
+        self.post_reply('SM1', 'snooze')  # Twilio retry of the same delivery
+        self.post_reply('SM2', 'hello')
+
+        self.assertEqual(process_inbound_whatsapp(), 2)
+        self.assertEqual(process_inbound_whatsapp(), 0)
+
+        self.reminder.refresh_from_db()
+        self.assertEqual(self.reminder.status, 'snoozed')
+        statuses = dict(InboundWhatsAppMessage.objects.values_list('message_sid', 'status'))
+        self.assertEqual(statuses, {'SM1': 'processed', 'SM2': 'ignored'})
+
+    def test_worker_applies_off(self):
+        from home_page.services.inbound_whatsapp import process_inbound_whatsapp
+        self.post_reply('SM3', ' Off ')
+        process_inbound_whatsapp()
+        self.prefs.refresh_from_db()
+        self.assertFalse(self.prefs.whatsapp_enabled)
+
+
+class TestTwilioClient(TestCase):
+    def test_client_is_reused_per_credentials(self):
+        from django.test import override_settings
+        from home_page.services.twilio_client import get_twilio_client, TWILIO_RETRY
+
+        with override_settings(TWILIO_ACCOUNT_SID='AC' + '1' * 32, TWILIO_AUTH_TOKEN='token-1'):
+            client = get_twilio_client()
+            self.assertIs(get_twilio_client(), client)
+            adapter = client.http_client.session.get_adapter('https://api.twilio.com')
+            self.assertIs(adapter.max_retries, TWILIO_RETRY)
+
+        with override_settings(TWILIO_ACCOUNT_SID='AC' + '2' * 32, TWILIO_AUTH_TOKEN='token-2'):
+            self.assertIsNot(get_twilio_client(), client)
+
+        with override_settings(TWILIO_ACCOUNT_SID=None, TWILIO_AUTH_TOKEN=None):
+            self.assertIsNone(get_twilio_client())
+
+
+class TestZeptoMail(TestCase):
+    """send_email_zeptomail against a local stub of the ZeptoMail API."""
+
+    def setUp(self):
+        from home_page.services import circuit_breaker
+        circuit_breaker._breakers.clear()
+
+    def send(self, scripted):
+        from django.test import override_settings
+        from home_page.testing.fake_servers import StubServer, zeptomail_routes
+        from home_page.services.zeptomail import send_email_zeptomail
+
+        with StubServer(zeptomail_routes(scripted)) as stub:
+            with override_settings(ZEPTOMAIL_API_TOKEN='token', ZEPTOMAIL_FROM_EMAIL='agent@example.com', ZEPTOMAIL_API_URL=f"{stub.url}/v1.1/email"):
+                result = send_email_zeptomail('user@example.com', 'Subject', 'Body')
+            return result, stub
+
+    def test_retries_429_honouring_retry_after(self):
+        from home_page.services.zeptomail import EmailSendResult
+        result, stub = self.send([(429, {'Retry-After': '0'}, {'error': {'code': 'TM_4290', 'message': 'Too many requests'}})])
+
+        self.assertEqual(result.status, EmailSendResult.SENT)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(stub.requests, 2)
+
+    def test_long_retry_after_is_returned_not_slept(self):
+        from home_page.services.zeptomail import EmailSendResult
+        result, stub = self.send([(429, {'Retry-After': '120'}, {'error': {'code': 'TM_4290', 'message': 'Too many requests'}})])
+
+        self.assertEqual(result.status, EmailSendResult.RATE_LIMITED)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.retry_after, 120)
+        self.assertEqual(stub.requests, 1)
+
+    def test_quota_exhausted_is_not_retried(self):
+        from home_page.services.zeptomail import EmailSendResult
+        error = {'error': {'code': 'TM_5001', 'message': 'Credit exhausted', 'details': []}}
+        result, stub = self.send([(402, {}, error)])
+
+        self.assertEqual(result.status, EmailSendResult.QUOTA_EXCEEDED)
+        self.assertEqual(stub.requests, 1)
+
+    def test_client_error_is_not_retried(self):
+        from home_page.services.zeptomail import EmailSendResult
+        result, stub = self.send([(400, {}, {'error': {'code': 'TM_3201', 'message': 'Mandatory field missing'}})])
+
+        self.assertEqual(result.status, EmailSendResult.FAILED)
+        self.assertEqual(result.status_code, 400)
+        self.assertEqual(stub.requests, 1)
+
+    def test_not_configured(self):
+        from django.test import override_settings
+        from home_page.services.zeptomail import send_email_zeptomail, EmailSendResult
+        with override_settings(ZEPTOMAIL_API_TOKEN=None):
+            result = send_email_zeptomail('user@example.com', 'Subject', 'Body')
+        self.assertEqual(result.status, EmailSendResult.NOT_CONFIGURED)
+
+
+class RecordingEmailBackend:
+    """Test email backend: counts connections and refuses addresses at 'bounce.example.com'."""
+    opened = 0
+    sent = []
+
+    def __init__(self, fail_silently=False, **kwargs):
+        pass
+
+    def open(self):
+        RecordingEmailBackend.opened += 1
+        return True
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        import smtplib
+        for message in messages:
+            if message.to[0].endswith('@bounce.example.com'):
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'No such user')})
+            RecordingEmailBackend.sent.append(message.to[0])
+        return len(messages)
+
+
+class TestEmailBatcher(TestCase):
+    def setUp(self):
+        from home_page.services import circuit_breaker
+        circuit_breaker._breakers.clear()
+        RecordingEmailBackend.opened = 0
+        RecordingEmailBackend.sent = []
+
+    def smtp_settings(self):
+        from django.test import override_settings
+        return override_settings(
+            EMAIL_BACKEND='home_page.tests.RecordingEmailBackend',
+            EMAIL_HOST_USER='agent@example.com',
+            ZEPTOMAIL_API_TOKEN=None,
+        )
+
+    def test_one_smtp_connection_per_flush_with_per_recipient_results(self):
+        from home_page.services.email_batcher import EmailBatcher
+        results = {}
+
+        with self.smtp_settings():
+            with EmailBatcher() as batcher:
+                for to in ('a@example.com', 'b@bounce.example.com', 'c@example.com'):
+                    batcher.add(to, 'Subject', 'Body', on_result=lambda result, to=to: results.__setitem__(to, result.status))
+
+        self.assertEqual(RecordingEmailBackend.opened, 1)
+        self.assertEqual(RecordingEmailBackend.sent, ['a@example.com', 'c@example.com'])
+        self.assertEqual(results, {'a@example.com': 'sent', 'b@bounce.example.com': 'failed', 'c@example.com': 'sent'})
+
+    def test_batch_size_is_capped(self):
+        from home_page.services.email_batcher import EmailBatcher
+
+        with self.smtp_settings():
+            with EmailBatcher(max_batch_size=2) as batcher:
+                for i in range(5):
+                    batcher.add(f'user{i}@example.com', 'Subject', 'Body')
+                self.assertEqual(len(batcher), 1)
+
+        self.assertEqual(RecordingEmailBackend.opened, 3)
+        self.assertEqual(len(RecordingEmailBackend.sent), 5)
+
+    def test_dispatcher_email_delivery_reports_every_result(self):
+        from home_page.services.dispatcher import Notification, deliver_email
+
+        with self.smtp_settings():
+            results = deliver_email([
+                Notification('email', to, body='Body', subject='Subject')
+                for to in ('a@example.com', 'b@bounce.example.com', 'c@example.com')
+            ])
+
+        self.assertEqual(results, [True, False, True])
+
+    def test_quota_exhaustion_opens_circuit_and_reroutes_to_smtp(self):
+        from django.test import override_settings
+        from home_page.testing.fake_servers import StubServer, zeptomail_routes
+        from home_page.services.email_batcher import EmailBatcher
+        quota_error = (402, {}, {'error': {'code': 'TM_5001', 'message': 'Credit exhausted'}})
+
+        with StubServer(zeptomail_routes([quota_error])) as stub, self.smtp_settings():
+            with override_settings(ZEPTOMAIL_API_TOKEN='token', ZEPTOMAIL_API_URL=f"{stub.url}/v1.1/email"):
+                batcher = EmailBatcher()
+                batcher.add('a@example.com', 'Subject', 'Body')
+                batcher.add('b@example.com', 'Subject', 'Body')
+                delivered = batcher.flush()
+
+        self.assertEqual([result.status for _, result in delivered], ['sent', 'sent'])
+        # The second email skipped ZeptoMail once its circuit opened
+        self.assertEqual(stub.requests, 1)
+        self.assertEqual(RecordingEmailBackend.opened, 1)
+        self.assertEqual(RecordingEmailBackend.sent, ['a@example.com', 'b@example.com'])
+
+
+class TestCircuitBreaker(TestCase):
+    def test_opens_after_threshold_and_fast_fails(self):
+        from home_page.services.circuit_breaker import CircuitBreaker, OPEN
+        breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=60)
+
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure('timeout')
+        breaker.record_success()  # success resets the consecutive count
+        for _ in range(3):
+            breaker.record_failure('timeout')
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.snapshot()['last_error'], 'timeout')
+
+    @patch('home_page.services.circuit_breaker.time.monotonic')
+    def test_half_open_allows_one_probe(self, mock_monotonic):
+        from home_page.services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure('503')
+
+        mock_monotonic.return_value = 161.0
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.record_failure('503')
+        self.assertEqual(breaker.state, OPEN)
+
+        mock_monotonic.return_value = 222.0
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_states_are_published(self):
+        from django.core.cache import cache
+        from home_page.services import circuit_breaker
+        cache.clear()
+        circuit_breaker._breakers.clear()
+        breaker = circuit_breaker.get_breaker('zeptomail')
+
+        # Published once the breaker's lock is released: senders don't wait on the cache write
+        real_set = cache.set
+        def set_unlocked(*args, **kwargs):
+            self.assertFalse(breaker._lock.locked())
+            return real_set(*args, **kwargs)
+        with patch.object(circuit_breaker.cache, 'set', side_effect=set_unlocked) as cache_set:
+            breaker.trip('TM_5001', open_for=900)
+        cache_set.assert_called_once()
+
+        states = cache.get(circuit_breaker.STATE_CACHE_KEY)['breakers']
+        self.assertEqual(states['zeptomail']['state'], circuit_breaker.OPEN)
+        self.assertGreater(states['zeptomail']['retry_in_seconds'], 800)
+        self.assertEqual(circuit_breaker.breaker_states(), states)
+
+    def test_metrics_report_breakers_published_by_other_processes(self):
+        from django.core.cache import cache
+        from home_page.services import circuit_breaker
+        from home_page.services.metrics import REGISTRY
+        cache.clear()
+        # The worker tripped twilio; this (web) process only has a closed smtp breaker
+        circuit_breaker._breakers.clear()
+        circuit_breaker.get_breaker('twilio').trip('503')
+        circuit_breaker._breakers.clear()
+        circuit_breaker.get_breaker('smtp')
+
+        rendered = REGISTRY.render()
+
+        self.assertIn('zelmind_circuit_breaker_state{provider="twilio"} 2', rendered)
+        self.assertIn('zelmind_circuit_breaker_state{provider="smtp"} 0', rendered)
+
+    @patch('home_page.services.notification_service.get_twilio_client')
+    def test_whatsapp_fast_fails_while_open(self, mock_client):
+        from home_page.services import circuit_breaker
+        from home_page.services.notification_service import send_whatsapp_message
+        circuit_breaker._breakers.clear()
+        mock_client.return_value.messages.create.side_effect = ConnectionError('connection reset')
+
+        with self.settings(TWILIO_WHATSAPP_NUMBER='+14155238886'):
+            for _ in range(circuit_breaker.FAILURE_THRESHOLD + 3):
+                self.assertFalse(send_whatsapp_message('+14155550100', body='hi'))
+
+        self.assertEqual(mock_client.return_value.messages.create.call_count, circuit_breaker.FAILURE_THRESHOLD)
+
+    @patch('home_page.services.circuit_breaker.time.monotonic')
+    @patch('home_page.services.notification_service.get_twilio_client')
+    def test_whatsapp_calls_that_never_reach_twilio_leave_the_probe(self, mock_client, mock_monotonic):
+        from home_page.services import circuit_breaker
+        from home_page.services.notification_service import send_whatsapp_message
+        circuit_breaker._breakers.clear()
+        mock_monotonic.return_value = 100.0
+        breaker = circuit_breaker.get_breaker('twilio')
+        for _ in range(circuit_breaker.FAILURE_THRESHOLD):
+            breaker.record_failure('503')
+        mock_monotonic.return_value = 100.0 + circuit_breaker.RECOVERY_TIMEOUT + 1
+
+        # Missing credentials, then nothing to send: neither takes the half-open probe
+        mock_client.return_value = None
+        self.assertFalse(send_whatsapp_message('+14155550100', body='hi'))
+        mock_client.return_value = MagicMock()
+        with self.settings(TWILIO_WHATSAPP_NUMBER='+14155238886'):
+            self.assertFalse(send_whatsapp_message('+14155550100'))
+            self.assertEqual(breaker.state, circuit_breaker.OPEN)
+
+            # A failed template with no fallback body still records the probe's outcome
+            mock_client.return_value.messages.create.side_effect = ConnectionError('connection reset')
+            self.assertFalse(send_whatsapp_message('+14155550100', content_sid='HX123'))
+        self.assertEqual(breaker.state, circuit_breaker.OPEN)
+        self.assertEqual(breaker.snapshot()['last_error'], 'connection reset')
+
+
+class TestNotificationDispatcher(TestCase):
+    def test_token_bucket_limits_rate(self):
+        import time
+        from home_page.services.dispatcher import TokenBucket
+        bucket = TokenBucket(rate=50, capacity=5)
+
+        start = time.monotonic()
+        for _ in range(10):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # 5 tokens from the burst, 5 more at 50/s
+        self.assertGreaterEqual(elapsed, 0.08)
+
+        empty = TokenBucket(rate=1, capacity=1)
+        empty.acquire()
+        self.assertFalse(empty.acquire(timeout=0.01))
+
+    def test_channels_deliver_in_batches_and_report_results(self):
+        from home_page.services.dispatcher import NotificationDispatcher, Channel, Notification
+        delivered_batches = []
+        results = {}
+
+        def deliver(batch):
+            delivered_batches.append([n.to for n in batch])
+            return [not n.to.startswith('bad') for n in batch]
+
+        dispatcher = NotificationDispatcher({
+            'email': Channel('email', deliver, rate=1000, burst=1000, concurrency=1, batch_size=10),
+        })
+        for to in ('a', 'bad-b', 'c'):
+            dispatcher.enqueue(Notification('email', to, body='hi', on_result=lambda ok, to=to: results.__setitem__(to, ok)))
+
+        self.assertTrue(dispatcher.drain(timeout=5))
+        dispatcher.stop()
+        self.assertEqual(results, {'a': True, 'bad-b': False, 'c': True})
+        self.assertEqual(sum(len(batch) for batch in delivered_batches), 3)
+
+        with self.assertRaises(ValueError):
+            dispatcher.enqueue(Notification('sms', 'x', body='hi'))
+
+    @patch('home_page.services.notification_service.get_dispatcher')
+    @patch('home_page.services.notification_service.AIAgent')
+    @patch('home_page.services.notification_service.GoogleCalendarService')
+    def test_reminder_scan_only_enqueues_once(self, mock_calendar, mock_agent, mock_get_dispatcher):
+        from django.utils import timezone
+        from home_page.models import NotificationPreference, SentNotification
+        from home_page.services.notification_service import process_user_reminders
+
+        user = User.objects.create_user(username='scanuser', email='scan@example.com', password='password')
+        pref = NotificationPreference.objects.create(user=user, whatsapp_number='+14155238886', whatsapp_enabled=True, email_enabled=True)
+        start = (timezone.now() + timezone.timedelta(minutes=10)).isoformat()
+        mock_calendar.return_value.list_events.return_value = [{'id': 'evt1', 'summary': 'Standup', 'start': {'dateTime': start}}]
+        mock_agent.return_value.generate_reminder_message.return_value = "Standup in 10 minutes"
+        dispatcher = mock_get_dispatcher.return_value
+
+        process_user_reminders(pref)
+        process_user_reminders(pref)  # next tick, before delivery finished
+
+        channels = [call.args[0].channel for call in dispatcher.enqueue.call_args_list]
+        self.assertEqual(sorted(channels), ['email', 'whatsapp'])
+        self.assertEqual(SentNotification.objects.filter(user=user, status='pending').count(), 2)
+
+        # Delivery callbacks settle the pending rows
+        for call in dispatcher.enqueue.call_args_list:
+            call.args[0].on_result(True)
+        self.assertEqual(SentNotification.objects.filter(user=user, status='sent').count(), 2)
+
+    @patch('home_page.services.notification_service.get_dispatcher')
+    @patch('home_page.services.notification_service.AIAgent')
+    @patch('home_page.services.notification_service.GoogleCalendarService')
+    def test_reminders_dropped_with_the_queue_are_requeued(self, mock_calendar, mock_agent, mock_get_dispatcher):
+        from django.utils import timezone
+        from home_page.models import NotificationPreference, SentNotification
+        from home_page.services import notification_service
+
+        user = User.objects.create_user(username='dropuser', email='drop@example.com', password='password')
+        NotificationPreference.objects.create(user=user, email_enabled=True)
+        start = (timezone.now() + timezone.timedelta(minutes=10)).isoformat()
+        mock_calendar.return_value.list_events.return_value = [{'id': 'evt1', 'summary': 'Standup', 'start': {'dateTime': start}}]
+        mock_agent.return_value.generate_reminder_message.return_value = "Standup in 10 minutes"
+        dispatcher = mock_get_dispatcher.return_value
+
+        notification_service.check_and_send_reminders()
+        self.assertEqual(dispatcher.enqueue.call_count, 1)
+
+        # The worker dies before its queue drains: the callback never runs
+        attempt = SentNotification.objects.get(user=user)
+        notification_service.check_and_send_reminders()
+        self.assertEqual(dispatcher.enqueue.call_count, 1)
+
+        stale = timezone.now() - timezone.timedelta(seconds=notification_service.PENDING_TIMEOUT + 1)
+        SentNotification.objects.filter(pk=attempt.pk).update(timestamp=stale)
+        notification_service.check_and_send_reminders()
+
+        self.assertEqual(dispatcher.enqueue.call_count, 2)
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.failure_count), ('pending', 1))
+        self.assertGreater(attempt.timestamp, stale)
+        self.assertEqual(SentNotification.objects.filter(user=user).count(), 1)
+
+
+class TestReminderRetries(TestCase):
+    def setUp(self):
+        from django.utils import timezone
+        from home_page.models import NotificationPreference
+        self.user = User.objects.create_user(username='retryuser', email='retry@example.com', password='password')
+        self.pref = NotificationPreference.objects.create(user=self.user, email_enabled=True)
+        self.start = (timezone.now() + timezone.timedelta(minutes=10)).isoformat()
+
+    def test_failures_back_off_then_give_up(self):
+        from django.utils import timezone
+        from home_page.models import SentNotification
+        from home_page.services import notification_service
+        attempt = SentNotification.objects.create(user=self.user, event_id='evt1', notification_type='email', status='pending')
+
+        delays = []
+        for _ in range(notification_service.MAX_DELIVERY_ATTEMPTS):
+            before = timezone.now()
+            notification_service._record_delivery(attempt.pk, False)
+            attempt.refresh_from_db()
+            if attempt.next_retry_at:
+                delays.append((attempt.next_retry_at - before).total_seconds())
+
+        self.assertEqual(attempt.status, 'failed')
+        self.assertEqual(attempt.failure_count, notification_service.MAX_DELIVERY_ATTEMPTS)
+        self.assertIsNone(attempt.next_retry_at)
+        # Jittered within [ceiling / 2, ceiling] of a doubling ceiling
+        self.assertTrue(15 <= delays[0] <= 31, delays)
+        self.assertTrue(30 <= delays[1] <= 61, delays)
+
+    @patch('home_page.services.notification_service.get_dispatcher')
+    @patch('home_page.services.notification_service.AIAgent')
+    @patch('home_page.services.notification_service.GoogleCalendarService')
+    def test_scan_only_retries_due_rows(self, mock_calendar, mock_agent, mock_get_dispatcher):
+        from django.utils import timezone
+        from home_page.models import SentNotification
+        from home_page.services.notification_service import process_user_reminders
+        mock_calendar.return_value.list_events.return_value = [{'id': 'evt1', 'summary': 'Standup', 'start': {'dateTime': self.start}}]
+        mock_agent.return_value.generate_reminder_message.return_value = "Standup in 10 minutes"
+        dispatcher = mock_get_dispatcher.return_value
+        failed = SentNotification.objects.create(
+            user=self.user, event_id='evt1', notification_type='email', status='failed',
+            failure_count=1, next_retry_at=timezone.now() + timezone.timedelta(seconds=30)
+        )
+
+        process_user_reminders(self.pref)
+        dispatcher.enqueue.assert_not_called()
+
+        SentNotification.objects.filter(pk=failed.pk).update(next_retry_at=timezone.now() - timezone.timedelta(seconds=1))
+        process_user_reminders(self.pref)
+
+        self.assertEqual(dispatcher.enqueue.call_count, 1)
+        # The retry reuses the failed row, so its failure count carries over
+        self.assertEqual(SentNotification.objects.filter(user=self.user).count(), 1)
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.failure_count), ('pending', 1))
+
+    @patch('home_page.services.notification_service.get_dispatcher')
+    @patch('home_page.services.notification_service.AIAgent')
+    @patch('home_page.services.notification_service.GoogleCalendarService')
+    def test_unscheduled_failures_retry_until_exhausted(self, mock_calendar, mock_agent, mock_get_dispatcher):
+        from home_page.models import SentNotification
+        from home_page.services.notification_service import MAX_DELIVERY_ATTEMPTS, process_user_reminders
+        mock_calendar.return_value.list_events.return_value = [
+            {'id': 'legacy', 'summary': 'Standup', 'start': {'dateTime': self.start}},
+            {'id': 'exhausted', 'summary': 'Review', 'start': {'dateTime': self.start}},
+        ]
+        mock_agent.return_value.generate_reminder_message.return_value = "Starting in 10 minutes"
+        dispatcher = mock_get_dispatcher.return_value
+        # A failure written before retry scheduling, and one that used up its retries
+        legacy = SentNotification.objects.create(user=self.user, event_id='legacy', notification_type='email', status='failed')
+        SentNotification.objects.create(
+            user=self.user, event_id='exhausted', notification_type='email', status='failed',
+            failure_count=MAX_DELIVERY_ATTEMPTS,
+        )
+
+        process_user_reminders(self.pref)
+
+        self.assertEqual(dispatcher.enqueue.call_count, 1)
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.status, 'pending')
+        self.assertEqual(SentNotification.objects.filter(user=self.user).count(), 2)
+
+
+class TestLeaderElection(TestCase):
+    def test_only_one_candidate_holds_the_lease(self):
+        from home_page.services.leader_election import LeaderElector
+
+        first = LeaderElector('test-job', holder='host-a:1')
+        second = LeaderElector('test-job', holder='host-b:2')
+
+        self.assertTrue(first.campaign())
+        self.assertFalse(second.campaign())
+        self.assertTrue(first.campaign())  # renewal
+
+        # A clean shutdown hands over immediately
+        first.stop(release=True)
+        self.assertFalse(first.is_leader)
+        self.assertTrue(second.campaign())
+        self.assertFalse(first.campaign())
+
+    def test_expired_lease_fails_over(self):
+        from django.utils import timezone
+        from home_page.models import SchedulerLease
+        from home_page.services.leader_election import LeaderElector
+
+        dead = LeaderElector('test-job', holder='host-a:1')
+        standby = LeaderElector('test-job', holder='host-b:2')
+        self.assertTrue(dead.campaign())
+
+        # The leader stopped renewing and its lease ran out
+        SchedulerLease.objects.filter(name='test-job').update(expires_at=timezone.now() - timezone.timedelta(seconds=1))
+
+        self.assertTrue(standby.campaign())
+        self.assertFalse(dead.campaign())
+        self.assertEqual(SchedulerLease.objects.get(name='test-job').holder, 'host-b:2')
+
+    @patch('home_page.services.leader_election.try_acquire_lease', side_effect=Exception('database unavailable'))
+    def test_leader_steps_down_when_it_cannot_renew(self, mock_acquire):
+        from home_page.services.leader_election import LeaderElector
+
+        elector = LeaderElector('test-job', holder='host-a:1', ttl=0.05)
+        self.assertFalse(elector.campaign())
+
+        mock_acquire.side_effect = None
+        mock_acquire.return_value = True
+        self.assertTrue(elector.campaign())
+
+        mock_acquire.side_effect = Exception('database unavailable')
+        import time
+        time.sleep(0.06)
+        self.assertFalse(elector.campaign())
+
+    @patch('home_page.reminder_worker.ReminderWorker.start')
+    def test_worker_autostart_is_limited_to_the_serving_runserver(self, mock_start):
+        import os
+        from django.apps import apps
+        cases = [
+            # (argv, RUN_MAIN, REMINDER_WORKER_AUTOSTART, started)
+            (['manage.py', 'runserver'], 'true', 'runserver', True),
+            (['manage.py', 'runserver'], None, 'runserver', False),  # autoreloader parent
+            (['manage.py', 'runserver', '--noreload'], None, 'runserver', True),
+            (['manage.py', 'migrate'], None, 'runserver', False),
+            (['-c'], None, 'runserver', False),  # python -c / ad-hoc scripts
+            (['script.py'], None, 'always', True),
+            (['manage.py', 'runserver'], 'true', 'off', False),
+            (['/venv/bin/gunicorn', 'project.wsgi'], None, 'always', False),
+        ]
+        for argv, run_main, autostart, started in cases:
+            with self.subTest(argv=argv, run_main=run_main, autostart=autostart):
+                mock_start.reset_mock()
+                env = {k: v for k, v in os.environ.items() if k != 'RUN_MAIN'}
+                if run_main:
+                    env['RUN_MAIN'] = run_main
+                with patch('sys.argv', argv), patch.dict(os.environ, env, clear=True), \
+                        override_settings(REMINDER_WORKER_AUTOSTART=autostart):
+                    apps.get_app_config('home_page').ready()
+                self.assertEqual(mock_start.called, started)
+
+
+class TestTickScheduler(TestCase):
+    def run_until_stopped(self, scheduler):
+        import threading
+        thread = threading.Thread(target=scheduler.run)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+    def test_ticks_are_aligned_to_the_interval(self):
+        import time
+        from home_page.services.scheduler import TickScheduler
+        started = []
+
+        def tick():
+            started.append(time.time())
+            time.sleep(0.03)  # work must not push later ticks off the grid
+            if len(started) == 3:
+                scheduler.stop()
+
+        scheduler = TickScheduler(tick, interval=0.1)
+        self.run_until_stopped(scheduler)
+
+        for at in started:
+            self.assertLess(at % 0.1, 0.05)
+        self.assertEqual((scheduler.stats.ticks, scheduler.stats.skipped), (3, 0))
+        self.assertGreaterEqual(scheduler.stats.max_duration, 0.03)
+
+    def test_overrun_ticks_are_coalesced(self):
+        import time
+        from home_page.services.scheduler import TickScheduler
+        started = []
+
+        def tick():
+            started.append(time.time())
+            if len(started) == 1:
+                time.sleep(0.25)  # overruns the next two boundaries
+            else:
+                scheduler.stop()
+
+        scheduler = TickScheduler(tick, interval=0.1)
+        self.run_until_stopped(scheduler)
+
+        self.assertEqual(scheduler.stats.ticks, 2)
+        self.assertEqual(scheduler.stats.skipped, 2)
+        self.assertAlmostEqual(started[1] - started[0], 0.3, delta=0.05)
+
+    def test_standby_skips_ticks(self):
+        import threading
+        from home_page.services.scheduler import TickScheduler
+        tick = MagicMock(side_effect=Exception('boom'))
+        leading = threading.Event()
+        scheduler = TickScheduler(tick, interval=0.05, should_run=leading.is_set)
+
+        threading.Timer(0.12, leading.set).start()
+        threading.Timer(0.3, scheduler.stop).start()
+        self.run_until_stopped(scheduler)
+
+        self.assertGreater(tick.call_count, 0)
+        self.assertLess(tick.call_count, 6)
+        self.assertEqual(scheduler.stats.errors, tick.call_count)
+
+
+class TestMetrics(TestCase):
+    def test_counter_and_histogram_exposition(self):
+        from home_page.services.metrics import Counter, Histogram
+        sends = Counter('test_sends_total', 'Sends.', ['channel'])
+        latency = Histogram('test_latency_seconds', 'Latency.', ['channel'], buckets=(0.1, 1))
+        sends.inc(channel='email')
+        sends.inc(2, channel='email')
+        for value in (0.05, 0.5, 3):
+            latency.observe(value, channel='email')
+
+        lines = sends.render() + latency.render()
+
+        self.assertIn('# TYPE test_sends_total counter', lines)
+        self.assertIn('test_sends_total{channel="email"} 3', lines)
+        self.assertIn('test_latency_seconds_bucket{channel="email",le="0.1"} 1', lines)
+        self.assertIn('test_latency_seconds_bucket{channel="email",le="1"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{channel="email",le="+Inf"} 3', lines)
+        self.assertIn('test_latency_seconds_count{channel="email"} 3', lines)
+        with self.assertRaises(ValueError):
+            sends.inc(provider='zeptomail')
+
+    def test_dispatcher_records_sends_failures_and_latency(self):
+        from home_page.services import metrics
+        from home_page.services.dispatcher import NotificationDispatcher, Channel, Notification
+        sent_before = metrics.NOTIFICATIONS_SENT.value(channel='metrics-test')
+        failed_before = metrics.NOTIFICATIONS_FAILED.value(channel='metrics-test')
+        latency_before = metrics.SCAN_TO_SEND_SECONDS.count(channel='metrics-test')
+
+        deliver = lambda batch: [not n.to.startswith('bad') for n in batch]
+        dispatcher = NotificationDispatcher({'metrics-test': Channel('metrics-test', deliver, rate=1000, burst=1000, concurrency=1)})
+        for to in ('a', 'bad-b', 'c'):
+            dispatcher.enqueue(Notification('metrics-test', to, body='hi'))
+        self.assertTrue(dispatcher.drain(timeout=5))
+        dispatcher.stop()
+
+        self.assertEqual(metrics.NOTIFICATIONS_SENT.value(channel='metrics-test') - sent_before, 2)
+        self.assertEqual(metrics.NOTIFICATIONS_FAILED.value(channel='metrics-test') - failed_before, 1)
+        self.assertEqual(metrics.SCAN_TO_SEND_SECONDS.count(channel='metrics-test') - latency_before, 2)
+
+    def test_web_endpoint_requires_token_or_staff(self):
+        from django.test import override_settings
+
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            User.objects.create_user(username='ops', password='password', is_staff=True)
+            self.client.login(username='ops', password='password')
+            response = self.client.get('/metrics')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'zelmind_notifications_sent_total', response.content)
+            self.client.logout()
+
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+
+    def test_worker_metrics_server(self):
+        import requests
+        from home_page.services import circuit_breaker
+        from home_page.services.metrics import start_metrics_server
+        circuit_breaker._breakers.clear()
+        circuit_breaker.get_breaker('twilio').trip('503')
+
+        server = start_metrics_server(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            response = requests.get(f"{url}/metrics", timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('zelmind_circuit_breaker_state{provider="twilio"} 2', response.text)
+            self.assertEqual(requests.get(f"{url}/other", timeout=5).status_code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestTracing(TestCase):
+    def test_spans_nest_and_are_noops_outside_a_trace(self):
+        from home_page.services.tracing import span, start_trace
+
+        with span('outside') as record:
+            self.assertIsNone(record)
+
+        with start_trace('job') as trace:
+            with span('agent.intent'):
+                with span('claude'):
+                    pass
+            with span('claude'):
+                pass
+            User.objects.count()
+
+        names = [s.name for s in trace.spans]
+        self.assertEqual(names, ['agent.intent', 'claude', 'claude', 'db'])
+        self.assertEqual(trace.spans[1].parent, 0)
+        self.assertIsNone(trace.spans[2].parent)
+        self.assertEqual(trace.spans[3].attrs, {'op': 'select'})
+        header = trace.server_timing()
+        self.assertRegex(header, r'^agent\.intent;dur=[\d.]+, claude;dur=[\d.]+;desc="2x", db;dur=[\d.]+, total;dur=[\d.]+$')
+
+    @patch('home_page.views.AIAgent')
+    def test_chat_process_reports_server_timing_and_exports(self, mock_agent):
+        import json
+        import os
+        import tempfile
+        from django.test import override_settings
+        from home_page.services.tracing import flush_exports
+        from home_page.models import Conversation
+        user = User.objects.create_user(username='traceuser', password='password')
+        convo = Conversation.objects.create(user=user, title='Existing chat')
+        mock_agent.return_value.handle.return_value = {'type': 'text', 'response': 'Hello!'}
+        mock_agent.return_value.is_google_connected.return_value = False
+        self.client.login(username='traceuser', password='password')
+
+        export_path = os.path.join(tempfile.mkdtemp(), 'traces.jsonl')
+        with override_settings(TRACE_EXPORT_PATH=export_path):
+            response = self.client.post('/agent/chat/process/', json.dumps({'message': 'hi', 'convo_id': str(convo.id)}), content_type='application/json')
+            flush_exports()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('agent.handle;dur=', response['Server-Timing'])
+        self.assertIn('db;dur=', response['Server-Timing'])
+        with open(export_path) as f:
+            exported = [json.loads(line) for line in f]
+        self.assertEqual(len(exported), 1)
+        self.assertEqual(exported[0]['name'], 'chat_process')
+        self.assertIn('agent.handle', [s['name'] for s in exported[0]['spans']])
+
+
+class TestChatActions(TestCase):
+    def setUp(self):
+        from home_page.models import Conversation
+        self.user = User.objects.create_user(username='actionuser', password='password')
+        self.convo = Conversation.objects.create(user=self.user, title='Actions')
+
+    def context(self, action_params, user_input='', gcal=None):
+        from home_page.chat_actions import ActionContext
+        request = MagicMock()
+        request.user = self.user
+        return ActionContext(
+            request=request, convo=self.convo, gcal=gcal or MagicMock(), ai_agent=MagicMock(),
+            params=action_params, user_input=user_input, client_tz_name='UTC',
+        )
+
+    def test_handlers_are_imported_on_first_use(self):
+        import sys
+        from home_page import chat_actions
+
+        chat_actions._handlers.pop('delete_event', None)
+        sys.modules.pop('home_page.chat_actions.delete_event', None)
+
+        handler = chat_actions.get_handler('delete_event')
+        self.assertEqual(handler.action, 'delete_event')
+        self.assertIn('home_page.chat_actions.delete_event', sys.modules)
+        self.assertIs(chat_actions.get_handler('delete_event'), handler)
+        self.assertIsNone(chat_actions.get_handler('no_such_action'))
+
+    def test_delete_handler_drafts_a_confirmation(self):
+        from home_page.chat_actions import get_handler
+        from home_page.models import Message
+        gcal = MagicMock()
+        gcal.list_events.return_value = [
+            {'id': 'evt1', 'summary': 'Dentist', 'start': {'dateTime': '2030-01-07T10:00:00Z'}, 'end': {'dateTime': '2030-01-07T11:00:00Z'}},
+            {'id': 'evt2', 'summary': 'Standup', 'start': {'dateTime': '2030-01-07T09:00:00Z'}, 'end': {'dateTime': '2030-01-07T09:15:00Z'}},
+        ]
+
+        result = get_handler('delete_event').handle(self.context({'summary': 'dentist', 'date': '2030-01-07'}, gcal=gcal))
+
+        self.assertEqual(result.type, 'event_deletion_confirmation')
+        self.assertEqual(result.content['event_id'], 'evt1')
+        draft = Message.objects.get(id=result.content['message_id'])
+        self.assertEqual(draft.message_type, 'event_deletion_confirmation')
+        self.assertEqual(gcal.list_events.call_args.kwargs['time_min'], '2030-01-07T00:00:00Z')
+
+    def test_free_slots_infers_the_date_from_the_message(self):
+        from datetime import datetime, timezone
+        from home_page.chat_actions import get_handler
+        gcal = MagicMock()
+        gcal.find_free_slots.return_value = []
+
+        result = get_handler('find_free_slots').handle(self.context({}, user_input='am I free today?', gcal=gcal))
+
+        today = datetime.now(timezone.utc).date().isoformat()
+        gcal.find_free_slots.assert_called_once_with(start_date=today, end_date=today, duration=60, attendees=None)
+        self.assertEqual(result.type, 'text')
+        self.assertIn('completely free', result.response)
+
+
+class TestStartupImports(TestCase):
+    # Ceilings for a fresh process: django.setup(), then the URLconf (which imports every view).
+    # Deliberately generous, to catch an SDK creeping back into startup (the URLconf used to
+    # take ~350ms) without failing on a slow machine; benchmarks.bench_startup --check
+    # gates on the tighter budgets.
+    DJANGO_SETUP_CEILING_MS = 5000
+    URLCONF_CEILING_MS = 1000
+    LAZY_MODULES = ('anthropic', 'googleapiclient', 'google.oauth2', 'httplib2', 'twilio')
+
+    def test_startup_stays_within_budget_without_sdks(self):
+        import json
+        import os
+        import subprocess
+        import sys
+        from django.conf import settings
+
+        script = (
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import django; django.setup()\n"
+            "setup = time.perf_counter()\n"
+            "import project.urls, home_page.reminder_worker\n"
+            "done = time.perf_counter()\n"
+            f"print(json.dumps({{'setup_ms': (setup - start) * 1000, 'urlconf_ms': (done - setup) * 1000,"
+            f" 'loaded': [m for m in {self.LAZY_MODULES!r} if m in sys.modules]}}))\n"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'project.settings', 'REMINDER_WORKER_AUTOSTART': 'off'}
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=env, timeout=60,
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr[-2000:])
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        # -X importtime lines: "import time: self_us | cumulative_us | module"
+        timings = [line.split('|') for line in completed.stderr.splitlines() if line.startswith('import time:') and 'cumulative' not in line]
+        slowest = sorted(((int(cumulative), name.strip()) for _, cumulative, name in timings), reverse=True)[:10]
+        self.assertEqual(result['loaded'], [], f"SDKs imported at startup; slowest imports (us): {slowest}")
+        self.assertLess(result['setup_ms'], self.DJANGO_SETUP_CEILING_MS, f"slowest imports (us): {slowest}")
+        self.assertLess(result['urlconf_ms'], self.URLCONF_CEILING_MS, f"slowest imports (us): {slowest}")
+
+
+class TestDateExpressions(TestCase):
+    # Resolved against Wednesday 2025-10-22
+    TODAY = '2025-10-22'
+    EXPRESSIONS = [
+        ('today', '2025-10-22', '2025-10-22'),
+        ('Tomorrow', '2025-10-23', '2025-10-23'),
+        ('yesterday', '2025-10-21', '2025-10-21'),
+        ('2025-12-01', '2025-12-01', '2025-12-01'),
+        ('friday', '2025-10-24', '2025-10-24'),
+        ('wednesday', '2025-10-22', '2025-10-22'),
+        ('next wednesday', '2025-10-29', '2025-10-29'),
+        ('last monday', '2025-10-20', '2025-10-20'),
+        ('last wednesday', '2025-10-15', '2025-10-15'),
+        # Month and day names without a year are the next ones to come
+        ('march 5', '2026-03-05', '2026-03-05'),
+        ('jan 5', '2026-01-05', '2026-01-05'),
+        ('oct 30', '2025-10-30', '2025-10-30'),
+        ('feb 29', '2028-02-29', '2028-02-29'),
+        ('Nov 3rd, 2026', '2026-11-03', '2026-11-03'),
+        ('3rd of november', '2025-11-03', '2025-11-03'),
+        ('in 3 days', '2025-10-25', '2025-10-25'),
+        ('in 2 weeks', '2025-11-05', '2025-11-05'),
+        ('in 1 month', '2025-11-22', '2025-11-22'),
+        ('2 days ago', '2025-10-20', '2025-10-20'),
+        ('next 3 days', '2025-10-22', '2025-10-24'),
+        ('past 7 days', '2025-10-15', '2025-10-21'),
+        ('this week', '2025-10-20', '2025-10-26'),
+        ('next week', '2025-10-27', '2025-11-02'),
+        ('last week', '2025-10-13', '2025-10-19'),
+        ('this weekend', '2025-10-25', '2025-10-26'),
+        ('next month', '2025-11-01', '2025-11-30'),
+        ('february', '2026-02-01', '2026-02-28'),
+        ('october', '2025-10-01', '2025-10-31'),
+        ('next week friday', '2025-10-31', '2025-10-31'),
+        ('friday next week', '2025-10-31', '2025-10-31'),
+        ('this week monday', '2025-10-20', '2025-10-20'),
+        ('from oct 1 to oct 15', '2026-10-01', '2026-10-15'),
+        ('oct 15 to oct 30', '2025-10-15', '2025-10-30'),
+        ('between monday and friday', '2025-10-20', '2025-10-24'),
+        ('from friday to tuesday', '2025-10-24', '2025-10-28'),
+        ('from today to oct 30', '2025-10-22', '2025-10-30'),
+        ('dec 20 - jan 5', '2025-12-20', '2026-01-05'),
+        ('nov 3-7', '2025-11-03', '2025-11-07'),
+        ('2025-11-01 to 2025-11-05', '2025-11-01', '2025-11-05'),
+        ('feb 2028', '2028-02-01', '2028-02-29'),
+        ('next year', '2026-01-01', '2026-12-31'),
+        ('2027', '2027-01-01', '2027-12-31'),
+    ]
+    TEXTS = [
+        ("what's on my calendar next week?", '2025-10-27', '2025-11-02'),
+        ('am I free on friday afternoon', '2025-10-24', '2025-10-24'),
+        ('book lunch tomorrow at noon', '2025-10-23', '2025-10-23'),
+        ('meetings in march 2026', '2026-03-01', '2026-03-31'),
+        ('anything on 2025-12-24 next week?', '2025-12-24', '2025-12-24'),
+        ('show everything in december', '2025-12-01', '2025-12-31'),
+        ('what do I have in march', '2026-03-01', '2026-03-31'),
+        ('show my calendar for march', '2026-03-01', '2026-03-31'),
+        ('list events for 2026', '2026-01-01', '2026-12-31'),
+        ('what do I have next week friday?', '2025-10-31', '2025-10-31'),
+        ('am I free from oct 1 to oct 15?', '2026-10-01', '2026-10-15'),
+        ('lunch friday 12pm to 1pm', '2025-10-24', '2025-10-24'),
+    ]
+
+    def test_expressions_resolve_to_ranges(self):
+        from datetime import date
+        from home_page.chat_actions.dates import resolve_range
+        today = date.fromisoformat(self.TODAY)
+        for expression, start, end in self.EXPRESSIONS:
+            with self.subTest(expression=expression):
+                found = resolve_range(expression, today=today)
+                self.assertEqual((found.start.isoformat(), found.end.isoformat()), (start, end))
+
+    def test_dates_are_found_in_free_text(self):
+        from datetime import date
+        from home_page.chat_actions.dates import find_range
+        today = date.fromisoformat(self.TODAY)
+        for text, start, end in self.TEXTS:
+            with self.subTest(text=text):
+                found = find_range(text, today=today)
+                self.assertEqual((found.start.isoformat(), found.end.isoformat()), (start, end))
+
+    def test_non_dates_resolve_to_none(self):
+        from datetime import date
+        from home_page.chat_actions.dates import find_range, resolve_date, resolve_range
+        today = date.fromisoformat(self.TODAY)
+        for expression in ('', None, 'soon', '2025-02-30', 'february 30', 'in 99999 years', '99999 months ago', 'next 10000000000 days'):
+            with self.subTest(expression=expression):
+                self.assertIsNone(resolve_range(expression, today=today))
+        # Offsets past the calendar's range are not dates, wherever they appear
+        for text in ('show my events in 99999 years', 'in 10000000000 days', 'what did I do 99999 years ago'):
+            with self.subTest(text=text):
+                self.assertIsNone(find_range(text, today=today))
+        # A bare month name in text is usually a verb; ranges aren't single dates
+        self.assertIsNone(find_range('may I see my calendar?', today=today))
+        self.assertIsNone(resolve_date('next week', today=today))
+
+    def test_repeated_expressions_hit_the_cache(self):
+        from datetime import date
+        from home_page.chat_actions.dates import _resolve, resolve_range
+        today = date.fromisoformat(self.TODAY)
+        resolve_range('next week', today=today)
+        hits = _resolve.cache_info().hits
+        resolve_range('  Next   Week ', today=today)
+        self.assertEqual(_resolve.cache_info().hits, hits + 1)
+
+
+class TestLocalExtraction(TestCase):
+    COMMANDS = [
+        ("What's on my calendar next week?", 'list_events', {'start_date': 'next week', 'end_date': 'next week'}),
+        ('can you show me my schedule for today', 'list_events', {'start_date': 'today', 'end_date': 'today'}),
+        ('When am I free on friday?', 'find_free_slots', {'start_date': 'friday', 'end_date': 'friday'}),
+        # Passed through as written; the handlers resolve them (forward, as ranges) with dates.py
+        ('show my calendar for march', 'list_events', {'start_date': 'march', 'end_date': 'march'}),
+        ('show my events from oct 1 to oct 15', 'list_events', {'start_date': 'from oct 1 to oct 15', 'end_date': 'from oct 1 to oct 15'}),
+        ('schedule dentist tomorrow 3pm to 4pm', 'create_event', {'summary': 'Dentist', 'date': 'tomorrow', 'start': '3pm', 'end': '4pm'}),
+        ('book Team lunch next monday at 12:30pm for 1 hour', 'create_event', {'summary': 'Team lunch', 'date': 'next monday', 'start': '12:30pm', 'duration': '1 hour'}),
+    ]
+    # Attendees, locations, recurrence, ambiguous times, missing dates, references and edits stay with Claude
+    FALLBACKS = [
+        'book a meeting with John tomorrow 3pm to 4pm',
+        'schedule lunch at the park tomorrow 1pm to 2pm',
+        'schedule standup every day at 9am for 15 minutes',
+        'schedule dentist tomorrow at 3',
+        'schedule gym 5pm to 6pm',
+        'Schedule another at 4pm on the same day',
+        'delete my dentist appointment',
+        "what's on my calendar",
+        'what is the weather tomorrow',
+        'Hello there!',
+    ]
+
+    def test_common_commands_are_extracted(self):
+        from home_page.services.local_extractor import extract_calendar_command
+        for text, action, params in self.COMMANDS:
+            with self.subTest(text=text):
+                self.assertEqual(extract_calendar_command(text), {'action': action, 'params': params})
+
+    def test_uncertain_messages_fall_back(self):
+        from home_page.services.local_extractor import extract_calendar_command
+        for text in self.FALLBACKS:
+            with self.subTest(text=text):
+                self.assertIsNone(extract_calendar_command(text))
+
+    def test_agent_skips_claude_for_local_commands(self):
+        from home_page.services import metrics
+        from home_page.services.ai_agent import AIAgent
+        user = User.objects.create_user(username='localextract', password='password')
+        agent = AIAgent(user)
+        local_before = metrics.CALENDAR_EXTRACTIONS.value(extractor='local')
+
+        with patch.object(AIAgent, 'claude_client', new=MagicMock()), \
+                patch.object(AIAgent, 'is_google_connected', return_value=True), \
+                patch.object(AIAgent, 'determine_intent') as determine_intent, \
+                patch.object(AIAgent, '_get_claude_chat_response') as chat:
+            result = agent.handle('list my events this week')
+
+        self.assertEqual(result['type'], 'calendar_action_request')
+        self.assertEqual(result['content']['action'], 'list_events')
+        self.assertEqual(result['content']['params'], {'start_date': 'this week', 'end_date': 'this week'})
+        determine_intent.assert_not_called()
+        chat.assert_not_called()
+        self.assertEqual(metrics.CALENDAR_EXTRACTIONS.value(extractor='local') - local_before, 1)
+
+
+# No background closing remarks: these tests are about the cached listing itself
+@override_settings(LIST_EVENTS_FLOURISHES='off')
+class TestListingCache(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from home_page.models import Conversation
+        cache.clear()
+        self.user = User.objects.create_user(username='listinguser', password='password')
+        self.convo = Conversation.objects.create(user=self.user, title='Listings')
+        self.gcal = MagicMock()
+        self.gcal.list_events.return_value = [
+            {'id': 'evt1', 'summary': 'Standup', 'start': {'dateTime': '2030-01-07T09:00:00Z'}, 'end': {'dateTime': '2030-01-07T09:15:00Z'}},
+        ]
+
+    def list_events(self, params, user_input="what's on my calendar"):
+        from home_page.chat_actions import ActionContext, get_handler
+        request = MagicMock()
+        request.user = self.user
+        agent = MagicMock()
+        agent._get_claude_chat_response.return_value = None
+        return get_handler('list_events').handle(ActionContext(
+            request=request, convo=self.convo, gcal=self.gcal, ai_agent=agent,
+            params=params, user_input=user_input, client_tz_name='UTC',
+        ))
+
+    def test_repeated_listing_is_served_from_cache(self):
+        first = self.list_events({'date': '2030-01-07', 'queries': ['Standup']})
+        second = self.list_events({'start_date': '2030-01-07', 'end_date': '2030-01-07', 'queries': [' standup ']})
+
+        self.assertIn('Standup', first.response)
+        self.assertEqual(second.response, first.response)
+        self.assertEqual(self.gcal.list_events.call_count, 1)
+
+        # A different range or search is a different entry
+        self.list_events({'date': '2030-01-08'})
+        self.assertEqual(self.gcal.list_events.call_count, 2)
+
+    def test_calendar_writes_invalidate_the_users_listings(self):
+        from home_page.services.calendar_service import GoogleCalendarService
+        self.list_events({'date': '2030-01-07'})
+
+        service = GoogleCalendarService.__new__(GoogleCalendarService)
+        service.user_id, service.service, service._masters = self.user.id, MagicMock(), {}
+        service.delete_event('primary', 'evt1')
+
+        self.list_events({'date': '2030-01-07'})
+        self.assertEqual(self.gcal.list_events.call_count, 2)
+
+    def test_listings_are_per_user(self):
+        from home_page.services.listing_cache import invalidate_listings, listing_cache_key
+        other = User.objects.create_user(username='otherlisting', password='password')
+        key = listing_cache_key(self.user.id, '2030-01-07', '2030-01-07')
+
+        self.assertNotEqual(key, listing_cache_key(other.id, '2030-01-07', '2030-01-07'))
+        invalidate_listings(other.id)
+        self.assertEqual(key, listing_cache_key(self.user.id, '2030-01-07', '2030-01-07'))
+        invalidate_listings(self.user.id)
+        self.assertNotEqual(key, listing_cache_key(self.user.id, '2030-01-07', '2030-01-07'))
+
+    def test_invalidation_reaches_other_processes(self):
+        from django.core.cache import caches
+        from home_page.services import listing_cache
+        key = listing_cache.listing_cache_key(self.user.id, '2030-01-07', '2030-01-07')
+
+        # A separate backend instance stands in for another worker process's cache connection
+        other_process = caches.create_connection('default')
+        with patch.object(listing_cache, 'cache', other_process):
+            listing_cache.invalidate_listings(self.user.id)
+
+        self.assertNotEqual(key, listing_cache.listing_cache_key(self.user.id, '2030-01-07', '2030-01-07'))
+
+
+class TestListingFlourishes(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from home_page.models import Conversation
+        cache.clear()
+        self.user = User.objects.create_user(username='flourishuser', password='password')
+        self.convo = Conversation.objects.create(user=self.user, title='Listings')
+        self.gcal = MagicMock()
+        self.gcal.list_events.return_value = [
+            {'id': 'evt1', 'summary': 'Standup', 'start': {'dateTime': '2030-01-07T09:00:00Z'}, 'end': {'dateTime': '2030-01-07T09:15:00Z'}},
+        ]
+        self.agent = MagicMock()
+        self.agent._get_claude_chat_response.return_value = "📅 AI text"
+
+    def list_events(self):
+        from home_page.chat_actions import ActionContext, get_handler
+        request = MagicMock()
+        request.user = self.user
+        return get_handler('list_events').handle(ActionContext(
+            request=request, convo=self.convo, gcal=self.gcal, ai_agent=self.agent,
+            params={'date': '2030-01-07'}, user_input="what's on my calendar", client_tz_name='UTC',
+        ))
+
+    @patch('home_page.chat_actions.list_events.defer')
+    def test_deferred_listing_replies_without_claude(self, defer):
+        from home_page.models import Message
+        with override_settings(LIST_EVENTS_FLOURISHES='deferred'):
+            result = self.list_events()
+
+        self.agent._get_claude_chat_response.assert_not_called()
+        self.assertTrue(result.response.startswith('📅 Schedule for Monday, January 07, 2030'))
+        self.assertIn('Standup', result.response)
+        message = Message.objects.get(conversation=self.convo, sender='agent')
+        self.assertEqual(result.content['followup_url'], f'/agent/assistant/{self.convo.id}/messages/{message.id}/followup/')
+
+        # The deferred closing remark lands in the message and the cached listing
+        message_id, fn, *args = defer.call_args.args
+        self.assertEqual(message_id, message.id)
+        fn(*args)
+        message.refresh_from_db()
+        self.assertEqual(message.text, result.response + "\n\n📅 AI text")
+        self.assertEqual(self.list_events().response, message.text)
+        self.assertEqual(self.gcal.list_events.call_count, 1)
+
+    def test_inline_and_off_modes(self):
+        from django.core.cache import cache
+        with override_settings(LIST_EVENTS_FLOURISHES='inline'):
+            inline = self.list_events()
+        self.assertEqual(self.agent._get_claude_chat_response.call_count, 2)
+        self.assertTrue(inline.response.startswith('📅 AI text'))
+        self.assertTrue(inline.response.endswith('📅 AI text'))
+
+        cache.clear()
+        self.agent.reset_mock()
+        with override_settings(LIST_EVENTS_FLOURISHES='off'):
+            off = self.list_events()
+        self.agent._get_claude_chat_response.assert_not_called()
+        self.assertNotIn('followup_url', off.content or {})
+
+    @patch('home_page.chat_actions.list_events.defer')
+    def test_listing_is_returned_when_it_cannot_be_saved(self, defer):
+        with override_settings(LIST_EVENTS_FLOURISHES='deferred'), \
+                patch('home_page.chat_actions.list_events.Message.objects.create', side_effect=RuntimeError('db down')), \
+                self.assertLogs('home_page.chat_actions.list_events', 'ERROR') as logs:
+            result = self.list_events()
+
+        self.assertIn('Standup', result.response)
+        self.assertIn('db down', logs.output[0])
+        defer.assert_not_called()
+
+    @patch('home_page.services.followups.close_old_connections')
+    @patch('home_page.services.followups._get_executor')
+    def test_followup_endpoint_reports_pending_then_final_text(self, get_executor, close_old_connections):
+        from home_page.models import Message
+        from home_page.services.followups import defer
+        message = Message.objects.create(conversation=self.convo, sender='agent', text='Listing', message_type='text')
+        url = f'/agent/assistant/{self.convo.id}/messages/{message.id}/followup/'
+        self.client.login(username='flourishuser', password='password')
+
+        defer(message.id, lambda: Message.objects.filter(id=message.id).update(text='Listing\n\nRemark'))
+        self.assertEqual(self.client.get(url).json(), {'done': False, 'text': 'Listing'})
+
+        run, *args = get_executor.return_value.submit.call_args.args
+        run(*args)
+        self.assertEqual(self.client.get(url).json(), {'done': True, 'text': 'Listing\n\nRemark'})
+
+        User.objects.create_user(username='someoneelse', password='password')
+        self.client.login(username='someoneelse', password='password')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class TestEventTable(TestCase):
+    EVENTS = [
+        {'summary': 'Late call', 'start': {'dateTime': '2030-01-08T03:30:00Z'}, 'end': {'dateTime': '2030-01-08T04:00:00Z'}},
+        {'summary': 'Standup', 'start': {'dateTime': '2030-01-07T09:05:00-05:00'}, 'end': {'dateTime': '2030-01-07T09:20:00-05:00'}},
+        {'summary': 'Offsite', 'start': {'date': '2030-01-09'}, 'end': {'date': '2030-01-10'}},
+        {'start': {'dateTime': '2030-01-07T12:00:00-05:00'}},
+        {'summary': 'Broken', 'start': {'dateTime': 'not a time'}, 'end': {}},
+    ]
+
+    def test_columns_are_parsed_localized_and_grouped(self):
+        from datetime import date
+        from zoneinfo import ZoneInfo
+        from home_page.chat_actions.event_table import EventTable
+        table = EventTable.from_events(self.EVENTS, ZoneInfo('America/New_York'))
+
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table.summaries[3], 'Untitled')
+        # 03:30Z is still the evening before in New York
+        self.assertEqual(table.days, [date(2030, 1, 7), date(2030, 1, 7), date(2030, 1, 9), date(2030, 1, 7), None])
+        self.assertEqual(table.rows_by_day(), {date(2030, 1, 7): [0, 1, 3], date(2030, 1, 9): [2]})
+        self.assertEqual(table.time_label(0), '10:30 PM - 11:00 PM')
+        self.assertEqual(table.time_label(1), '9:05 AM - 9:20 AM')
+        self.assertEqual(table.time_label(2), '12:00 AM - 12:00 AM')
+        self.assertEqual(table.time_label(3), '12:00 PM')
+        self.assertEqual(table.time_label(4), '')
+
+    def test_clock_labels_match_strftime(self):
+        from datetime import datetime
+        from home_page.chat_actions.event_table import clock_label
+        for hour in range(24):
+            for minute in (0, 5, 30, 59):
+                expected = datetime(2030, 1, 1, hour, minute).strftime('%I:%M %p').lstrip('0')
+                self.assertEqual(clock_label(hour, minute), expected)
+
+    @override_settings(LIST_EVENTS_FLOURISHES='off')
+    def test_week_listing_shows_every_day_in_order(self):
+        from django.core.cache import cache
+        from home_page.chat_actions import ActionContext, get_handler
+        from home_page.models import Conversation
+        cache.clear()
+        user = User.objects.create_user(username='tableuser', password='password')
+        request = MagicMock()
+        request.user = user
+        gcal = MagicMock()
+        gcal.list_events.return_value = self.EVENTS[1:2]
+
+        result = get_handler('list_events').handle(ActionContext(
+            request=request, convo=Conversation.objects.create(user=user, title='Week'), gcal=gcal, ai_agent=MagicMock(),
+            params={'start_date': '2030-01-06', 'end_date': '2030-01-12'}, user_input='', client_tz_name='America/New_York',
+        ))
+
+        headings = [line for line in result.response.splitlines() if line.startswith('**')]
+        self.assertEqual(headings, [f'**{day}**' for day in (
+            'Sunday, January 6', 'Monday, January 7', 'Tuesday, January 8', 'Wednesday, January 9',
+            'Thursday, January 10', 'Friday, January 11', 'Saturday, January 12',
+        )])
+        self.assertIn('**Monday, January 7**\n• 9:05 AM - 9:20 AM: Standup\n\n**Tuesday', result.response)
+        self.assertEqual(result.response.count('*(No events scheduled)*'), 6)
+
+
+class TestRecurrenceExpansion(TestCase):
+    # RFC 5545 section 3.8.5.3 examples (America/New_York, 9:00 AM), which Google Calendar expands the same way
+    CORPUS = [
+        ('19970902', 'FREQ=DAILY;COUNT=10', '19980101',
+         ['0902', '0903', '0904', '0905', '0906', '0907', '0908', '0909', '0910', '0911']),
+        ('19970902', 'FREQ=WEEKLY;UNTIL=19971007T000000Z;WKST=SU;BYDAY=TU,TH', '19980101',
+         ['0902', '0904', '0909', '0911', '0916', '0918', '0923', '0925', '0930', '1002']),
+        ('19970902', 'FREQ=WEEKLY;INTERVAL=2;COUNT=8;WKST=SU;BYDAY=TU,TH', '19980101',
+         ['0902', '0904', '0916', '0918', '0930', '1002', '1014', '1016']),
+        ('19970805', 'FREQ=WEEKLY;INTERVAL=2;COUNT=4;BYDAY=TU,SU;WKST=MO', '19980101', ['0805', '0810', '0819', '0824']),
+        ('19970805', 'FREQ=WEEKLY;INTERVAL=2;COUNT=4;BYDAY=TU,SU;WKST=SU', '19980101', ['0805', '0817', '0819', '0831']),
+        ('19970905', 'FREQ=MONTHLY;COUNT=6;BYDAY=1FR', '19990101', ['0905', '1003', '1107', '1205', '0102', '0206']),
+        ('19970907', 'FREQ=MONTHLY;INTERVAL=2;COUNT=6;BYDAY=1SU,-1SU', '19990101', ['0907', '0928', '1102', '1130', '0104', '0125']),
+        ('19970922', 'FREQ=MONTHLY;COUNT=6;BYDAY=-2MO', '19990101', ['0922', '1020', '1117', '1222', '0119', '0216']),
+        ('19970928', 'FREQ=MONTHLY;BYMONTHDAY=-3', '19980301', ['0928', '1029', '1128', '1229', '0129', '0226']),
+        ('19970930', 'FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1', '19980301', ['0930', '1031', '1128', '1231', '0130', '0227']),
+        ('19970610', 'FREQ=YEARLY;COUNT=4;BYMONTH=6,7', '20000101', ['0610', '0710', '0610', '0710']),
+        ('19970519', 'FREQ=YEARLY;BYDAY=20MO', '20000101', ['0519', '0518', '0517']),
+        ('19980213', 'FREQ=MONTHLY;BYDAY=FR;BYMONTHDAY=13', '20010101', ['0213', '0313', '1113', '0813', '1013']),
+        # Months without a 31st are skipped, as are non-leap years for February 29th
+        ('20300131', 'FREQ=MONTHLY;COUNT=4', '20310101', ['0131', '0331', '0531', '0731']),
+        ('20280229', 'FREQ=YEARLY', '20370101', ['0229', '0229', '0229']),
+    ]
+
+    def master(self, start, rule, extra=(), tz='America/New_York'):
+        from datetime import datetime, timedelta
+        from zoneinfo import ZoneInfo
+        begin = datetime.strptime(start, '%Y%m%d').replace(hour=9, tzinfo=ZoneInfo(tz))
+        return {
+            'id': 'series1', 'summary': 'Standup', 'status': 'confirmed',
+            'start': {'dateTime': begin.isoformat(), 'timeZone': tz},
+            'end': {'dateTime': (begin + timedelta(minutes=30)).isoformat(), 'timeZone': tz},
+            'recurrence': [f'RRULE:{rule}', *extra],
+        }
+
+    def test_corpus_matches_the_reference_expansions(self):
+        from home_page.services.recurrence import expand_events
+        for start, rule, until, expected in self.CORPUS:
+            with self.subTest(rule=rule):
+                events = expand_events([self.master(start, rule)], f'{start[:4]}-01-01T00:00:00Z', f'{until[:4]}-{until[4:6]}-{until[6:]}T00:00:00Z')
+                self.assertEqual([e['start']['dateTime'][5:10].replace('-', '') for e in events], expected)
+                self.assertTrue(all(e['start']['dateTime'][11:16] == '09:00' for e in events))
+
+    def test_instances_look_like_googles(self):
+        from home_page.services.recurrence import expand_events
+        # 9:00 AM stays 9:00 AM across the DST change; ids carry the original start in UTC
+        events = expand_events([self.master('20301101', 'FREQ=DAILY;COUNT=4')], '2030-11-01T00:00:00Z', '2030-12-01T00:00:00Z')
+        self.assertEqual([e['id'] for e in events], [
+            'series1_20301101T130000Z', 'series1_20301102T130000Z', 'series1_20301103T140000Z', 'series1_20301104T140000Z',
+        ])
+        self.assertEqual(events[3]['start'], {'dateTime': '2030-11-04T09:00:00-05:00', 'timeZone': 'America/New_York'})
+        self.assertEqual(events[3]['end'], {'dateTime': '2030-11-04T09:30:00-05:00', 'timeZone': 'America/New_York'})
+        self.assertEqual(events[3]['originalStartTime'], events[3]['start'])
+        self.assertEqual(events[3]['recurringEventId'], 'series1')
+        self.assertEqual(events[3]['summary'], 'Standup')
+        self.assertNotIn('recurrence', events[3])
+
+    def test_exdates_and_exceptions_are_applied(self):
+        from home_page.services.recurrence import expand_events
+        master = self.master('20300107', 'FREQ=WEEKLY;BYDAY=MO', extra=[
+            'EXDATE;TZID=America/New_York:20300114T090000',
+            'EXDATE:20300121T140000Z',
+        ])
+        moved = {
+            'id': 'series1_20300128T140000Z', 'recurringEventId': 'series1', 'summary': 'Standup (moved)',
+            'originalStartTime': {'dateTime': '2030-01-28T09:00:00-05:00', 'timeZone': 'America/New_York'},
+            'start': {'dateTime': '2030-01-29T11:00:00-05:00'}, 'end': {'dateTime': '2030-01-29T11:30:00-05:00'},
+        }
+        cancelled = {
+            'id': 'series1_20300204T140000Z', 'recurringEventId': 'series1', 'status': 'cancelled',
+            'originalStartTime': {'dateTime': '2030-02-04T14:00:00Z'},
+        }
+        single = {'id': 'lunch', 'summary': 'Lunch', 'start': {'dateTime': '2030-01-29T12:00:00-05:00'}, 'end': {'dateTime': '2030-01-29T13:00:00-05:00'}}
+        # A series starting before the window is expanded from its master
+        events = expand_events([single, cancelled, master, moved], '2030-01-10T00:00:00Z', '2030-02-15T00:00:00Z')
+        self.assertEqual([e['id'] for e in events], ['series1_20300128T140000Z', 'lunch', 'series1_20300211T140000Z'])
+        self.assertEqual(events[0]['summary'], 'Standup (moved)')
+
+    def test_all_day_series(self):
+        from home_page.services.recurrence import expand_events
+        master = {
+            'id': 'bins', 'summary': 'Bins out', 'start': {'date': '2030-01-01'}, 'end': {'date': '2030-01-02'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;INTERVAL=2;UNTIL=20300301', 'EXDATE;VALUE=DATE:20300129'],
+        }
+        events = expand_events([master], '2030-01-01T00:00:00Z', '2031-01-01T00:00:00Z')
+        self.assertEqual([e['id'] for e in events], ['bins_20300101', 'bins_20300115', 'bins_20300212', 'bins_20300226'])
+        self.assertEqual(events[1]['start'], {'date': '2030-01-15'})
+        self.assertEqual(events[1]['end'], {'date': '2030-01-16'})
+
+    def test_a_window_years_in_matches_expanding_from_the_start(self):
+        from home_page.services.recurrence import expand_events
+        for rule in ('FREQ=DAILY;INTERVAL=3', 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH', 'FREQ=MONTHLY;BYDAY=-1FR', 'FREQ=YEARLY;BYMONTH=3;BYDAY=2SU'):
+            with self.subTest(rule=rule):
+                master = self.master('20200106', rule)
+                everything = expand_events([master], '2020-01-01T00:00:00Z', '2031-01-01T00:00:00Z')
+                window = expand_events([master], '2030-01-01T00:00:00Z', '2031-01-01T00:00:00Z')
+                self.assertEqual(window, [e for e in everything if e['start']['dateTime'] >= '2030'])
+                self.assertTrue(window)
+
+    def test_unsupported_rules_are_refused(self):
+        from home_page.services.recurrence import UnsupportedRecurrence, expand_events
+        for rule in ('FREQ=HOURLY', 'FREQ=DAILY;BYHOUR=9,17', 'FREQ=YEARLY;BYWEEKNO=20', 'FREQ=WEEKLY;BYDAY=XX'):
+            with self.subTest(rule=rule):
+                with self.assertRaises(UnsupportedRecurrence):
+                    expand_events([self.master('20300107', rule)], '2030-01-01T00:00:00Z', '2031-01-01T00:00:00Z')
+
+    def service(self, items):
+        from home_page.services.calendar_service import GoogleCalendarService
+        service = GoogleCalendarService.__new__(GoogleCalendarService)
+        service.user_id, service.service, service._masters = None, MagicMock(), {}
+        service.service.events.return_value.list.return_value.execute.return_value = {'items': items}
+        return service
+
+    def test_listings_fetch_each_series_once(self):
+        service = self.service([self.master('20290107', 'FREQ=WEEKLY;BYDAY=MO')])
+        events = service.list_events(time_min='2030-01-01T00:00:00Z', time_max='2031-01-01T00:00:00Z')
+
+        self.assertEqual(len(events), 52)
+        list_call = service.service.events.return_value.list
+        list_call.assert_called_once()
+        self.assertFalse(list_call.call_args.kwargs['singleEvents'])
+
+        # Updating the whole series needs no second round trip for the master
+        master = service.get_event('primary', events[0]['recurringEventId'])
+        self.assertEqual(master['recurrence'], ['RRULE:FREQ=WEEKLY;BYDAY=MO'])
+        service.service.events.return_value.get.assert_not_called()
+
+        service.delete_event('primary', events[0]['id'])
+        service.get_event('primary', 'series1')
+        service.service.events.return_value.get.assert_called_once()
+
+    def test_searches_and_unsupported_rules_use_googles_expansion(self):
+        service = self.service([self.master('20290107', 'FREQ=DAILY;BYHOUR=9,17')])
+        service.list_events(time_min='2030-01-01T00:00:00Z', time_max='2031-01-01T00:00:00Z')
+        kwargs = [c.kwargs['singleEvents'] for c in service.service.events.return_value.list.call_args_list]
+        self.assertEqual(kwargs, [False, True])
+
+        service = self.service([])
+        service.list_events(time_min='2030-01-01T00:00:00Z', time_max='2031-01-01T00:00:00Z', q='standup')
+        with override_settings(RECURRENCE_EXPANSION='google'):
+            service.list_events(time_min='2030-01-01T00:00:00Z', time_max='2031-01-01T00:00:00Z')
+        kwargs = [c.kwargs['singleEvents'] for c in service.service.events.return_value.list.call_args_list]
+        self.assertEqual(kwargs, [True, True])
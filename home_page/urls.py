@@ -7,6 +7,9 @@ urlpatterns = [
     # AI assistant URLs 
     path("assistant/", views.assistant, name="assistant"), # Handles GET for initial load
     path("assistant/<uuid:convo_id>/", views.assistant, name="assistant"), # Handles GET for existing convos and POST for chat (handled by JS POSTing to chat_process)
+    path("assistant/conversations/", views.conversation_list, name="conversation_list"), # JSON pages of older sidebar conversations (cursor-based)
+    path("assistant/<uuid:convo_id>/messages/", views.conversation_messages, name="conversation_messages"), # JSON pages of older messages (cursor-based)
+    path("assistant/<uuid:convo_id>/messages/<int:message_id>/followup/", views.message_followup, name="message_followup"), # JSON text of a message whose AI follow-up may still be pending
     path("assistant/new/", views.assistant, {'is_placeholder': True}, name="new_conversation"), # Shows placeholder state without creating conversation
     path("chat/process/", views.chat_process, name="chat_process"), # for posting chat messages from the frontend
     path("assistant/delete_conversation/<uuid:convo_id>/", views.delete_conversation, name='delete_conversation'),
@@ -146,6 +146,26 @@ DATABASES = {
     )
 }
 
+# One cache shared by every web worker and the reminder worker, so invalidations (sidebar
+# counts, cached event listings) and published state (circuit breakers, follow-ups) are seen
+# by all of them; a per-process cache would keep serving stale entries until they expire.
+# REDIS_URL switches to Redis (needs the `redis` package); the default is a table in the
+# main database, created by migrate (or `python manage.py createcachetable`).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'zelmind_cache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -223,6 +243,32 @@ TWILIO_WHATSAPP_BRIEFING_SID = os.getenv('TWILIO_WHATSAPP_BRIEFING_SID')
 TWILIO_WHATSAPP_TEMPLATE_VARIABLE_BODY = os.getenv('TWILIO_WHATSAPP_TEMPLATE_VARIABLE_BODY', '1')
 WHATSAPP_TEST_NUMBER = os.getenv('WHATSAPP_TEST_NUMBER')
 
+# Start the in-process reminder worker from AppConfig.ready:
+#   'runserver' (default) - only in the process serving `manage.py runserver`
+#   'always' - in any process that sets up Django outside manage.py commands (e.g. a WSGI
+#              server other than gunicorn, deployed without the run_reminders worker)
+#   'off' - never; run `python manage.py run_reminders` instead (the Procfile worker)
+# Gunicorn web processes never start it. Only the holder of the reminder-scheduler lease scans.
+REMINDER_WORKER_AUTOSTART = os.getenv('REMINDER_WORKER_AUTOSTART', 'runserver')
+# Reminder scans run on wall-clock boundaries every REMINDER_TICK_SECONDS
+REMINDER_TICK_SECONDS = int(os.getenv('REMINDER_TICK_SECONDS', 10))
+
+# Metrics: the web process serves /metrics (bearer METRICS_TOKEN, or staff login if unset);
+# run_reminders serves its own on 127.0.0.1:METRICS_PORT (0 disables it)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9108))
+
+# Append a JSON line per traced request (e.g. chat_process stage timings) to this file
+TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH')
+
+# list_events AI title and closing remark: 'inline' (wait for both), 'deferred' (reply with the
+# template title at once, append the closing remark when ready) or 'off'
+LIST_EVENTS_FLOURISHES = os.getenv('LIST_EVENTS_FLOURISHES', 'deferred')
+
+# Recurring events in unfiltered listings: 'local' fetches each series once and expands it in
+# process (home_page/services/recurrence.py), 'google' has Google return every instance
+RECURRENCE_EXPANSION = os.getenv('RECURRENCE_EXPANSION', 'local')
+
 # Email Settings (SMTP - for local development)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
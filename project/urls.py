@@ -19,12 +19,14 @@ from django.urls import path, include
 
 
 from authentication import views as auth_views
+from home_page import views as home_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', auth_views.landing_page, name='landing'),
     path('auth/', include("authentication.urls")),
     path('agent/', include('home_page.urls')),
+    path('metrics', home_views.metrics_view, name='metrics'),
     # allauth URLs:
     path('accounts/', include('allauth.urls')),
 ]